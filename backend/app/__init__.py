@@ -6,6 +6,7 @@ from authlib.integrations.flask_client import OAuth
 from config import Config
 from auth import db, bcrypt, auth_bp, init_oauth
 from stripe_integration import stripe_bp
+from .utils.fast_json import FastJSONProvider
 
 def create_app(config_class=Config):
     """Application factory pattern"""
@@ -14,6 +15,9 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Use the fastest available JSON encoder for responses
+    app.json = FastJSONProvider(app)
+
     # Apply proxy fix middleware
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
@@ -32,13 +36,19 @@ def create_app(config_class=Config):
     oauth = OAuth(app)
     init_oauth(oauth)
 
-    # Register blueprints
+    # Register blueprints (designs imports app.utils, so it is imported here)
+    from designs import designs_bp, start_feature_index_loader, upgrade_design_tables
     app.register_blueprint(auth_bp)
     app.register_blueprint(stripe_bp)
+    app.register_blueprint(designs_bp)
 
-    # Create database tables
+    # Create database tables, and add columns and indexes newer than existing ones
     with app.app_context():
         db.create_all()
+        upgrade_design_tables()
+
+    # Similar-design searches use an in-memory index, loaded without holding up requests
+    start_feature_index_loader(app)
 
     # Register routes
     from .routes import api_bp
@@ -1,32 +1,120 @@
+import re
+import time
 import uuid
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
+
+from config import Config
 
 from ..services.ai_service import AIService
+from ..utils.design_features import reusable_requirements
+from ..utils.fast_json import dumps_bytes, iter_response_json
+from ..utils.floors import check_floor_overrides
+from ..utils.plan_geometry import design_problems
+from ..utils.render_cache import get_mesh, get_thumbnail, mesh_key, thumbnail_key
+from ..utils.sse import sse_event
+from ..utils.vector_export import VECTOR_EXPORTERS
+from ..utils.timing import begin_request, end_request, reset_timing_stats, server_timing_header, span, timed_iter, timing_stats
 
 # Import auth functions - using lazy import to avoid circular imports
 def get_current_user():
     """Get current user from Authorization header"""
     from auth import get_current_user as _get_current_user
-    return _get_current_user()
+    with span("auth"):
+        return _get_current_user()
 
 def check_ai_usage_limit(user):
     """Check if user has reached their AI generation limit"""
     from stripe_integration import check_ai_usage_limit as _check_ai_usage_limit
-    return _check_ai_usage_limit(user)
+    with span("usage_check"):
+        return _check_ai_usage_limit(user)
 
 def increment_ai_usage(user):
     """Increment AI usage count for user"""
     from stripe_integration import increment_ai_usage as _increment_ai_usage
-    return _increment_ai_usage(user)
+    with span("usage_increment"):
+        return _increment_ai_usage(user)
 
 def get_user_ai_usage(user):
     """Get user's AI usage information"""
     from stripe_integration import get_user_ai_usage as _get_user_ai_usage
     return _get_user_ai_usage(user)
 
+def save_generated_design(user, design, name=None, source='chat', requirements=None, shared=False):
+    """Save a generated design to the user's designs; returns its id, or None if it could not be saved"""
+    from auth import db
+    from designs import save_design as _save_design
+    try:
+        with span("design_store"):
+            return _save_design(user, design, name, source, requirements, shared).id
+    except Exception as e:
+        # The generation has been paid for, so still deliver it
+        db.session.rollback()
+        current_app.logger.warning(f"Could not save generated design: {e}")
+        return None
+
+def find_similar_design(requirements):
+    """(design, content hash, distance) of the closest shared design for the requirements, or None"""
+    from designs import decode_design, find_reusable_design
+    with span("similar_lookup"):
+        match = find_reusable_design(requirements, Config.SIMILAR_DESIGN_MAX_DISTANCE)
+        if match is None:
+            return None
+        saved, distance = match
+        return decode_design(saved.blob), saved.content_hash, distance
+
+def get_user_plan_limits(user):
+    """Get the user's plan and its feature limits"""
+    from stripe_integration import get_user_plan_limits as _get_user_plan_limits
+    return _get_user_plan_limits(user)
+
+def export_filename(data, fmt):
+    """Download name for an export, reduced to safe characters"""
+    name = re.sub(r'[^A-Za-z0-9_-]+', '-', str(data.get('filename') or 'floor-plan')).strip('-') or 'floor-plan'
+    return f"{name[:100]}.{fmt}"
+
+def cached_render_response(key, render, mimetype):
+    """Response for a render cached under key, or 304 when the client's If-None-Match already holds it
+
+    Browsers do not cache POST responses, so clients revalidate by sending the ETag back themselves.
+    """
+    if key in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(render(), mimetype=mimetype)
+    response.set_etag(key)
+    return response
+
+# Formats /export serves; png is rendered at EXPORT_PNG_WIDTH unless a width is given
+EXPORT_FORMATS = tuple(VECTOR_EXPORTERS) + ('png',)
+EXPORT_PNG_WIDTH = 2048
+
+def design_response(result):
+    """Stream results that carry a design layer by layer; anything else goes through jsonify"""
+    if not result.get('design'):
+        with span("json_encode"):
+            return jsonify(result)
+    # The body is encoded after the headers go out, so this only reaches the aggregate stats
+    return Response(timed_iter("json_encode", iter_response_json(result)), mimetype='application/json')
+
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
+@api_bp.before_request
+def start_timing():
+    """Collect this request's phase timings for the Server-Timing header"""
+    if Config.SERVER_TIMING:
+        g.request_start = time.perf_counter()
+        begin_request()
+
+@api_bp.after_request
+def add_server_timing(response):
+    """Report the request's phases, plus its total so far, in a Server-Timing header"""
+    if Config.SERVER_TIMING and 'request_start' in g:
+        spans = end_request()
+        spans.append(("total", (time.perf_counter() - g.request_start) * 1000))
+        response.headers['Server-Timing'] = server_timing_header(spans)
+    return response
+
 # Initialize AI service
 ai_service = AIService()
 
@@ -46,10 +134,10 @@ def chat():
         session_id = data.get('session_id', str(uuid.uuid4()))
         user_message = data.get('message', '')
 
-        result = ai_service.chat(session_id, user_message)
+        result = ai_service.chat(session_id, user_message, data.get('patch_from'))
 
-        # Check if design was generated and increment usage
-        if result.get('success') and result.get('is_design') and result.get('design'):
+        # Check if design was generated (in full or as a patch) and increment usage
+        if result.get('success') and result.get('is_design') and result.get('design_version'):
             # Check AI usage limit before incrementing
             has_access, limit, remaining = check_ai_usage_limit(user)
             if not has_access:
@@ -62,8 +150,64 @@ def chat():
                 }), 429
 
             increment_ai_usage(user)
+            result['design_id'] = save_generated_design(user, ai_service.current_design(result['session_id']))
 
-        return jsonify(result)
+        return design_response(result)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle a chat message, streaming the reply as Server-Sent Events
+
+    Events: 'token' for each piece of the reply, 'generating' when the AI starts a design,
+    then 'result' (the /chat response body) or 'error'.
+    """
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to use AI chatbot'
+            }), 401
+
+        data = request.json or {}
+        session_id = data.get('session_id') or str(uuid.uuid4())
+        user_message = data.get('message', '')
+
+        def check_design():
+            # Check AI usage limit before the design is built
+            has_access, limit, remaining = check_ai_usage_limit(user)
+            if has_access:
+                return None
+            usage_info = get_user_ai_usage(user)
+            return {
+                'success': False,
+                'error': f'AI generation limit reached. You have used {usage_info["used"]} out of {usage_info["limit"]} generations for your {usage_info["plan"].title()} plan.',
+                'upgrade_required': True,
+                'usage': usage_info
+            }
+
+        def generate():
+            try:
+                for event, payload in ai_service.chat_stream(session_id, user_message, data.get('patch_from'), check_design):
+                    if event == 'result' and payload.get('design_version'):
+                        increment_ai_usage(user)
+                        payload['design_id'] = save_generated_design(user, ai_service.current_design(session_id))
+                    yield sse_event(event, payload)
+            except Exception as e:
+                # The response has started, so errors are sent as an event
+                yield sse_event('error', {'success': False, 'error': str(e)})
+
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # Don't let a proxy hold back tokens
+        return response
 
     except Exception as e:
         return jsonify({
@@ -97,13 +241,14 @@ def generate_design():
         data = request.json
         session_id = data.get('session_id')
 
-        result = ai_service.generate_design(session_id)
+        result = ai_service.generate_design(session_id, data.get('patch_from'))
 
         # Increment usage count on successful generation
-        if result.get('success') and result.get('design'):
+        if result.get('success') and result.get('design_version'):
             increment_ai_usage(user)
+            result['design_id'] = save_generated_design(user, ai_service.current_design(session_id))
 
-        return jsonify(result)
+        return design_response(result)
 
     except Exception as e:
         return jsonify({
@@ -135,14 +280,303 @@ def quick_generate():
             }), 429
 
         data = request.json or {}
+        requirements = ai_service.quick_requirements(data)
 
-        result = ai_service.quick_generate(data)
+        try:
+            check_floor_overrides(requirements)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        shareable = reusable_requirements(requirements)
+
+        # Optional fast path: serve a close design generated earlier instead of generating
+        similar = None
+        if data.get('reuse_similar') and data.get('seed') is None and shareable:
+            similar = find_similar_design(requirements)
+
+        result = ai_service.quick_generate(data, requirements, similar[0] if similar else None)
+        if similar:
+            result['similar_to'] = {'content_hash': similar[1], 'distance': similar[2]}
 
         # Increment usage count on successful generation
         if result.get('success') and result.get('design'):
             increment_ai_usage(user)
+            name = f"{requirements.get('style', 'modern')} {requirements.get('space_type', 'apartment')}".title()
+            # Reused designs are already in the shared index once
+            result['design_id'] = save_generated_design(user, result['design'], name, source='quick',
+                                                        requirements=requirements, shared=shareable and not similar)
 
-        return jsonify(result)
+        return design_response(result)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/quick-generate/batch', methods=['POST'])
+def quick_generate_batch():
+    """Generate a batch of floor plans from a list of requirement objects"""
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to use AI chatbot'
+            }), 401
+
+        # Check AI usage limit (the whole batch counts as one generation)
+        has_access, limit, remaining = check_ai_usage_limit(user)
+        if not has_access:
+            usage_info = get_user_ai_usage(user)
+            return jsonify({
+                'success': False,
+                'error': f'AI generation limit reached. You have used {usage_info["used"]} out of {usage_info["limit"]} generations for your {usage_info["plan"].title()} plan.',
+                'upgrade_required': True,
+                'usage': usage_info
+            }), 429
+
+        data = request.json or {}
+        items = data.get('items')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'error': 'items must be a non-empty list of requirement objects'
+            }), 400
+
+        if len(items) > Config.BATCH_MAX_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'Batch too large: at most {Config.BATCH_MAX_ITEMS} items per request'
+            }), 400
+
+        results = ai_service.quick_generate_batch(items)
+
+        # Stream results as NDJSON, one line per item, when requested
+        if data.get('stream') or 'application/x-ndjson' in request.headers.get('Accept', ''):
+            def generate():
+                charged = False
+                try:
+                    for result in results:
+                        if result['success'] and not charged:
+                            increment_ai_usage(user)
+                            charged = True
+                        yield dumps_bytes(result) + b'\n'
+                except Exception as e:
+                    # Headers are already sent, so a failure mid-batch (such as a
+                    # BrokenProcessPool) ends the stream with an error record
+                    yield dumps_bytes({'success': False, 'error': str(e)}) + b'\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        results = list(results)
+        succeeded = sum(1 for result in results if result['success'])
+
+        # Increment usage count once if anything was generated
+        if succeeded:
+            increment_ai_usage(user)
+
+        return jsonify({
+            'success': succeeded > 0,
+            'results': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/edit-design', methods=['POST'])
+def edit_design():
+    """Apply a targeted room edit (add, remove or resize a room, or change a tile) to a design"""
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to use AI chatbot'
+            }), 401
+
+        data = request.json or {}
+        design = data.get('design')
+
+        if not isinstance(design, dict):
+            return jsonify({
+                'success': False,
+                'error': 'design must be a floor plan object'
+            }), 400
+
+        try:
+            result = ai_service.edit_design(design, data.get('edit'), data.get('layer'))
+        except (ValueError, KeyError) as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
+        return design_response(result)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/export/<fmt>', methods=['POST'])
+def export_design(fmt):
+    """Export a design as an SVG or DXF drawing, streamed entity by entity, or as a PNG image"""
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to export designs'
+            }), 401
+
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported export format: {fmt}. Supported formats: {", ".join(EXPORT_FORMATS)}'
+            }), 400
+
+        # Check the plan includes this format
+        plan, limits = get_user_plan_limits(user)
+        if fmt not in limits.get('export_formats', []):
+            return jsonify({
+                'success': False,
+                'error': f'{fmt.upper()} export is not included in the {plan.title()} plan.',
+                'upgrade_required': True
+            }), 403
+
+        data = request.json or {}
+        design = data.get('design')
+
+        if not isinstance(design, dict) or not isinstance(design.get('layers'), dict):
+            return jsonify({
+                'success': False,
+                'error': 'design must be a floor plan object with layers'
+            }), 400
+
+        if fmt == 'png':
+            try:
+                _, png = get_thumbnail(design, data.get('width', EXPORT_PNG_WIDTH), data.get('layer'))
+            except (KeyError, ValueError, TypeError) as e:
+                return jsonify({
+                    'success': False,
+                    'error': f'design could not be rendered: {e}'
+                }), 400
+            return Response(png, mimetype='image/png',
+                            headers={'Content-Disposition': f'attachment; filename="{export_filename(data, fmt)}"'})
+
+        # The body streams after the 200 goes out, so a malformed design has to be caught here
+        problems = design_problems(design)
+        if problems:
+            return jsonify({
+                'success': False,
+                'error': 'design has invalid elements: ' + '; '.join(problems)
+            }), 400
+
+        exporter, mimetype = VECTOR_EXPORTERS[fmt]
+        return Response(
+            stream_with_context(timed_iter(f"export_{fmt}", exporter(design))),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{export_filename(data, fmt)}"'}
+        )
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/thumbnail', methods=['POST'])
+def design_thumbnail():
+    """PNG preview of a design, served from the thumbnail cache when it was rendered before"""
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to preview designs'
+            }), 401
+
+        data = request.json or {}
+        design = data.get('design')
+
+        if not isinstance(design, dict) or not isinstance(design.get('layers'), dict):
+            return jsonify({
+                'success': False,
+                'error': 'design must be a floor plan object with layers'
+            }), 400
+
+        width, layer_id = data.get('width', 512), data.get('layer')
+        try:
+            with span("thumbnail"):
+                # The cache key is a content hash of the design and options, so it doubles as the ETag
+                key = thumbnail_key(design, width, layer_id)
+                return cached_render_response(key, lambda: get_thumbnail(design, width, layer_id, key)[1], 'image/png')
+        except (KeyError, ValueError, TypeError) as e:
+            return jsonify({
+                'success': False,
+                'error': f'design could not be rendered: {e}'
+            }), 400
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@api_bp.route('/mesh', methods=['POST'])
+def design_mesh():
+    """Binary glTF (GLB) of a design's walls and floors for the 3D viewer, cached by content hash"""
+    try:
+        # Check authentication
+        user = get_current_user()
+        if not user:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication required to view designs in 3D'
+            }), 401
+
+        plan, limits = get_user_plan_limits(user)
+        if not limits.get('3d_view'):
+            return jsonify({
+                'success': False,
+                'error': f'3D view is not included in the {plan.title()} plan.',
+                'upgrade_required': True
+            }), 403
+
+        data = request.json or {}
+        design = data.get('design')
+
+        if not isinstance(design, dict) or not isinstance(design.get('layers'), dict):
+            return jsonify({
+                'success': False,
+                'error': 'design must be a floor plan object with layers'
+            }), 400
+
+        try:
+            with span("mesh"):
+                key = mesh_key(design)
+                return cached_render_response(key, lambda: get_mesh(design, key)[1], 'model/gltf-binary')
+        except (KeyError, ValueError, TypeError) as e:
+            return jsonify({
+                'success': False,
+                'error': f'design could not be rendered: {e}'
+            }), 400
 
     except Exception as e:
         return jsonify({
@@ -174,6 +608,23 @@ def reset_conversation():
             'error': str(e)
         }), 500
 
+@api_bp.route('/metrics/timings', methods=['GET', 'DELETE'])
+def timing_metrics():
+    """Aggregated per-phase timings (auth, usage checks, Groq calls, layout, furnishing, encoding)
+
+    DELETE returns the timings and resets them, so a scraper can collect one window at a time.
+    """
+    if not Config.TIMING_METRICS:
+        return jsonify({
+            'success': False,
+            'error': 'Not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'timings': reset_timing_stats() if request.method == 'DELETE' else timing_stats()
+    })
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -1,17 +1,104 @@
+import time
+
 from groq import Groq
 
 from config import Config
+from ..utils.design_cache import session_designs
 from ..utils.design_utils import conversations, extract_requirements_with_ai
+from ..utils.design_editor import apply_edit
 from ..utils.design_generator import smart_floor_plan_builder
+from ..utils.design_validator import validate_design
+from ..utils.fast_json import dumps_bytes
+from ..utils.json_patch import make_patch
+from ..utils.sse import MarkerFilter
+from ..utils.timing import record, span
+from .generation_pool import generate_batch
+
+CHAT_MODEL = "llama-3.3-70b-versatile"
+
+# Marker the model puts in a reply once it has enough requirements for a design
+DESIGN_MARKER = '[GENERATE_DESIGN]'
 
 class AIService:
     """Service for handling AI-powered design generation"""
 
     def __init__(self):
+        if not Config.GROQ_API_KEY:
+            raise ValueError("GROQ_API_KEY environment variable is required")
         self.client = Groq(api_key=Config.GROQ_API_KEY)
 
-    def chat(self, session_id, user_message):
-        """Handle chat messages and return AI responses"""
+    def chat(self, session_id, user_message, patch_from=None):
+        """Handle chat messages and return AI responses
+
+        With patch_from set to the design version the client holds, a new design is
+        sent as a JSON Patch against it when that is smaller (see deliver_design).
+        """
+        messages = self._add_user_message(session_id, user_message)
+
+        # Call Groq API
+        with span("groq_chat"):
+            chat_completion = self.client.chat.completions.create(
+                messages=messages,
+                model=CHAT_MODEL,
+                temperature=0.7,
+                max_tokens=8000,
+            )
+
+        return self._chat_result(session_id, chat_completion.choices[0].message.content, patch_from)
+
+    def chat_stream(self, session_id, user_message, patch_from=None, check_design=None):
+        """Handle a chat message like chat(), yielding (event, data) pairs as the reply streams in
+
+        Events are 'token' ({'text'}) for each piece of the reply with the design marker
+        removed, 'generating' once the marker appears, then 'result' with chat()'s result,
+        whose message replaces the streamed text. check_design(), if given, is called when
+        the marker appears; a dict it returns is sent as an 'error' event instead of
+        building the design.
+        """
+        messages = self._add_user_message(session_id, user_message)
+        marker = MarkerFilter(DESIGN_MARKER)
+        refused = None
+        chunks = []
+
+        with span("groq_chat"):
+            start = time.perf_counter()
+            stream = self.client.chat.completions.create(
+                messages=messages,
+                model=CHAT_MODEL,
+                temperature=0.7,
+                max_tokens=8000,
+                stream=True,
+            )
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if not chunks:
+                    record("groq_first_token", (time.perf_counter() - start) * 1000)
+                chunks.append(delta)
+
+                found = marker.found
+                text = marker.feed(delta)
+                if text:
+                    yield 'token', {'text': text}
+                if marker.found and not found:
+                    refused = check_design() if check_design else None
+                    if not refused:
+                        yield 'generating', {}
+
+        text = marker.flush()
+        if text:
+            yield 'token', {'text': text}
+
+        assistant_message = ''.join(chunks)
+        if refused:
+            self._chat_result(session_id, assistant_message, build_design=False)
+            yield 'error', refused
+        else:
+            yield 'result', self._chat_result(session_id, assistant_message, patch_from)
+
+    def _add_user_message(self, session_id, user_message):
+        """Append a user message to the session's conversation, starting it if new; returns the history"""
         # Initialize conversation history for new sessions
         if session_id not in conversations:
             conversations[session_id] = [
@@ -28,17 +115,10 @@ class AIService:
             "role": "user",
             "content": user_message
         })
+        return conversations[session_id]
 
-        # Call Groq API
-        chat_completion = self.client.chat.completions.create(
-            messages=conversations[session_id],
-            model="llama-3.3-70b-versatile",
-            temperature=0.7,
-            max_tokens=8000,
-        )
-
-        assistant_message = chat_completion.choices[0].message.content
-
+    def _chat_result(self, session_id, assistant_message, patch_from=None, build_design=True):
+        """Record the assistant's reply and build the chat result, with the design it asked for"""
         # Add assistant response to history
         conversations[session_id].append({
             "role": "assistant",
@@ -49,20 +129,22 @@ class AIService:
         is_design = False
         design_json = None
 
-        if '[GENERATE_DESIGN]' in assistant_message:
-            assistant_message = assistant_message.replace('[GENERATE_DESIGN]', '').strip()
+        if DESIGN_MARKER in assistant_message:
+            assistant_message = assistant_message.replace(DESIGN_MARKER, '').strip()
 
-            # Use AI to extract requirements and build floor plan
-            requirements = extract_requirements_with_ai(conversations[session_id], self.client)
-            design_json = smart_floor_plan_builder(requirements)
-            is_design = True
+            if build_design:
+                # Use AI to extract requirements and build floor plan
+                with span("extract_requirements"):
+                    requirements = extract_requirements_with_ai(conversations[session_id], self.client)
+                design_json = smart_floor_plan_builder(requirements, id_seed=self._session_id_seed(session_id))
+                is_design = True
 
-            # Add success message
-            space_type = requirements.get('space_type', 'space')
-            style = requirements.get('style', 'modern')
-            assistant_message += f"\n\n✨ Perfect! I've generated a {style} {space_type} floor plan based on your requirements. Every room has proper door access and the layout follows professional architectural standards. Click 'Load Design in Editor' to view and customize it!"
+                # Add success message
+                space_type = requirements.get('space_type', 'space')
+                style = requirements.get('style', 'modern')
+                assistant_message += f"\n\n✨ Perfect! I've generated a {style} {space_type} floor plan based on your requirements. Every room has proper door access and the layout follows professional architectural standards. Click 'Load Design in Editor' to view and customize it!"
 
-        return {
+        result = {
             'success': True,
             'session_id': session_id,
             'message': assistant_message,
@@ -70,7 +152,14 @@ class AIService:
             'design': design_json
         }
 
-    def generate_design(self, session_id):
+        if design_json:
+            with span("validate"):
+                result['validation'] = validate_design(design_json)
+            self.deliver_design(session_id, result, patch_from)
+
+        return result
+
+    def generate_design(self, session_id, patch_from=None):
         """Generate a design based on conversation history"""
         if not session_id or session_id not in conversations:
             return {
@@ -79,10 +168,11 @@ class AIService:
             }
 
         # Use AI to extract requirements from conversation
-        requirements = extract_requirements_with_ai(conversations[session_id], self.client)
+        with span("extract_requirements"):
+            requirements = extract_requirements_with_ai(conversations[session_id], self.client)
 
         # Build floor plan based on extracted requirements
-        design_json = smart_floor_plan_builder(requirements)
+        design_json = smart_floor_plan_builder(requirements, id_seed=self._session_id_seed(session_id))
 
         # Generate enthusiastic description
         space_type = requirements.get('space_type', 'apartment')
@@ -118,20 +208,56 @@ class AIService:
             "content": desc
         })
 
-        return {
+        with span("validate"):
+            validation = validate_design(design_json)
+
+        result = {
             'success': True,
             'session_id': session_id,
             'design': design_json,
-            'message': desc
+            'message': desc,
+            'validation': validation
         }
 
-    def quick_generate(self, data):
-        """Generate a floor plan directly from parameters or natural language prompt"""
+        return self.deliver_design(session_id, result, patch_from)
+
+    def _session_id_seed(self, session_id):
+        """Per-session seed for element ids, so a session's designs share ids where they line up"""
+        return session_designs.id_seed(session_id)
+
+    def deliver_design(self, session_id, result, patch_from=None):
+        """Version a session's new design and, if the client holds the previous one, send a patch
+
+        The result gains design_version. When patch_from matches the version last sent to
+        this session and the RFC 6902 patch is smaller than the design, 'design' is replaced
+        by 'design_patch' (with 'patch_from'); otherwise the full design is kept.
+        """
+        design = result['design']
+        result['design_version'], previous = session_designs.deliver(session_id, design, patch_from)
+
+        if previous is not None:
+            with span("patch"):
+                patch = make_patch(previous, design)
+                smaller = len(dumps_bytes(patch)) < len(dumps_bytes(design))
+            if smaller:
+                result['design'] = None
+                result['design_patch'] = patch
+                result['patch_from'] = patch_from
+
+        return result
+
+    def current_design(self, session_id):
+        """Full design last delivered to a session (also when it was sent as a patch), or None"""
+        return session_designs.design(session_id)
+
+    def quick_requirements(self, data):
+        """Requirements for a quick generation, from the natural language prompt or the parameters"""
         prompt = data.get('prompt', '')
 
         if prompt:
             # Use AI to extract requirements from the prompt
-            requirements = extract_requirements_with_ai([{"role": "user", "content": prompt}], self.client)
+            with span("extract_requirements"):
+                requirements = extract_requirements_with_ai([{"role": "user", "content": prompt}], self.client)
         else:
             # Use provided parameters
             requirements = {
@@ -143,11 +269,27 @@ class AIService:
                 'rooms': data.get('rooms', []),
                 'features': data.get('features', []),
                 'style': data.get('style', 'modern'),
-                'user_priority': data.get('priority', 'functionality')
+                'user_priority': data.get('priority', 'functionality'),
+                'layout': data.get('layout', 'grid'),
+                'floors': data.get('floors', 1)
             }
+            if data.get('floor_overrides') is not None:
+                requirements['floor_overrides'] = data['floor_overrides']
+        return requirements
+
+    def quick_generate(self, data, requirements=None, design=None):
+        """Generate a floor plan directly from parameters or natural language prompt
+
+        A `design` (a close stored one found for the requirements) is served instead of generating.
+        """
+        if requirements is None:
+            requirements = self.quick_requirements(data)
 
-        # Build the floor plan
-        design_json = smart_floor_plan_builder(requirements)
+        # Build the floor plan (a seed makes it deterministic and cacheable)
+        design_json = design if design is not None else smart_floor_plan_builder(requirements, seed=data.get('seed'))
+
+        with span("validate"):
+            validation = validate_design(design_json)
 
         # Generate description
         space_type = requirements.get('space_type', 'apartment')
@@ -157,13 +299,32 @@ class AIService:
             'success': True,
             'design': design_json,
             'requirements': requirements,
+            'seed': data.get('seed'),
+            'validation': validation,
             'message': f"✅ Generated a {style} {space_type} floor plan with guaranteed door access for all rooms!"
         }
 
+    def quick_generate_batch(self, requirements_list):
+        """Generate many floor plans from requirement objects, yielding per-item results in order"""
+        return generate_batch(requirements_list)
+
+    def edit_design(self, design, edit, layer_id=None):
+        """Apply a room-level edit to an existing design without regenerating it"""
+        rooms = apply_edit(design, edit, layer_id)
+
+        return {
+            'success': True,
+            'design': design,
+            'changed_rooms': rooms,
+            'validation': validate_design(design),
+            'message': f"✅ Applied {edit['op'].replace('_', ' ')} to your floor plan!"
+        }
+
     def reset_conversation(self, session_id):
         """Reset conversation history for a session"""
         if session_id and session_id in conversations:
             del conversations[session_id]
+        session_designs.pop(session_id)
 
         return {
             'success': True,
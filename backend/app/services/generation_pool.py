@@ -0,0 +1,68 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from config import Config
+from ..utils.design_generator import smart_floor_plan_builder
+from ..utils.design_validator import validate_design
+from ..utils.timing import call_with_spans, record_spans
+
+# Worker pool shared by all requests in this process (created lazily)
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+def get_generation_pool():
+    """Get the shared process pool used for CPU-bound floor plan generation"""
+    global _pool, _pool_workers
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool_workers = Config.BATCH_WORKERS or os.cpu_count() or 1
+                _pool = ProcessPoolExecutor(max_workers=_pool_workers)
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+def generation_pool_workers():
+    """Number of worker processes in the shared pool"""
+    get_generation_pool()
+    return _pool_workers
+
+def discard_generation_pool(pool):
+    """Drop a broken pool, so the next request starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def build_design_safe(requirements):
+    """Build one floor plan, reporting failures instead of raising (runs in a worker)"""
+    if not isinstance(requirements, dict):
+        return {'success': False, 'error': 'Each batch item must be a requirements object'}
+
+    try:
+        design = smart_floor_plan_builder(requirements, seed=requirements.get('seed'))
+        return {'success': True, 'design': design, 'validation': validate_design(design)}
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+def generate_batch(requirements_list):
+    """Fan requirement objects out over the worker pool, yielding results in input order"""
+    pool = get_generation_pool()
+    chunksize = max(1, len(requirements_list) // (generation_pool_workers() * 4))
+
+    try:
+        # Workers send their spans back with each result, for this process's stats
+        jobs = pool.map(partial(call_with_spans, build_design_safe), requirements_list, chunksize=chunksize)
+        for index, (result, spans) in enumerate(jobs):
+            record_spans(spans)
+            result['index'] = index
+            yield result
+    except BrokenProcessPool:
+        # A worker died (killed, or out of memory); results already yielded stand
+        discard_generation_pool(pool)
+        raise
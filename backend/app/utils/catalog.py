@@ -0,0 +1,208 @@
+"""
+Design catalogue compiled once from Config.PROFESSIONAL_CONFIG.
+
+The generator used to walk the nested config dict with string keys for every
+element it wrote. Here the catalogue is compiled at import into namedtuples
+and read-only mappings, so hot paths use plain attribute access. Compiling
+also cross-validates the data:
+- every template room type resolves to a room type
+- every room type's items resolve to catalog items
+- every texture resolves to a known floor texture
+Anything that does not resolve falls back to the generic room type, an
+aliased item (or none) or the generic texture. Each fallback is listed in
+CATALOG.issues instead of failing later with a KeyError.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+from config import Config
+
+FALLBACK_ROOM_TYPE = "generic"
+FALLBACK_TEMPLATE = ("generic", "generic", "storage")
+
+CatalogItem = namedtuple("CatalogItem", ["id", "name", "type", "footprint"])
+
+RoomType = namedtuple("RoomType", [
+    "name", "min_doors", "max_doors", "max_windows", "texture",  # texture as written to areas
+    "furniture", "accessories", "label_color", "label_font_size", "door_required"
+])
+
+Dimensions = namedtuple("Dimensions", [
+    "wall_height", "wall_thickness", "wall_texture_a", "wall_texture_b",
+    "door_width", "door_height", "window_width", "window_height", "window_altitude", "window_spacing",
+    "opening_clearance", "min_room_size", "stair_inset", "furniture_gap", "default_footprint"
+])
+
+Catalog = namedtuple("Catalog", [
+    "items", "item_aliases", "item_types", "textures", "texture_aliases", "texture_colours",
+    "room_types", "space_templates", "dims", "issues"
+])
+
+# Fill for areas whose texture has no flat colour
+DEFAULT_TEXTURE_COLOUR = "#F5F5F5"
+
+def _texture_key(name):
+    return str(name).strip().lower().replace("-", "_").replace(" ", "_")
+
+def _compile_textures(config):
+    """(floor texture name -> value written to areas, alias -> texture name)"""
+    textures = dict(config["special_textures"])
+    aliases = {_texture_key(name): name for name in textures}
+
+    # The tile catalog's ids ("ceramic-tile", "strand-porcelain") name the same textures
+    for name, tile_id in config["tile_catalog"].items():
+        canonical = aliases.get(_texture_key(name)) or aliases.get(_texture_key(tile_id))
+        if canonical:
+            aliases.setdefault(_texture_key(tile_id), canonical)
+    return textures, aliases
+
+def _item_key(item_id, items, aliases):
+    """Catalog id for an item id, an alias or a -/_ spelling variant of either; None if unknown"""
+    item_id = str(item_id).strip().lower()
+    for candidate in (item_id, item_id.replace("_", "-"), item_id.replace("-", "_")):
+        if candidate in items:
+            return candidate
+        if candidate in aliases:
+            return aliases[candidate]
+    return None
+
+def compile_catalog(config):
+    """Compile and cross-validate a PROFESSIONAL_CONFIG-style dict into a Catalog"""
+    issues = []
+    default_footprint = tuple(config["default_footprint"])
+
+    items = {
+        item_id: CatalogItem(item_id, entry["name"], entry["type"],
+                             tuple(config["furniture_footprints"].get(item_id, default_footprint)))
+        for item_id, entry in config["furniture_catalog"].items()
+    }
+    for item_id in config["furniture_footprints"]:
+        if item_id not in items:
+            issues.append(f"footprint for unknown item {item_id!r}")
+
+    item_aliases = {}
+    for alias, target in config.get("furniture_aliases", {}).items():
+        if target in items:
+            item_aliases[alias] = target
+        else:
+            issues.append(f"alias {alias!r} points at unknown item {target!r}")
+
+    # Serialized items carry the catalog "type", which several ids may share
+    item_types = {}
+    for item in items.values():
+        item_types.setdefault(item.type, item)
+
+    textures, texture_aliases = _compile_textures(config)
+
+    # Keyed by both the texture name and the value written to areas
+    texture_colours = {}
+    for name, colour in config.get("texture_colours", {}).items():
+        canonical = texture_aliases.get(_texture_key(name))
+        if canonical is None:
+            issues.append(f"colour for unknown texture {name!r}")
+            continue
+        texture_colours[canonical] = texture_colours[textures[canonical]] = colour
+    generic_texture = texture_aliases.get(_texture_key(config["room_types"][FALLBACK_ROOM_TYPE]["texture"]))
+    if generic_texture is None:
+        generic_texture = next(iter(textures))
+        issues.append(f"generic room texture is unknown; using {generic_texture!r}")
+
+    room_types = {}
+    for name, entry in config["room_types"].items():
+        texture = texture_aliases.get(_texture_key(entry["texture"]))
+        if texture is None:
+            issues.append(f"room type {name!r}: unknown texture {entry['texture']!r}")
+            texture = generic_texture
+
+        resolved = {}
+        for field in ("furniture", "accessories"):
+            resolved[field] = []
+            for item_id in entry.get(field, []):
+                key = _item_key(item_id, items, item_aliases)
+                if key is None:
+                    issues.append(f"room type {name!r}: unknown item {item_id!r}")
+                else:
+                    resolved[field].append(key)
+
+        room_types[name] = RoomType(
+            name=name,
+            min_doors=entry.get("min_doors", 1),
+            max_doors=max(entry.get("max_doors", 2), entry.get("min_doors", 1)),
+            max_windows=entry.get("max_windows", 2),
+            texture=textures[texture],
+            furniture=tuple(resolved["furniture"]),
+            accessories=tuple(resolved["accessories"]),
+            label_color=entry.get("label_color", "#FFFFFF"),
+            label_font_size=entry.get("label_font_size", 30),
+            door_required=entry.get("door_required", True)
+        )
+
+    space_templates = {}
+    for space_type, template in config["space_templates"].items():
+        for room_type in template:
+            if room_type not in room_types:
+                issues.append(f"space template {space_type!r}: unknown room type {room_type!r}")
+        space_templates[space_type] = tuple(template)
+
+    dims = Dimensions(
+        wall_height=config["wall_height"],
+        wall_thickness=config["wall_thickness"],
+        wall_texture_a=config["wall_texture_a"],
+        wall_texture_b=config["wall_texture_b"],
+        door_width=config["door_width"],
+        door_height=config["door_height"],
+        window_width=config["window_width"],
+        window_height=config["window_height"],
+        window_altitude=config["window_altitude"],
+        window_spacing=config["window_spacing"],
+        opening_clearance=config["opening_clearance"],
+        min_room_size=config["min_room_size"],
+        stair_inset=config["stair_inset"],
+        furniture_gap=config["furniture_gap"],
+        default_footprint=default_footprint
+    )
+
+    return Catalog(
+        items=MappingProxyType(items),
+        item_aliases=MappingProxyType(item_aliases),
+        item_types=MappingProxyType(item_types),
+        textures=MappingProxyType(textures),
+        texture_aliases=MappingProxyType(texture_aliases),
+        texture_colours=MappingProxyType(texture_colours),
+        room_types=MappingProxyType(room_types),
+        space_templates=MappingProxyType(space_templates),
+        dims=dims,
+        issues=tuple(issues)
+    )
+
+CATALOG = compile_catalog(Config.PROFESSIONAL_CONFIG)
+
+def room_type(name):
+    """RoomType for a room type name; unknown names get the generic room type"""
+    return CATALOG.room_types.get(name) or CATALOG.room_types[FALLBACK_ROOM_TYPE]
+
+def space_template(space_type):
+    """Room types of a space type's default layout"""
+    return CATALOG.space_templates.get(space_type, FALLBACK_TEMPLATE)
+
+@lru_cache(maxsize=1024)
+def catalog_item(item_id):
+    """CatalogItem for an item id or one of its aliases, or None if the catalog lacks it"""
+    key = _item_key(item_id, CATALOG.items, CATALOG.item_aliases)
+    return CATALOG.items[key] if key is not None else None
+
+def floor_texture(name, default=None):
+    """Texture value for an area's floor; an unknown name gives `default` (None by default)"""
+    canonical = CATALOG.texture_aliases.get(_texture_key(name)) if name else None
+    return CATALOG.textures[canonical] if canonical else default
+
+def texture_colour(texture):
+    """Flat fill colour for an area texture (name or written value)"""
+    return CATALOG.texture_colours.get(texture, DEFAULT_TEXTURE_COLOUR)
+
+def item_footprint(item_type):
+    """Footprint of a serialized item by its catalog type, for drawing it"""
+    entry = CATALOG.items.get(item_type) or CATALOG.item_types.get(item_type)
+    return entry.footprint if entry else CATALOG.dims.default_footprint
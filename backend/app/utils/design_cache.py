@@ -0,0 +1,181 @@
+import hashlib
+import itertools
+import json
+import random
+import threading
+from collections import OrderedDict
+
+from config import Config
+from .fast_json import dumps_bytes, loads
+
+# Requirement fields that only affect the chat description, not the generated layout
+COSMETIC_FIELDS = ('style', 'features')
+
+def normalize_requirements(requirements):
+    """Reduce requirements to a canonical form of the fields that drive generation"""
+    normalized = {key: value for key, value in requirements.items() if key not in COSMETIC_FIELDS}
+    normalized.setdefault('space_type', 'apartment')
+    normalized.setdefault('num_bedrooms', 0)
+    normalized.setdefault('num_bathrooms', 0)
+    normalized.setdefault('rooms', [])
+    normalized.setdefault('user_priority', 'functionality')
+    normalized['width_meters'] = float(requirements.get('width_meters', 10))
+    normalized['height_meters'] = float(requirements.get('height_meters', 8))
+    return normalized
+
+def design_cache_key(requirements, seed):
+    """Content-addressed cache key for a (requirements, seed) pair"""
+    payload = json.dumps(
+        {'requirements': normalize_requirements(requirements), 'seed': seed},
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def design_hash(design):
+    """Content hash of a design: equal for designs that serialize to the same JSON"""
+    return hashlib.sha256(dumps_bytes(design, sort_keys=True)).hexdigest()
+
+class DesignCache:
+    """Thread-safe LRU cache of generated designs bounded by serialized size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a fresh copy of the cached design, or None on a miss"""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        # Decode outside the lock; callers get their own copy to mutate
+        return loads(data)
+
+    def put(self, key, design):
+        """Store a design, evicting least recently used entries over the byte budget"""
+        data = dumps_bytes(design)
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+            self._entries[key] = data
+            self.current_bytes += len(data)
+
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        """Drop every cached design"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Cache statistics for health and metrics endpoints"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+class SessionDesigns:
+    """Thread-safe LRU of each chat session's last delivered design, bounded by serialized size
+
+    An entry holds the session's element id seed and its last design with that design's
+    version. Versions come from one process-wide counter, so a session that was evicted
+    and starts again can never match a patch_from the client still holds: it just gets
+    its next design in full.
+    """
+
+    # Rough cost of an entry beyond its design, so id-seed-only sessions are bounded too
+    ENTRY_BYTES = 256
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()  # session id -> [id_seed, version, design bytes or None]
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _entry(self, session_id):
+        entry = self._entries.get(session_id)
+        if entry is None:
+            entry = self._entries[session_id] = [random.getrandbits(64), None, None]
+            self.current_bytes += self.ENTRY_BYTES
+        self._entries.move_to_end(session_id)
+        return entry
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, data) = self._entries.popitem(last=False)
+            self.current_bytes -= self.ENTRY_BYTES + len(data or b"")
+
+    def id_seed(self, session_id):
+        """The session's element id seed, drawn on first use"""
+        with self._lock:
+            id_seed = self._entry(session_id)[0]
+            self._evict()
+            return id_seed
+
+    def deliver(self, session_id, design, patch_from=None):
+        """Record a newly delivered design
+
+        Returns (its version, the design it replaces if that one's version is patch_from, else None).
+        """
+        # Import here to avoid circular imports
+        from .floors import pack_instances, unpack_instances
+
+        data = dumps_bytes(pack_instances(design))
+        with self._lock:
+            entry = self._entry(session_id)
+            previous = entry[2] if patch_from is not None and entry[1] == patch_from else None
+            self.current_bytes += len(data) - len(entry[2] or b"")
+            entry[1], entry[2] = next(self._versions), data
+            version = entry[1]
+            self._evict()
+
+        # Decode outside the lock
+        return version, unpack_instances(loads(previous)) if previous is not None else None
+
+    def design(self, session_id):
+        """A copy of the session's last delivered design, or None"""
+        from .floors import unpack_instances
+
+        with self._lock:
+            entry = self._entries.get(session_id)
+            data = entry[2] if entry else None
+        return unpack_instances(loads(data)) if data is not None else None
+
+    def pop(self, session_id):
+        """Forget a session"""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self.current_bytes -= self.ENTRY_BYTES + len(entry[2] or b"")
+
+    def stats(self):
+        """Store statistics for health and metrics endpoints"""
+        with self._lock:
+            return {'sessions': len(self._entries), 'bytes': self.current_bytes, 'max_bytes': self.max_bytes}
+
+# Process-wide cache of seeded designs
+design_cache = DesignCache(Config.DESIGN_CACHE_MAX_BYTES)
+
+# Last design delivered to each chat session, for JSON Patch deltas
+session_designs = SessionDesigns(Config.SESSION_DESIGNS_MAX_BYTES)
@@ -0,0 +1,478 @@
+"""
+Room-level edits on a generated design.
+
+The generator keeps a small room index in every area's misc (room_type,
+bounds, label, items and walls: shared wall id -> neighbouring area id), so an
+edit only reads and rewrites the room it targets, the neighbour it trades
+space with, and the walls between them. Nothing else in the layer is visited.
+
+Bounds are the wall-enclosed cell (x1, y1, x2, y2) of a room. Sides are named
+in react-planner's orientation, where y grows upwards: left/right are the
+x1/x2 sides and bottom/top the y1/y2 sides.
+"""
+
+import math
+
+from .catalog import CATALOG, floor_texture
+from .design_generator import add_furniture_and_accessories, create_door, create_vertex, create_wall, serialize_layer
+from .design_model import DesignModel
+from .design_utils import IdAllocator, process_custom_room
+from .furniture_placer import door_clearance
+
+# Coordinates closer than this are the same point
+EPSILON = 0.5  # cm
+
+# Side name -> (axis, index of the side's coordinate in bounds)
+SIDES = {
+    "left": (0, 0),
+    "right": (0, 2),
+    "bottom": (1, 1),
+    "top": (1, 3),
+}
+
+EDIT_OPS = ("add_room", "remove_room", "resize_room", "set_tile")
+
+def _coord(vertex, axis):
+    return vertex["x"] if axis == 0 else vertex["y"]
+
+def _point(axis, along, across):
+    """(x, y) of the point at `along` on the axis and `across` on the other one"""
+    return (along, across) if axis == 0 else (across, along)
+
+def _near(a, b):
+    return abs(a - b) <= EPSILON
+
+def _get_layer(design, layer_id=None):
+    layer_id = layer_id or design.get("selectedLayer", "layer-1")
+    layer = design.get("layers", {}).get(layer_id)
+    if layer is None:
+        raise ValueError(f"Layer '{layer_id}' not found in design")
+    return layer
+
+def _room_meta(layer, area_id):
+    meta = layer["areas"][area_id].get("misc") or {}
+    if not meta.get("bounds"):
+        raise ValueError("Design has no room index; regenerate it to enable room edits")
+    return meta
+
+def find_room(layer, ref):
+    """Area id of a room given its id or (case-insensitive) name"""
+    areas = layer["areas"]
+    if ref in areas:
+        _room_meta(layer, ref)
+        return ref
+
+    name = str(ref or "").strip().lower()
+    for area_id, area in areas.items():
+        if area.get("name", "").lower() == name:
+            _room_meta(layer, area_id)
+            return area_id
+    raise ValueError(f"Room '{ref}' not found in design")
+
+def _wall_geometry(layer, wall_id):
+    v1, v2 = (layer["vertices"][vid] for vid in layer["lines"][wall_id]["vertices"])
+    return v1, v2, math.hypot(v2["x"] - v1["x"], v2["y"] - v1["y"])
+
+def _on_side(bounds, v1, v2):
+    """Whether a wall segment lies on one side of a room's bounds"""
+    x1, y1, x2, y2 = bounds
+    if _near(v1["y"], v2["y"]) and (_near(v1["y"], y1) or _near(v1["y"], y2)):
+        low, high = sorted((v1["x"], v2["x"]))
+        return low >= x1 - EPSILON and high <= x2 + EPSILON
+    if _near(v1["x"], v2["x"]) and (_near(v1["x"], x1) or _near(v1["x"], x2)):
+        low, high = sorted((v1["y"], v2["y"]))
+        return low >= y1 - EPSILON and high <= y2 + EPSILON
+    return False
+
+def _add_vertex(layer, ids, x, y):
+    vid = ids()
+    layer["vertices"][vid] = create_vertex(vid, x, y)
+    return vid
+
+def layer_ids(layer):
+    """IdAllocator that never hands out an ID already used by one of the layer's elements"""
+    ids = IdAllocator()
+    for table in ("vertices", "lines", "holes", "areas", "items"):
+        ids.reserve(layer.get(table, {}))
+    return ids
+
+def _drop_vertex_if_unused(layer, vid):
+    vertex = layer["vertices"].get(vid)
+    if vertex is not None and not vertex["lines"] and not vertex["areas"]:
+        del layer["vertices"][vid]
+
+def _rehome_hole(hole, center, length):
+    """Set a hole's offset from its centre on a wall, keeping it within the wall"""
+    half = hole["properties"]["width"]["length"] / 2
+    center = length / 2 if length < 2 * half else min(max(center, half), length - half)
+    hole["offset"] = center / length
+
+def _split_wall(layer, wall_id, x, y, ids):
+    """Split a wall at a point on it, keeping every hole where it was; returns (vertex id, new wall id)"""
+    wall = layer["lines"][wall_id]
+    v1, v2, length = _wall_geometry(layer, wall_id)
+    split = math.hypot(x - v1["x"], y - v1["y"])
+    v2_id = wall["vertices"][1]
+
+    vid = _add_vertex(layer, ids, x, y)
+    new_id = ids()
+    new_wall = dict(wall, id=new_id, vertices=[vid, v2_id], holes=[])
+    layer["lines"][new_id] = new_wall
+    wall["vertices"] = [wall["vertices"][0], vid]
+    layer["vertices"][vid]["lines"] = [wall_id, new_id]
+    v2["lines"] = [new_id if line == wall_id else line for line in v2["lines"]]
+
+    kept = []
+    for hole_id in wall["holes"]:
+        hole = layer["holes"][hole_id]
+        center = hole["offset"] * length
+        if center < split:
+            _rehome_hole(hole, center, split)
+            kept.append(hole_id)
+        else:
+            _rehome_hole(hole, center - split, length - split)
+            hole["line"] = new_id
+            new_wall["holes"].append(hole_id)
+    wall["holes"] = kept
+
+    return vid, new_id
+
+def _vertex_on_line(layer, start_id, axis, target, ids, touched):
+    """Vertex at `target` on the wall line through start_id that runs along `axis`
+
+    Walks wall by wall from start_id and splits the wall containing the target.
+    Where no wall continues along the line (grid perimeters), a free vertex
+    marks the point, as the generator does for perimeter grid points.
+    """
+    vertices = layer["vertices"]
+    across = _coord(vertices[start_id], 1 - axis)
+    direction = 1 if target > _coord(vertices[start_id], axis) else -1
+    vid = start_id
+
+    while True:
+        vertex = vertices[vid]
+        position = _coord(vertex, axis)
+        if _near(position, target):
+            return vid
+
+        step = None
+        for wall_id in vertex["lines"]:
+            other_id = next(v for v in layer["lines"][wall_id]["vertices"] if v != vid)
+            other = vertices[other_id]
+            if _near(_coord(other, 1 - axis), across) and (_coord(other, axis) - position) * direction > EPSILON:
+                step = wall_id, other_id
+                break
+
+        if step is None:
+            return _add_vertex(layer, ids, *_point(axis, target, across))
+
+        wall_id, other_id = step
+        if (_coord(vertices[other_id], axis) - target) * direction > EPSILON:
+            split_id, new_wall = _split_wall(layer, wall_id, *_point(axis, target, across), ids)
+            touched.update((wall_id, new_wall))
+            return split_id
+        vid = other_id
+
+def _move_wall_end(layer, wall_id, old_id, new_id):
+    wall = layer["lines"][wall_id]
+    wall["vertices"] = [new_id if vid == old_id else vid for vid in wall["vertices"]]
+    old = layer["vertices"][old_id]
+    old["lines"] = [line for line in old["lines"] if line != wall_id]
+    layer["vertices"][new_id]["lines"].append(wall_id)
+    _drop_vertex_if_unused(layer, old_id)
+
+def _delete_wall(layer, wall_id):
+    wall = layer["lines"].pop(wall_id)
+    for hole_id in wall["holes"]:
+        layer["holes"].pop(hole_id, None)
+    for vid in wall["vertices"]:
+        vertex = layer["vertices"][vid]
+        vertex["lines"] = [line for line in vertex["lines"] if line != wall_id]
+        _drop_vertex_if_unused(layer, vid)
+
+def _rescale_room(layer, meta, area_id, axis, fixed, old_length, new_length):
+    """Stretch a room's area, label and items along one axis, keeping `fixed` in place"""
+    scale = new_length / old_length
+    key = "x" if axis == 0 else "y"
+
+    def stretch(element):
+        element[key] = fixed + (element[key] - fixed) * scale
+
+    for vid in layer["areas"][area_id]["vertices"]:
+        stretch(layer["vertices"][vid])
+    for item_id in [meta.get("label")] + meta.get("items", []):
+        if item_id in layer["items"]:
+            stretch(layer["items"][item_id])
+
+def _relink(layer, wall_ids, area_ids):
+    """Recompute which of the given rooms own each of the given walls
+
+    area_ids must include every room that can border the walls, so a wall with a
+    single owner is an outer wall.
+    """
+    metas = {area_id: layer["areas"][area_id]["misc"] for area_id in area_ids if area_id in layer["areas"]}
+    for wall_id in wall_ids:
+        for meta in metas.values():
+            meta["walls"].pop(wall_id, None)
+        if wall_id not in layer["lines"]:
+            continue
+
+        v1, v2, _ = _wall_geometry(layer, wall_id)
+        owners = [area_id for area_id, meta in metas.items() if _on_side(meta["bounds"], v1, v2)]
+        if len(owners) == 2:
+            metas[owners[0]]["walls"][wall_id] = owners[1]
+            metas[owners[1]]["walls"][wall_id] = owners[0]
+        elif len(owners) == 1:
+            metas[owners[0]]["walls"][wall_id] = None
+
+def _side_vertex(layer, meta, axis, across):
+    """Any wall vertex of a room lying on its side line at `across`, or None"""
+    for wall_id in meta["walls"]:
+        if wall_id in layer["lines"]:
+            for vid in layer["lines"][wall_id]["vertices"]:
+                if _near(_coord(layer["vertices"][vid], 1 - axis), across):
+                    return vid
+    return None
+
+def full_side_neighbour(layer, area_id, side):
+    """(wall id, neighbour area id) of the room sharing the whole given side, or None"""
+    axis, index = SIDES[side]
+    meta = _room_meta(layer, area_id)
+    bounds = meta["bounds"]
+    position = bounds[index]
+    opposite = index - 2 if index >= 2 else index + 2
+    low, high = bounds[1 - axis], bounds[3 - axis]
+
+    for wall_id, neighbour_id in meta["walls"].items():
+        if neighbour_id is None or neighbour_id not in layer["areas"] or wall_id not in layer["lines"]:
+            continue
+        neighbour = layer["areas"][neighbour_id]["misc"]["bounds"]
+        if not (_near(neighbour[opposite], position) and _near(neighbour[1 - axis], low) and _near(neighbour[3 - axis], high)):
+            continue
+        v1, v2, _ = _wall_geometry(layer, wall_id)
+        ends = sorted((_coord(v1, 1 - axis), _coord(v2, 1 - axis)))
+        if _near(_coord(v1, axis), position) and _near(ends[0], low) and _near(ends[1], high):
+            return wall_id, neighbour_id
+    return None
+
+def _move_shared_wall(layer, wall_id, axis, target, ids, touched):
+    """Translate a wall across `axis` to `target`, re-attaching its ends on the lines they sit on"""
+    for old_id in list(layer["lines"][wall_id]["vertices"]):
+        new_id = _vertex_on_line(layer, old_id, axis, target, ids, touched)
+        _move_wall_end(layer, wall_id, old_id, new_id)
+
+def resize_room(layer, area_id, delta, side=None, ids=None):
+    """Grow (or, with a negative delta, shrink) a room by moving one side into its neighbour"""
+    ids = ids or layer_ids(layer)
+    meta = _room_meta(layer, area_id)
+    min_size = CATALOG.dims.min_room_size
+
+    if side is not None and side not in SIDES:
+        raise ValueError(f"side must be one of {', '.join(SIDES)}")
+
+    # The side whose neighbour can give (or take) the most space
+    best = None
+    for name in [side] if side else SIDES:
+        shared = full_side_neighbour(layer, area_id, name)
+        if shared is None:
+            continue
+        axis, _ = SIDES[name]
+        giver = layer["areas"][shared[1]]["misc"]["bounds"] if delta > 0 else meta["bounds"]
+        slack = giver[axis + 2] - giver[axis] - min_size
+        if best is None or slack > best[0]:
+            best = slack, name, shared
+    if best is None:
+        raise ValueError("No neighbouring room shares a whole wall with this room on that side")
+
+    slack, side, (wall_id, neighbour_id) = best
+    if abs(delta) > slack:
+        raise ValueError(f"Room can change by at most {max(0, int(slack))} cm on its {side} side")
+
+    axis, index = SIDES[side]
+    bounds = meta["bounds"]
+    neighbour_meta = layer["areas"][neighbour_id]["misc"]
+    neighbour = neighbour_meta["bounds"]
+    outward = 1 if index >= 2 else -1
+    position = bounds[index]
+    target = position + outward * delta
+
+    walls = set(meta["walls"]) | set(neighbour_meta["walls"])
+    rooms = {area_id, neighbour_id} | set(meta["walls"].values()) | set(neighbour_meta["walls"].values())
+    rooms.discard(None)
+
+    _move_shared_wall(layer, wall_id, axis, target, ids, walls)
+
+    # Each room keeps its far side fixed and stretches towards the moved wall
+    fixed = bounds[index - 2 if index >= 2 else index + 2]
+    _rescale_room(layer, meta, area_id, axis, fixed, abs(position - fixed), abs(target - fixed))
+    neighbour_fixed = neighbour[index]
+    _rescale_room(layer, neighbour_meta, neighbour_id, axis, neighbour_fixed,
+                  abs(position - neighbour_fixed), abs(target - neighbour_fixed))
+
+    bounds[index] = target
+    neighbour[index - 2 if index >= 2 else index + 2] = target
+
+    _relink(layer, walls, rooms)
+    return [area_id, neighbour_id]
+
+def add_room(layer, room_spec, target=None, fraction=0.5, ids=None):
+    """Split a room (by default the largest) and put a new room in one part, behind a door"""
+    ids = ids or layer_ids(layer)
+    min_size = CATALOG.dims.min_room_size
+
+    if target is None:
+        # Only the areas table is scanned, never the walls or items
+        indexed = [(area_id, area["misc"]["bounds"]) for area_id, area in layer["areas"].items()
+                   if (area.get("misc") or {}).get("bounds")]
+        if not indexed:
+            raise ValueError("Design has no room index; regenerate it to enable room edits")
+        target = max(indexed, key=lambda entry: (entry[1][2] - entry[1][0]) * (entry[1][3] - entry[1][1]))[0]
+    else:
+        target = find_room(layer, target)
+
+    meta = _room_meta(layer, target)
+    bounds = meta["bounds"]
+    axis = 0 if bounds[2] - bounds[0] >= bounds[3] - bounds[1] else 1
+    low, high = bounds[axis], bounds[axis + 2]
+    fraction = min(max(float(fraction), 0.2), 0.8)
+    split = round(high - (high - low) * fraction, 2)
+    if split - low < min_size or high - split < min_size:
+        raise ValueError("Room is too small to split")
+
+    walls = set(meta["walls"])
+    rooms = {target} | set(meta["walls"].values())
+    rooms.discard(None)
+
+    # New dividing wall, its ends joined onto the room's two side lines
+    ends = []
+    for across in (bounds[1 - axis], bounds[3 - axis]):
+        start = _side_vertex(layer, meta, axis, across)
+        if start is None:
+            ends.append(_add_vertex(layer, ids, *_point(axis, split, across)))
+        else:
+            ends.append(_vertex_on_line(layer, start, axis, split, ids, walls))
+
+    wall_id = ids()
+    layer["lines"][wall_id] = create_wall(wall_id, ends[0], ends[1])
+    for vid in ends:
+        layer["vertices"][vid]["lines"].append(wall_id)
+
+    door_id = ids("door")
+    layer["holes"][door_id] = create_door(door_id, wall_id, 0.5)
+    layer["lines"][wall_id]["holes"].append(door_id)
+
+    # The existing room keeps the low part
+    _rescale_room(layer, meta, target, axis, low, high - low, split - low)
+    bounds[axis + 2] = split
+
+    # Build the new room through the generator's own area, label and furniture steps
+    room = process_custom_room(room_spec)
+    new_bounds = list(bounds)
+    new_bounds[axis], new_bounds[axis + 2] = split, high
+    x1, y1, x2, y2 = new_bounds
+    corners = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+
+    model = DesignModel()
+    area_vertices = []
+    for x, y in corners:
+        vid = ids()
+        model.add_vertex(vid, x, y)
+        area_vertices.append(vid)
+    new_area = ids("area")
+    model.add_area(new_area, room['name'], room['type'], area_vertices, room.get('floor_tile'))
+    placement = model.add_room(room, new_area, corners, new_bounds)
+    placement.label = model.add_label(ids("label"), room['name'], (x1 + x2) / 2, (y1 + y2) / 2, room['type'], x2 - x1).id
+    door_ends = [layer["vertices"][vid] for vid in ends]
+    door = door_clearance(door_ends[0]["x"], door_ends[0]["y"], door_ends[1]["x"], door_ends[1]["y"], 0.5,
+                          CATALOG.dims.door_width)
+    add_furniture_and_accessories(model, model.rooms, ids, [door])
+
+    for table, elements in serialize_layer(model).items():
+        layer[table].update(elements)
+
+    walls.add(wall_id)
+    rooms.add(new_area)
+    _relink(layer, walls, rooms)
+    return [target, new_area]
+
+def remove_room(layer, area_id, into=None):
+    """Remove a room, merging its space into a neighbour that shares one of its whole walls"""
+    meta = _room_meta(layer, area_id)
+    into = find_room(layer, into) if into is not None else None
+
+    best = None
+    for side in SIDES:
+        shared = full_side_neighbour(layer, area_id, side)
+        if shared is None or (into is not None and shared[1] != into):
+            continue
+        axis, _ = SIDES[side]
+        length = meta["bounds"][3 - axis] - meta["bounds"][1 - axis]
+        if best is None or length > best[0]:
+            best = length, side, shared
+    if best is None:
+        raise ValueError("No neighbouring room shares a whole wall with this room, so it cannot be merged away")
+
+    _, side, (wall_id, neighbour_id) = best
+    axis, index = SIDES[side]
+    bounds = meta["bounds"]
+    neighbour_meta = layer["areas"][neighbour_id]["misc"]
+    neighbour = neighbour_meta["bounds"]
+    opposite = index - 2 if index >= 2 else index + 2
+
+    walls = set(meta["walls"]) | set(neighbour_meta["walls"])
+    rooms = set(meta["walls"].values()) | set(neighbour_meta["walls"].values())
+    rooms.discard(None)
+    rooms.discard(area_id)
+
+    # Drop the room's own elements and the wall between the two rooms
+    for item_id in [meta.get("label")] + meta.get("items", []):
+        layer["items"].pop(item_id, None)
+    area = layer["areas"].pop(area_id)
+    for vid in area["vertices"]:
+        _drop_vertex_if_unused(layer, vid)
+    _delete_wall(layer, wall_id)
+
+    # The neighbour stretches over the freed space
+    fixed = neighbour[index]
+    _rescale_room(layer, neighbour_meta, neighbour_id, axis, fixed,
+                  abs(neighbour[opposite] - fixed), abs(bounds[opposite] - fixed))
+    neighbour[opposite] = bounds[opposite]
+
+    _relink(layer, walls, rooms)
+    return [neighbour_id]
+
+def set_tile(layer, area_id, tile):
+    """Change a room's floor texture"""
+    if not tile:
+        raise ValueError("tile is required")
+    texture = floor_texture(tile)
+    if texture is None:
+        raise ValueError(f"Unknown tile {tile!r}; use one of {', '.join(CATALOG.textures)}")
+
+    layer["areas"][area_id]["properties"]["texture"] = texture
+    return [area_id]
+
+def apply_edit(design, edit, layer_id=None):
+    """Apply one room edit to a design in place; returns the area ids of the rooms it changed"""
+    if not isinstance(edit, dict) or edit.get("op") not in EDIT_OPS:
+        raise ValueError(f"edit.op must be one of {', '.join(EDIT_OPS)}")
+
+    layer = _get_layer(design, layer_id)
+    op = edit["op"]
+
+    if op == "add_room":
+        room_spec = edit.get("room")
+        if not isinstance(room_spec, dict) or not room_spec.get("name"):
+            raise ValueError("add_room needs a room object with a name")
+        return add_room(layer, room_spec, edit.get("target"), edit.get("fraction", 0.5))
+
+    area_id = find_room(layer, edit.get("room"))
+    if op == "remove_room":
+        return remove_room(layer, area_id, edit.get("into"))
+    if op == "resize_room":
+        try:
+            delta = float(edit.get("delta"))
+        except (TypeError, ValueError):
+            raise ValueError("resize_room needs a numeric delta in cm")
+        return resize_room(layer, area_id, delta, edit.get("side"))
+    return set_tile(layer, area_id, edit.get("tile"))
@@ -0,0 +1,262 @@
+"""
+Feature vectors of designs for similar-design lookups.
+
+A design is described by its categorical fields (space type, style, user
+priority, layout), its storey count, a log-scale bucket of its footprint area,
+the exact footprint it was requested at (when known) and a count per room
+type. Room counts are packed into one byte per catalog
+room type, so a stored vector is a short blob and a batch of candidates
+decodes into a single uint8 matrix.
+
+Distance is the L1 distance of the room counts plus fixed penalties for
+each mismatched field, each storey of difference and each area bucket of
+difference. FeatureIndex holds every indexed design's features as NumPy
+columns (categorical fields as small integer codes), so a k-nearest query
+scores its whole scope in a few vectorised passes: about 60 MB and under
+10 ms per million designs. Serving a stored design in place of a new one
+additionally requires the same requested footprint, since the area bucket
+alone cannot tell a 20 x 4 m plan from a 9 x 9 m one.
+"""
+
+import hashlib
+import math
+import threading
+from collections import Counter, namedtuple
+from itertools import islice
+
+import numpy as np
+
+from .catalog import CATALOG, FALLBACK_ROOM_TYPE
+from .design_generator import footprint_cm
+from .design_utils import floor_count, process_room_requirements
+from .vector_export import design_bounds
+
+ROOM_TYPES = tuple(CATALOG.room_types)
+_ROOM_INDEX = {name: i for i, name in enumerate(ROOM_TYPES)}
+
+# Stored vectors are only comparable with the room type order they were packed in
+FEATURE_VERSION = hashlib.sha1(",".join(ROOM_TYPES).encode("utf-8")).hexdigest()[:8]
+
+# Footprint areas within a factor of this share a bucket
+AREA_BUCKET_RATIO = 1.25
+
+# Distance penalties
+AREA_WEIGHT = 1.0  # per area bucket
+FLOOR_WEIGHT = 2.0  # per storey
+CATEGORY_WEIGHT = 1.0  # per mismatched style, user priority or layout
+
+Features = namedtuple("Features", [
+    "space_type", "style", "user_priority", "layout", "floors", "area_bucket",
+    "width_cm", "height_cm",  # Requested footprint, None when unknown
+    "room_counts"  # bytes
+])
+
+def area_bucket(area_m2):
+    """Log-scale bucket of a footprint area in square metres"""
+    return int(round(math.log(max(float(area_m2), 1.0)) / math.log(AREA_BUCKET_RATIO)))
+
+def pack_room_counts(room_types):
+    """Room-type vector (one byte per catalog room type) of an iterable of room type names"""
+    counts = [0] * len(ROOM_TYPES)
+    fallback = _ROOM_INDEX[FALLBACK_ROOM_TYPE]
+    for name, count in Counter(room_types).items():
+        index = _ROOM_INDEX.get(name, fallback)
+        counts[index] = min(counts[index] + count, 255)
+    return bytes(counts)
+
+def requirement_features(requirements):
+    """Features of the design a set of requirements asks for"""
+    rooms = process_room_requirements(requirements)
+    width = float(requirements.get('width_meters', 10) or 10)
+    height = float(requirements.get('height_meters', 8) or 8)
+    width_cm, height_cm = footprint_cm(requirements)
+    return Features(
+        space_type=requirements.get('space_type', 'apartment'),
+        style=requirements.get('style', 'modern'),
+        user_priority=requirements.get('user_priority', 'functionality'),
+        layout=requirements.get('layout', 'grid'),
+        floors=floor_count(requirements),
+        area_bucket=area_bucket(width * height),
+        width_cm=width_cm,
+        height_cm=height_cm,
+        room_counts=pack_room_counts(room['type'] for room in rooms)
+    )
+
+def design_features(design):
+    """Features read from a design alone; its space type, style, priority and requested footprint are unknown
+
+    Generated plans can outgrow their requested footprint, so it is not read back from the geometry.
+    """
+    layers = sorted(design.get("layers", {}).values(), key=lambda layer: layer.get("order", 0))
+    ground = layers[0] if layers else {}
+    room_types = ((area.get("misc") or {}).get("room_type") for area in ground.get("areas", {}).values())
+
+    min_x, min_y, max_x, max_y = design_bounds({"layers": {"ground": ground}})
+    return Features(
+        space_type=None,
+        style=None,
+        user_priority=None,
+        layout=None,
+        floors=max(len(layers), 1),
+        area_bucket=area_bucket((max_x - min_x) * (max_y - min_y) / 10000),
+        width_cm=None,
+        height_cm=None,
+        room_counts=pack_room_counts(room_type for room_type in room_types if room_type)
+    )
+
+def reusable_requirements(requirements):
+    """Whether a design generated from these requirements may be served to other users
+
+    Only layouts driven by plain parameters qualify: custom room names and per-floor
+    overrides carry user-written content or change the design beyond its features.
+    """
+    return not requirements.get('rooms') and not requirements.get('floor_overrides')
+
+# Categorical fields, stored as integer codes (-1 for unknown)
+_CATEGORIES = ("space_type", "style", "user_priority", "layout")
+
+# FeatureIndex columns: (name, dtype, per-row shape)
+_COLUMNS = (
+    ("ids", np.int64, ()), ("users", np.int64, ()), ("shared", np.bool_, ()), ("live", np.bool_, ()),
+    ("floors", np.int16, ()), ("buckets", np.int16, ()), ("totals", np.int16, ()),
+    ("widths", np.int32, ()), ("heights", np.int32, ()),  # -1 when unknown
+    ("categories", np.int16, (len(_CATEGORIES),)), ("counts", np.uint8, (len(ROOM_TYPES),))
+)
+
+class FeatureIndex:
+    """In-memory columns of indexed design features, for vectorised k-nearest searches
+
+    Rows are appended as the features table grows (last_id is the highest design id
+    seen) and flagged when their design is deleted. Columns grow into new arrays with
+    spare capacity, so a search scores a consistent snapshot outside the lock.
+    """
+
+    __slots__ = ("size", "last_id", "_columns", "_codes", "_lock")
+
+    def __init__(self):
+        self.size = 0
+        self.last_id = 0
+        self._columns = {name: np.zeros((0,) + shape, dtype=dtype) for name, dtype, shape in _COLUMNS}
+        self._codes = {field: {} for field in _CATEGORIES}
+        self._lock = threading.Lock()
+
+    def _reserve(self, count):
+        capacity = len(self._columns["ids"])
+        if self.size + count <= capacity:
+            return
+        capacity = max(1024, 2 * capacity, self.size + count)
+        for name, dtype, shape in _COLUMNS:
+            column = np.zeros((capacity,) + shape, dtype=dtype)
+            column[:self.size] = self._columns[name][:self.size]
+            self._columns[name] = column
+
+    def _code(self, field, value, add=False):
+        if value is None:
+            return -1
+        codes = self._codes[field]
+        if value not in codes:
+            if not add:
+                return -2  # Matches nothing indexed
+            codes[value] = len(codes)
+        return codes[value]
+
+    def add(self, rows, chunk=10000):
+        """Append rows of (design_id, user_id, shared, space_type, style, user_priority, layout,
+        floors, area_bucket, width_cm, height_cm, room_counts), in ascending design_id order"""
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, chunk))
+            if not batch:
+                return
+            ids, users, shared, *categories, floors, buckets, widths, heights, room_counts = zip(*batch)
+            with self._lock:
+                self._reserve(len(batch))
+                codes = [[self._code(field, value, add=True) for value in values]
+                         for field, values in zip(_CATEGORIES, categories)]
+                end = self.size + len(batch)
+                columns = {name: column[self.size:end] for name, column in self._columns.items()}
+                columns["ids"][:], columns["users"][:] = ids, users
+                columns["shared"][:], columns["live"][:] = [bool(value) for value in shared], True
+                columns["floors"][:], columns["buckets"][:] = [value or 1 for value in floors], buckets
+                columns["widths"][:] = [-1 if value is None else value for value in widths]
+                columns["heights"][:] = [-1 if value is None else value for value in heights]
+                columns["categories"][:] = np.array(codes, dtype=np.int16).T
+                columns["counts"][:] = np.frombuffer(b"".join(room_counts), dtype=np.uint8).reshape(len(batch), -1)
+                columns["totals"][:] = columns["counts"].sum(axis=1)
+                self.size = end
+                self.last_id = max(self.last_id, ids[-1])
+
+    def remove(self, design_id):
+        """Leave a deleted design out of later searches"""
+        with self._lock:
+            ids = self._columns["ids"][:self.size]
+            self._columns["live"][:self.size][ids == design_id] = False
+
+    def nearest(self, features, k=10, user_id=None, shared=False, max_distance=None, exclude_id=None,
+                same_footprint=False):
+        """[(design_id, distance)] of the k nearest live designs in scope, nearest first
+
+        The scope is one user's designs (user_id) or the shared ones (shared=True),
+        the latter limited to the query's space type when it is known. same_footprint
+        keeps only designs requested at exactly the query's footprint, so none when
+        the query's is unknown.
+        """
+        if same_footprint and (features.width_cm is None or features.height_cm is None):
+            return []
+
+        with self._lock:
+            size = self.size
+            columns = {name: column[:size] for name, column in self._columns.items()}
+            space_type = self._code("space_type", features.space_type)
+            query = [self._code(field, getattr(features, field)) for field in _CATEGORIES[1:]]
+
+        mask = columns["live"].copy()
+        if user_id is not None:
+            mask &= columns["users"] == user_id
+        if shared:
+            mask &= columns["shared"]
+            if space_type != -1:
+                mask &= columns["categories"][:, 0] == space_type
+        if exclude_id is not None:
+            mask &= columns["ids"] != exclude_id
+        if same_footprint:
+            mask &= (columns["widths"] == features.width_cm) & (columns["heights"] == features.height_cm)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return []
+
+        # Everything but the room counts, plus the difference of room totals: a lower bound
+        # of the distance (|sum a - sum b| <= L1(a, b)) that prunes most rows before the L1
+        reference = np.frombuffer(features.room_counts, dtype=np.uint8).astype(np.int16)
+        distance = AREA_WEIGHT * np.abs(columns["buckets"][rows] - features.area_bucket).astype(np.float32)
+        distance += FLOOR_WEIGHT * np.abs(columns["floors"][rows] - features.floors)
+        categories = columns["categories"][rows]
+        for column, code in enumerate(query, start=1):
+            if code != -1:
+                distance += CATEGORY_WEIGHT * (categories[:, column] != code)
+        total_gap = np.abs(columns["totals"][rows] - int(reference.sum()))
+        bound = distance + total_gap
+
+        limit = max_distance
+        if len(rows) > k:
+            # The exact distances of the k best-bounded rows cap the k-th nearest distance
+            best = np.argpartition(bound, k - 1)[:k]
+            cap = (distance[best] + self._room_distance(columns, rows[best], reference)).max()
+            limit = cap if limit is None else min(limit, cap)
+        if limit is not None:
+            keep = bound <= limit
+            rows, distance = rows[keep], distance[keep]
+        distance += self._room_distance(columns, rows, reference)
+
+        if max_distance is not None:
+            keep = distance <= max_distance
+            rows, distance = rows[keep], distance[keep]
+        if len(rows) > k:
+            best = np.argpartition(distance, k - 1)[:k]
+            rows, distance = rows[best], distance[best]
+        order = np.argsort(distance, kind="stable")
+        return [(int(columns["ids"][rows[i]]), float(distance[i])) for i in order]
+
+    @staticmethod
+    def _room_distance(columns, rows, reference):
+        return np.abs(columns["counts"][rows].astype(np.int16) - reference).sum(axis=1)
@@ -1,10 +1,16 @@
 import json
 import math
 import random
-from collections import defaultdict
+from collections import deque
 
-from config import Config
-from .design_utils import generate_unique_id
+from .design_cache import design_cache, design_cache_key
+from .design_model import HOLE_DOOR, HOLE_ENTRANCE, HOLE_WINDOW, DesignModel, Label
+from .catalog import CATALOG, catalog_item, floor_texture, room_type as catalog_room_type
+from .design_utils import IdAllocator, floor_count
+from .furniture_placer import FurniturePlacer, door_clearance
+from .layout_core import compute_grid_geometry
+from .timing import span
+from .treemap import shared_segments, squarify
 
 def create_base_structure():
     """Create the base JSON structure for a floor plan"""
@@ -38,7 +44,7 @@ def create_base_structure():
         "guides": {"horizontal": {}, "vertical": {}, "circular": {}}
     }
 
-def create_vertex(vid, x, y):
+def create_vertex(vid, x, y, lines=None, areas=None):
     """Create a vertex object"""
     return {
         "id": vid,
@@ -51,11 +57,11 @@ def create_vertex(vid, x, y):
         "visible": True,
         "x": x,
         "y": y,
-        "lines": [],
-        "areas": []
+        "lines": [] if lines is None else lines,
+        "areas": [] if areas is None else areas
     }
 
-def create_wall(wid, v1, v2):
+def create_wall(wid, v1, v2, holes=None):
     """Create a wall object with better textures"""
     return {
         "id": wid,
@@ -65,20 +71,20 @@ def create_wall(wid, v1, v2):
         "misc": {},
         "selected": False,
         "properties": {
-            "height": {"length": Config.PROFESSIONAL_CONFIG["wall_height"]},
-            "thickness": {"length": Config.PROFESSIONAL_CONFIG["wall_thickness"]},
-            "textureA": Config.PROFESSIONAL_CONFIG["wall_texture_a"],  # From config
-            "textureB": Config.PROFESSIONAL_CONFIG["wall_texture_b"]   # From config
+            "height": {"length": CATALOG.dims.wall_height},
+            "thickness": {"length": CATALOG.dims.wall_thickness},
+            "textureA": CATALOG.dims.wall_texture_a,  # From config
+            "textureB": CATALOG.dims.wall_texture_b   # From config
         },
         "visible": True,
         "vertices": [v1, v2],
-        "holes": []
+        "holes": [] if holes is None else holes
     }
 
 def create_door(did, wall_id, offset=0.5, width=None, is_main_entrance=False):
     """Create a door object - only main entrance is sliding door"""
     if width is None:
-        width = Config.PROFESSIONAL_CONFIG["door_width"]
+        width = CATALOG.dims.door_width
 
     if is_main_entrance:
         # Main entrance - sliding door
@@ -91,7 +97,7 @@ def create_door(did, wall_id, offset=0.5, width=None, is_main_entrance=False):
             "selected": False,
             "properties": {
                 "width": {"length": max(200, width), "unit": "cm"},
-                "height": {"length": Config.PROFESSIONAL_CONFIG["door_height"], "unit": "cm"},
+                "height": {"length": CATALOG.dims.door_height, "unit": "cm"},
                 "altitude": {"length": 0, "unit": "cm"},
                 "thickness": {"length": 30, "unit": "cm"},
                 "flip_horizontal": "none",
@@ -112,7 +118,7 @@ def create_door(did, wall_id, offset=0.5, width=None, is_main_entrance=False):
             "selected": False,
             "properties": {
                 "width": {"length": width, "unit": "cm"},
-                "height": {"length": Config.PROFESSIONAL_CONFIG["door_height"], "unit": "cm"},
+                "height": {"length": CATALOG.dims.door_height, "unit": "cm"},
                 "altitude": {"length": 0, "unit": "cm"},
                 "thickness": {"length": 30, "unit": "cm"},
                 "flip_orizzontal": False
@@ -132,9 +138,9 @@ def create_window(wid, wall_id, offset=0.5):
         "misc": {},
         "selected": False,
         "properties": {
-            "width": {"length": Config.PROFESSIONAL_CONFIG["window_width"], "unit": "cm"},
-            "height": {"length": Config.PROFESSIONAL_CONFIG["window_height"], "unit": "cm"},
-            "altitude": {"length": Config.PROFESSIONAL_CONFIG["window_altitude"], "unit": "cm"},
+            "width": {"length": CATALOG.dims.window_width, "unit": "cm"},
+            "height": {"length": CATALOG.dims.window_height, "unit": "cm"},
+            "altitude": {"length": CATALOG.dims.window_altitude, "unit": "cm"},
             "thickness": {"length": 30, "unit": "cm"}
         },
         "visible": True,
@@ -142,23 +148,19 @@ def create_window(wid, wall_id, offset=0.5):
         "line": wall_id
     }
 
-def create_area(aid, room_name, room_type, vertices, custom_texture=None):
+def create_area(aid, room_name, room_type, vertices, custom_texture=None, misc=None):
     """Create an area object for a room with appropriate texture"""
+    # A requested tile the catalog lacks falls back to the room type's own texture
+    texture = catalog_room_type(room_type).texture
     if custom_texture:
-        texture = custom_texture
-    else:
-        texture = Config.PROFESSIONAL_CONFIG["room_types"][room_type]["texture"]
-
-    # Map to special textures if available
-    if texture in Config.PROFESSIONAL_CONFIG["special_textures"]:
-        texture = Config.PROFESSIONAL_CONFIG["special_textures"][texture]
+        texture = floor_texture(custom_texture, texture)
 
     return {
         "id": aid,
         "type": "area",
         "prototype": "areas",
         "name": room_name,
-        "misc": {},
+        "misc": {} if misc is None else misc,
         "selected": False,
         "properties": {
             "patternColor": "#F5F4F4",
@@ -172,9 +174,9 @@ def create_area(aid, room_name, room_type, vertices, custom_texture=None):
 
 def create_room_label(label_id, room_name, x, y, room_type, room_width):
     """Create a text label for a room"""
-    room_config = Config.PROFESSIONAL_CONFIG["room_types"][room_type]
-    font_size = room_config.get("label_font_size", 30)
-    bg_color = room_config.get("label_color", "#FFFFFF")
+    room_config = catalog_room_type(room_type)
+    font_size = room_config.label_font_size
+    bg_color = room_config.label_color
 
     # Adjust font size based on room width
     if room_width > 400:
@@ -207,431 +209,436 @@ def create_room_label(label_id, room_name, x, y, room_type, room_width):
         "rotation": 0
     }
 
-def is_door_position_available(wall_id, offset, holes, walls, min_distance=0.15):
-    """Check if a door position is available on a wall"""
-    if wall_id not in walls:
-        return False
-
-    wall = walls[wall_id]
-    wall_holes = wall.get("holes", [])
-
-    # Check if this wall already has any door
-    for hole_id in wall_holes:
-        if hole_id in holes:
-            hole = holes[hole_id]
-            if "door" in hole.get("type", "").lower():
-                # Wall already has a door - cannot add another
-                return False
-
-    # Check window proximity
-    for hole_id in wall_holes:
-        if hole_id in holes:
-            hole = holes[hole_id]
-            existing_offset = hole.get("offset", 0.5)
-            if abs(existing_offset - offset) < min_distance:
-                return False
-
-    return True
-
-def build_grid_layout(rooms, width_cm, height_cm):
+def create_furniture_item(item_id, item_type, x, y, rotation=0):
+    """Create a furniture item from the catalog"""
+    entry = catalog_item(item_type)
+    if not entry:
+        return None
+
+    return {
+        "id": item_id,
+        "type": entry.type,
+        "prototype": "items",
+        "name": entry.name,
+        "misc": {},
+        "selected": False,
+        "properties": {},
+        "visible": True,
+        "x": x,
+        "y": y,
+        "rotation": rotation
+    }
+
+def room_misc(placement):
+    """Room index kept in an area's misc so the design editor can work room by room"""
+    return {
+        "room_type": placement.room['type'],
+        "bounds": list(placement.bounds) if placement.bounds else None,
+        "label": placement.label,
+        "items": placement.items,
+        "walls": placement.walls
+    }
+
+class _PlannerWriter:
+    """Writes model elements as react-planner dicts, handing over the model's own lists"""
+
+    def __init__(self, placements=()):
+        self.placements = {placement.area_id: placement for placement in placements}
+
+    def vertex(self, vertex):
+        return create_vertex(vertex.id, vertex.x, vertex.y, vertex.lines, vertex.areas)
+
+    def wall(self, wall):
+        return create_wall(wall.id, wall.v1, wall.v2, wall.holes)
+
+    def hole(self, hole):
+        if hole.kind == HOLE_WINDOW:
+            return create_window(hole.id, hole.wall, hole.offset)
+        return create_door(hole.id, hole.wall, hole.offset, hole.width, is_main_entrance=hole.kind == HOLE_ENTRANCE)
+
+    def area(self, area):
+        placement = self.placements.get(area.id)
+        misc = room_misc(placement) if placement else None
+        return create_area(area.id, area.name, area.room_type, area.vertices, area.texture, misc)
+
+    def item(self, item):
+        if isinstance(item, Label):
+            return create_room_label(item.id, item.name, item.x, item.y, item.room_type, item.room_width)
+        return create_furniture_item(item.id, item.item_type, item.x, item.y, item.rotation)
+
+def _write_table(table, write):
+    """Write a model table out in order, then drop the model objects"""
+    written = {element_id: write(element) for element_id, element in table.items()}
+    table.clear()
+    return written
+
+def serialize_layer(model):
+    """Write a design model's element tables out as react-planner JSON (consumes the model)"""
+    writer = _PlannerWriter(model.rooms)
+    return {
+        "vertices": _write_table(model.vertices, writer.vertex),
+        "lines": _write_table(model.walls, writer.wall),
+        "holes": _write_table(model.holes, writer.hole),
+        "areas": _write_table(model.areas, writer.area),
+        "items": _write_table(model.items, writer.item)
+    }
+
+def serialize_design(model):
+    """Write a design model out as a single-layer react-planner design (consumes the model)"""
+    design = create_base_structure()
+    design["layers"]["layer-1"].update(serialize_layer(model))
+    return design
+
+def hole_span(kind, width=None):
+    """Width in cm a hole actually occupies on its wall"""
+    if kind == HOLE_WINDOW:
+        return CATALOG.dims.window_width
+
+    width = width or CATALOG.dims.door_width
+    return max(200, width) if kind == HOLE_ENTRANCE else width
+
+def place_hole(model, wall_id, kind, offset, ids, width=None):
+    """Place a hole as near to `offset` as the wall's openings allow; None if the wall has no room"""
+    openings = model.wall_openings(wall_id)
+    span = hole_span(kind, width)
+
+    # Short walls give up some clearance rather than refusing the hole
+    clearance = min(CATALOG.dims.opening_clearance, max(0.0, (openings.length - span) / 2))
+    center = openings.find_slot(offset * openings.length, span, clearance)
+    if center is None:
+        return None
+
+    openings.add(center, span)
+    hid = ids("win" if kind == HOLE_WINDOW else "door")
+    return model.add_hole(hid, wall_id, kind, center / openings.length, width)
+
+def _door_limits(room):
+    room_config = catalog_room_type(room['type'])
+    return room_config.min_doors, room_config.max_doors
+
+def assign_doors(model, rooms, wall_to_rooms, entrance_room, ids):
+    """Place interior doors so every room is reachable from the entrance and has its min_doors
+
+    wall_to_rooms maps each shared wall to the indices of the two rooms it separates.
+    Doors follow a breadth-first spanning tree of the room adjacency graph rooted at
+    the entrance room, so the cost is O(rooms + walls).
+    """
+    adjacency = [[] for _ in rooms]
+    for wall_id, (a, b) in wall_to_rooms.items():
+        if a != b:
+            adjacency[a].append((b, wall_id))
+            adjacency[b].append((a, wall_id))
+
+    limits = [_door_limits(room) for room in rooms]
+    doors = [0] * len(rooms)
+    used_walls = set()
+    if rooms:
+        doors[entrance_room] += 1
+
+    def connect(a, b, wall_id):
+        if wall_id in used_walls or not place_hole(model, wall_id, HOLE_DOOR, 0.5, ids):
+            return False
+        used_walls.add(wall_id)
+        doors[a] += 1
+        doors[b] += 1
+        return True
+
+    # Spanning tree walk; the first pass keeps rooms within max_doors, the
+    # second reaches anything that the limits (or too-short walls) cut off
+    reached = [False] * len(rooms)
+    if rooms:
+        reached[entrance_room] = True
+    for respect_max in (True, False):
+        queue = deque(index for index, is_reached in enumerate(reached) if is_reached)
+        while queue:
+            room = queue.popleft()
+            for neighbour, wall_id in adjacency[room]:
+                if reached[neighbour]:
+                    continue
+                if respect_max and doors[room] >= limits[room][1]:
+                    break
+                if connect(room, neighbour, wall_id):
+                    reached[neighbour] = True
+                    queue.append(neighbour)
+
+    # Top up rooms still short of min_doors on walls not used yet
+    for room, (min_doors, _) in enumerate(limits):
+        for neighbour, wall_id in adjacency[room]:
+            if doors[room] >= min_doors:
+                break
+            connect(room, neighbour, wall_id)
+
+    return doors
+
+def build_grid_layout(rooms, width_cm, height_cm, rng=None, ids=None):
     """Build a professional grid-based layout with guaranteed doors for all rooms"""
+    rng = rng or random.Random()
+    ids = ids or IdAllocator(rng)
     margin = 200
     x_start = margin
     y_start = margin
-    x_end = margin + width_cm
-    y_end = margin + height_cm
 
-    design = create_base_structure()
-    layer = design["layers"]["layer-1"]
-
-    vertices = {}
-    walls = {}
-    holes = {}
-    areas = {}
-    items = {}
-
-    # Calculate grid dimensions
-    num_rooms = len(rooms)
-    if num_rooms <= 4:
-        cols = 2
-        rows = math.ceil(num_rooms / 2)
-    elif num_rooms <= 9:
-        cols = 3
-        rows = math.ceil(num_rooms / 3)
-    else:
-        cols = 4
-        rows = math.ceil(num_rooms / 4)
+    model = DesignModel()
+
+    # Compute every coordinate for the layout up front
+    geometry = compute_grid_geometry(len(rooms), width_cm, height_cm, x_start, y_start, rng)
+    cell_width = geometry.cell_width
 
     # Create outer walls
     outer_vertices = []
-    for i in range(4):
-        if i == 0:
-            x, y = x_start, y_start
-        elif i == 1:
-            x, y = x_end, y_start
-        elif i == 2:
-            x, y = x_end, y_end
-        else:
-            x, y = x_start, y_end
-
-        vid = generate_unique_id()
-        vertices[vid] = create_vertex(vid, x, y)
+    for x, y in geometry.outer_corners:
+        vid = ids()
+        model.add_vertex(vid, x, y)
         outer_vertices.append(vid)
 
-    # Create outer walls
-    outer_walls = []
     outer_wall_ids = []
     for i in range(4):
-        v1 = outer_vertices[i]
-        v2 = outer_vertices[(i + 1) % 4]
-        wid = generate_unique_id()
-
-        walls[wid] = create_wall(wid, v1, v2)
-        vertices[v1]["lines"].append(wid)
-        vertices[v2]["lines"].append(wid)
-        outer_walls.append({"id": wid, "v1": v1, "v2": v2})
+        wid = ids()
+        model.add_wall(wid, outer_vertices[i], outer_vertices[(i + 1) % 4])
         outer_wall_ids.append(wid)
 
-    # Calculate cell dimensions
-    cell_width = (width_cm - 20) // cols
-    cell_height = (height_cm - 20) // rows
-
     # Create grid vertices
-    grid_vertices = {}
-    for row in range(rows + 1):
-        for col in range(cols + 1):
-            x = x_start + col * cell_width
-            y = y_start + row * cell_height
-
-            vid = generate_unique_id()
-            vertices[vid] = create_vertex(vid, x, y)
-            grid_vertices[(row, col)] = vid
+    grid_vertex_ids = []
+    for x, y in geometry.grid_points:
+        vid = ids()
+        model.add_vertex(vid, x, y)
+        grid_vertex_ids.append(vid)
 
     # Create interior walls (grid lines)
-    interior_walls = []
-    wall_grid_map = {}
     wall_to_cells = {}
-    wall_usage = {}
-    wall_to_rooms = defaultdict(list)
-
-    # Vertical dividers (between columns)
-    for col in range(1, cols):
-        for row in range(rows):
-            v1 = grid_vertices.get((row, col))
-            v2 = grid_vertices.get((row + 1, col))
-
-            if v1 and v2:
-                wid = generate_unique_id()
-                walls[wid] = create_wall(wid, v1, v2)
-                vertices[v1]["lines"].append(wid)
-                vertices[v2]["lines"].append(wid)
-                interior_walls.append(wid)
-                wall_grid_map[wid] = ("vertical", col, row)
-                wall_to_cells[wid] = [
-                    (row, col-1),
-                    (row, col)
-                ]
-                wall_usage[wid] = False
-
-    # Horizontal dividers (between rows)
-    for row in range(1, rows):
-        for col in range(cols):
-            v1 = grid_vertices.get((row, col))
-            v2 = grid_vertices.get((row, col + 1))
-
-            if v1 and v2:
-                wid = generate_unique_id()
-                walls[wid] = create_wall(wid, v1, v2)
-                vertices[v1]["lines"].append(wid)
-                vertices[v2]["lines"].append(wid)
-                interior_walls.append(wid)
-                wall_grid_map[wid] = ("horizontal", col, row)
-                wall_to_cells[wid] = [
-                    (row-1, col),
-                    (row, col)
-                ]
-                wall_usage[wid] = False
-
-    # Create room areas and store room info
-    room_areas = {}
-    cell_to_room = {}
-
-    for i, room in enumerate(rooms):
-        row = i // cols
-        col = i % cols
-
-        # Add significant randomization to room dimensions (±30% variation for more visible differences)
-        width_variation = random.uniform(-0.3, 0.3)  # -30% to +30%
-        height_variation = random.uniform(-0.3, 0.3)  # -30% to +30%
-
-        room_cell_width = cell_width * (1 + width_variation)
-        room_cell_height = cell_height * (1 + height_variation)
 
-        # Ensure minimum size (at least 50% of original)
-        room_cell_width = max(room_cell_width, cell_width * 0.5)
-        room_cell_height = max(room_cell_height, cell_height * 0.5)
+    for (i1, i2), cells in zip(geometry.wall_pairs, geometry.wall_cells):
+        wid = ids()
+        model.add_wall(wid, grid_vertex_ids[i1], grid_vertex_ids[i2])
+        wall_to_cells[wid] = [tuple(cell) for cell in cells]
 
-        # Ensure maximum size (no more than 150% of original)
-        room_cell_width = min(room_cell_width, cell_width * 1.5)
-        room_cell_height = min(room_cell_height, cell_height * 1.5)
-
-        # Get room boundaries with randomized dimensions
-        x1 = x_start + col * cell_width
-        y1 = y_start + row * cell_height
-        x2 = x1 + room_cell_width
-        y2 = y1 + room_cell_height
+    # Create room areas, mapping each grid cell to the index of the room in it
+    cell_to_room = {}
 
-        # Create custom area vertices for this room with slight randomization
+    for index, (room, (row, col), (x1, y1, x2, y2), corners) in enumerate(
+            zip(rooms, geometry.room_cells, geometry.room_boxes, geometry.room_corners)):
+        # Jittered TL, TR, BR, BL corners for this room's area
         area_vertices = []
-
-        # Top-left corner
-        tl_x = x1 + random.uniform(0, room_cell_width * 0.2)
-        tl_y = y1 + random.uniform(0, room_cell_height * 0.2)
-        tl_id = generate_unique_id()
-        vertices[tl_id] = create_vertex(tl_id, tl_x, tl_y)
-        area_vertices.append(tl_id)
-
-        # Top-right corner
-        tr_x = x2 - random.uniform(0, room_cell_width * 0.2)
-        tr_y = y1 + random.uniform(0, room_cell_height * 0.2)
-        tr_id = generate_unique_id()
-        vertices[tr_id] = create_vertex(tr_id, tr_x, tr_y)
-        area_vertices.append(tr_id)
-
-        # Bottom-right corner
-        br_x = x2 - random.uniform(0, room_cell_width * 0.2)
-        br_y = y2 - random.uniform(0, room_cell_height * 0.2)
-        br_id = generate_unique_id()
-        vertices[br_id] = create_vertex(br_id, br_x, br_y)
-        area_vertices.append(br_id)
-
-        # Bottom-left corner
-        bl_x = x1 + random.uniform(0, room_cell_width * 0.2)
-        bl_y = y2 - random.uniform(0, room_cell_height * 0.2)
-        bl_id = generate_unique_id()
-        vertices[bl_id] = create_vertex(bl_id, bl_x, bl_y)
-        area_vertices.append(bl_id)
+        for x, y in corners:
+            vid = ids()
+            model.add_vertex(vid, x, y)
+            area_vertices.append(vid)
 
         # Create area with custom floor tile if specified
-        aid = generate_unique_id("area")
-        floor_tile = room.get('floor_tile')
-        areas[aid] = create_area(aid, room['name'], room['type'], area_vertices, floor_tile)
-
-        # Store room area info
-        room_areas[room['name']] = {
-            'area_id': aid,
-            'x1': x1, 'y1': y1,
-            'x2': x2, 'y2': y2,
-            'type': room['type'],
-            'vertices': area_vertices,
-            'grid_position': (row, col),
-            'cell_row': row,
-            'cell_col': col,
-            'adjacent_walls': [],
-            'doors_needed': Config.PROFESSIONAL_CONFIG["room_types"][room['type']]["min_doors"]
-        }
+        aid = ids("area")
+        model.add_area(aid, room['name'], room['type'], area_vertices, room.get('floor_tile'))
+        cell_x = x_start + col * cell_width
+        cell_y = y_start + row * geometry.cell_height
+        placement = model.add_room(room, aid, corners, (cell_x, cell_y, cell_x + cell_width, cell_y + geometry.cell_height))
 
-        # Map cell to room
-        cell_to_room[(row, col)] = room['name']
+        cell_to_room[(row, col)] = index
 
         # Add room label
-        label_x = (x1 + x2) / 2
-        label_y = (y1 + y2) / 2
-        label_id = generate_unique_id("label")
-        items[label_id] = create_room_label(label_id, room['name'], label_x, label_y, room['type'], cell_width)
+        label_id = ids("label")
+        model.add_label(label_id, room['name'], (x1 + x2) / 2, (y1 + y2) / 2, room['type'], cell_width)
+        placement.label = label_id
 
     # Add main entrance sliding door
     bottom_wall = None
-    for wall_info in outer_walls:
-        v1_coords = (vertices[wall_info["v1"]]["x"], vertices[wall_info["v1"]]["y"])
-        v2_coords = (vertices[wall_info["v2"]]["x"], vertices[wall_info["v2"]]["y"])
-
-        if abs(v1_coords[1] - y_start) < 10 and abs(v2_coords[1] - y_start) < 10:
-            bottom_wall = wall_info["id"]
+    for wall_id in outer_wall_ids:
+        wall = model.walls[wall_id]
+        if abs(model.vertices[wall.v1].y - y_start) < 10 and abs(model.vertices[wall.v2].y - y_start) < 10:
+            bottom_wall = wall_id
             break
 
+    entrance_room = 0
     if bottom_wall:
-        entrance_id = generate_unique_id("door")
         main_door_offset = 0.1  # Position towards the left side
-        holes[entrance_id] = create_door(entrance_id, bottom_wall, main_door_offset, is_main_entrance=True)
-        walls[bottom_wall]["holes"].append(entrance_id)
-        wall_usage[bottom_wall] = True
+        entrance = place_hole(model, bottom_wall, HOLE_ENTRANCE, main_door_offset, ids)
 
-    # Add doors to rooms
-    shared_walls = {wall_id: rooms for wall_id, rooms in wall_to_rooms.items() if len(rooms) >= 2}
-    doors_per_room = defaultdict(int)
-
-    # Phase 1: Assign doors to rooms based on their needs
-    for room_name, room_info in room_areas.items():
-        doors_needed = room_info['doors_needed']
-        doors_added = 0
-
-        for wall_id in room_info['adjacent_walls']:
-            if wall_id in shared_walls and not wall_usage.get(wall_id, False):
-                if doors_added < doors_needed:
-                    possible_offsets = [0.3, 0.4, 0.5, 0.6, 0.7]
-                    for offset in possible_offsets:
-                        if is_door_position_available(wall_id, offset, holes, walls, 0.15):
-                            door_id = generate_unique_id("door")
-                            holes[door_id] = create_door(door_id, wall_id, offset, is_main_entrance=False)
-                            walls[wall_id]["holes"].append(door_id)
-                            wall_usage[wall_id] = True
-                            doors_per_room[room_name] += 1
-                            other_rooms = [r for r in shared_walls[wall_id] if r != room_name]
-                            if other_rooms:
-                                doors_per_room[other_rooms[0]] += 1
-                            doors_added += 1
-                            break
+        # The entrance opens into the first-row room whose cell it falls in
+        if entrance:
+            entrance_col = min(geometry.cols - 1, int(entrance.offset * width_cm // geometry.cell_width))
+            entrance_room = cell_to_room.get((0, entrance_col), 0)
 
-    # Add windows to outer walls
-    for wall_id in outer_wall_ids:
-        if wall_id != bottom_wall:
-            current_holes = walls[wall_id].get("holes", [])
-            has_door = False
-            for hole_id in current_holes:
-                if hole_id in holes and "door" in holes[hole_id].get("type", "").lower():
-                    has_door = True
-                    break
-
-            if not has_door:
-                num_windows = random.randint(1, 2)
-                for i in range(num_windows):
-                    offset = 0.2 + (i * 0.6 / max(1, num_windows))
-                    win_id = generate_unique_id("win")
-                    holes[win_id] = create_window(win_id, wall_id, offset)
-                    walls[wall_id]["holes"].append(win_id)
-
-    # Update layer with all components
-    layer["vertices"] = vertices
-    layer["lines"] = walls
-    layer["holes"] = holes
-    layer["areas"] = areas
-    layer["items"] = items
-
-    return design
-
-def create_furniture_item(item_type, x, y, rotation=0):
-    """Create a furniture item from the catalog"""
-    catalog_item = Config.PROFESSIONAL_CONFIG["furniture_catalog"].get(item_type)
-    if not catalog_item:
-        return None
-
-    item_id = generate_unique_id("item")
-
-    return {
-        "id": item_id,
-        "type": catalog_item["type"],
-        "prototype": "items",
-        "name": catalog_item["name"],
-        "misc": {},
-        "selected": False,
-        "properties": {},
-        "visible": True,
-        "x": x,
-        "y": y,
-        "rotation": rotation
-    }
+    # Rooms on either side of each interior wall
+    wall_to_rooms = {}
+    for wall_id, cells in wall_to_cells.items():
+        wall_rooms = [cell_to_room[cell] for cell in cells if cell in cell_to_room]
+        if len(wall_rooms) == 2:
+            wall_to_rooms[wall_id] = wall_rooms
+    link_room_walls(model, wall_to_rooms)
 
-def add_furniture_and_accessories(design, rooms_info):
-    """Add furniture and accessories to rooms based on catalog"""
-    layer = design["layers"]["layer-1"]
-    items = layer.get("items", {})
+    # Add doors to rooms
+    assign_doors(model, rooms, wall_to_rooms, entrance_room, ids)
 
-    for room_info in rooms_info:
-        room_name = room_info['name']
-        room_type = room_info['type']
+    # Add windows to outer walls
+    add_outer_windows(model, [wall_id for wall_id in outer_wall_ids if wall_id != bottom_wall], rng, ids)
 
-        room_config = Config.PROFESSIONAL_CONFIG["room_types"].get(room_type, {})
+    return model
 
-        # Find the area for this room
-        areas = layer.get("areas", {})
-        room_area = None
-        for area_id, area in areas.items():
-            if area.get("name") == room_name:
-                room_area = area
-                break
+def build_treemap_layout(rooms, width_cm, height_cm, rng=None, ids=None):
+    """Build a squarified-treemap layout: each room gets floor area in proportion to its size_ratio"""
+    rng = rng or random.Random()
+    ids = ids or IdAllocator(rng)
+    margin = 200
+    x_start = margin
+    y_start = margin
 
-        if not room_area:
-            continue
+    model = DesignModel()
+
+    # Partition the footprint; coordinates are rounded so shared edges match exactly
+    rects = squarify([room['size_ratio'] for room in rooms], x_start, y_start, width_cm, height_cm)
+    rects = [tuple(round(value, 2) for value in rect) for rect in rects]
+
+    # Walls are the atomic segments between rooms (or between a room and the outside)
+    vertex_at = {}
+
+    def vertex_id(point):
+        vid = vertex_at.get(point)
+        if vid is None:
+            vid = vertex_at[point] = ids()
+            model.add_vertex(vid, point[0], point[1])
+        return vid
+
+    wall_to_rooms = {}
+    outer_walls = {}
+    for start, end, owners in shared_segments(rects):
+        wid = ids()
+        model.add_wall(wid, vertex_id(start), vertex_id(end))
+        if len(owners) == 2:
+            wall_to_rooms[wid] = owners
+        else:
+            outer_walls[wid] = owners[0]
+    outer_wall_ids = list(outer_walls)
 
-        # Get room vertices to calculate center
-        vertices = room_area.get("vertices", [])
-        if not vertices:
-            continue
+    # Room areas and labels
+    for room, (x1, y1, x2, y2) in zip(rooms, rects):
+        corners = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+        area_vertices = []
+        for x, y in corners:
+            vid = ids()
+            model.add_vertex(vid, x, y)
+            area_vertices.append(vid)
+
+        aid = ids("area")
+        model.add_area(aid, room['name'], room['type'], area_vertices, room.get('floor_tile'))
+        placement = model.add_room(room, aid, corners, (x1, y1, x2, y2))
+        placement.label = model.add_label(ids("label"), room['name'], (x1 + x2) / 2, (y1 + y2) / 2, room['type'], x2 - x1).id
+
+    # Main entrance on the longest stretch of the y_start facade
+    entrance_wall = None
+    entrance_room = 0
+    facade = [wall_id for wall_id in outer_wall_ids
+              if model.vertices[model.walls[wall_id].v1].y == y_start == model.vertices[model.walls[wall_id].v2].y]
+    if facade:
+        entrance_wall = max(facade, key=model.wall_length)
+        if place_hole(model, entrance_wall, HOLE_ENTRANCE, 0.5, ids):
+            entrance_x = sum(model.vertices[v].x for v in (model.walls[entrance_wall].v1, model.walls[entrance_wall].v2)) / 2
+            entrance_room = next(index for index, (x1, y1, x2, _) in enumerate(rects)
+                                 if y1 == y_start and x1 <= entrance_x <= x2)
+
+    link_room_walls(model, wall_to_rooms)
+    link_outer_walls(model, outer_walls)
+    assign_doors(model, rooms, wall_to_rooms, entrance_room, ids)
+    add_outer_windows(model, [wall_id for wall_id in outer_wall_ids if wall_id != entrance_wall], rng, ids)
+
+    return model
+
+def link_room_walls(model, wall_to_rooms):
+    """Record on each room placement which shared walls it has and who is on the other side"""
+    for wall_id, (a, b) in wall_to_rooms.items():
+        first, second = model.rooms[a], model.rooms[b]
+        first.walls[wall_id] = second.area_id
+        second.walls[wall_id] = first.area_id
+
+def link_outer_walls(model, outer_walls):
+    """Record outer wall segments (wall id -> room index) on the room they bound"""
+    for wall_id, index in outer_walls.items():
+        model.rooms[index].walls[wall_id] = None
+
+def add_outer_windows(model, wall_ids, rng, ids):
+    """Add windows to outer walls, one per window_spacing on long facades"""
+    window_spacing = CATALOG.dims.window_spacing
+    for wall_id in wall_ids:
+        num_windows = max(rng.randint(1, 2), int(model.wall_length(wall_id) // window_spacing))
+        for i in range(num_windows):
+            offset = 0.2 + (i * 0.6 / max(1, num_windows - 1)) if num_windows > 1 else 0.2
+            place_hole(model, wall_id, HOLE_WINDOW, offset, ids)
+
+def footprint(item_type):
+    """Floor footprint (width, depth) of a catalog item in cm"""
+    entry = catalog_item(item_type)
+    return entry.footprint if entry else CATALOG.dims.default_footprint
+
+def centered_rect(x, y, width, depth):
+    return x - width / 2, y - depth / 2, x + width / 2, y + depth / 2
+
+def _room_region(placement, inset):
+    """Free floor of a room: its area's box, kept inside its walls"""
+    x1, y1, x2, y2 = placement.min_x, placement.min_y, placement.max_x, placement.max_y
+    if placement.bounds:
+        bx1, by1, bx2, by2 = placement.bounds
+        x1, y1, x2, y2 = max(x1, bx1), max(y1, by1), min(x2, bx2), min(y2, by2)
+    return x1 + inset, y1 + inset, x2 - inset, y2 - inset
+
+def add_furniture_and_accessories(model, room_index, ids=None, reserved=()):
+    """Add furniture and accessories to rooms based on catalog
+
+    room_index is the list of RoomPlacement the layout stage recorded in model.rooms.
+    Every requested item is placed without overlapping other items, walls or the swing
+    of any door; reserved is extra occupied rectangles (x1, y1, x2, y2), such as stairs.
+    Items that no longer fit in a full room are skipped.
+    """
+    ids = ids or IdAllocator()
+    placer = FurniturePlacer(CATALOG.dims.furniture_gap)
+
+    for rect in reserved:
+        placer.reserve(rect)
+
+    # Keep every door's swing clear, on both sides of its wall
+    for hole in model.holes.values():
+        if hole.is_door:
+            wall = model.walls[hole.wall]
+            v1, v2 = model.vertices[wall.v1], model.vertices[wall.v2]
+            placer.reserve(door_clearance(v1.x, v1.y, v2.x, v2.y, hole.offset, hole_span(hole.kind, hole.width)))
+
+    inset = CATALOG.dims.wall_thickness / 2
+
+    for placement in room_index:
+        room_info = placement.room
+        room_config = catalog_room_type(room_info['type'])
 
-        # Calculate approximate room center
-        vertex_coords = []
-        for vertex_id in vertices:
-            vertex = layer.get("vertices", {}).get(vertex_id)
-            if vertex:
-                vertex_coords.append((vertex["x"], vertex["y"]))
+        # Use furniture and accessories specified by AI, fallback to config defaults
+        furniture_list = room_info.get('furniture', []) or room_config.furniture
+        accessories_list = room_info.get('accessories', []) or room_config.accessories
 
-        if not vertex_coords:
-            continue
+        region = _room_region(placement, inset)
 
-        center_x = sum(x for x, y in vertex_coords) / len(vertex_coords)
-        center_y = sum(y for x, y in vertex_coords) / len(vertex_coords)
+        # Furniture first, so the larger pieces get first pick of the floor
+        for item_type in list(furniture_list) + list(accessories_list):
+            # Unknown catalog ids (after aliases) are skipped without spending an id
+            entry = catalog_item(item_type)
+            if entry is None:
+                continue
 
-        # Calculate approximate room bounds
-        min_x = min(x for x, y in vertex_coords)
-        max_x = max(x for x, y in vertex_coords)
-        min_y = min(y for x, y in vertex_coords)
-        max_y = max(y for x, y in vertex_coords)
+            spot = placer.place(region, *entry.footprint)
+            if spot is None:
+                continue
 
-        # Use furniture and accessories specified by AI, fallback to config defaults
-        furniture_list = room_info.get('furniture', [])
-        if not furniture_list:
-            furniture_list = room_config.get("furniture", [])
-
-        if furniture_list:
-            positions = [
-                (center_x - 100, center_y - 100),  # Top-left
-                (center_x + 100, center_y - 100),  # Top-right
-                (center_x - 100, center_y + 100),  # Bottom-left
-                (center_x + 100, center_y + 100),  # Bottom-right
-            ]
-
-            for i, furniture_type in enumerate(furniture_list[:4]):
-                if i < len(positions):
-                    x, y = positions[i]
-                    furniture_item = create_furniture_item(furniture_type, x, y)
-                    if furniture_item:
-                        items[furniture_item["id"]] = furniture_item
-
-        # Use accessories specified by AI, fallback to config defaults
-        accessories_list = room_info.get('accessories', [])
-        if not accessories_list:
-            accessories_list = room_config.get("accessories", [])
-
-        if accessories_list:
-            accessory_positions = [
-                (min_x + 50, min_y + 50),      # Near top-left corner
-                (max_x - 50, min_y + 50),      # Near top-right corner
-                (min_x + 50, max_y - 50),      # Near bottom-left corner
-                (max_x - 50, max_y - 50),      # Near bottom-right corner
-            ]
-
-            for i, accessory_type in enumerate(accessories_list[:4]):
-                if i < len(accessory_positions):
-                    x, y = accessory_positions[i]
-                    accessory_item = create_furniture_item(accessory_type, x, y)
-                    if accessory_item:
-                        items[accessory_item["id"]] = accessory_item
+            (x, y), rotation = spot
+            placement.items.append(model.add_item(ids("item"), entry.id, x, y, rotation).id)
 
-    return design
+    return model
 
-def smart_floor_plan_builder(requirements):
-    """Build a professional floor plan based on extracted requirements"""
-    space_type = requirements.get('space_type', 'apartment')
-    width_m = requirements.get('width_meters', 10)
-    height_m = requirements.get('height_meters', 8)
-    user_priority = requirements.get('user_priority', 'functionality')
+def stair_position(width_cm, height_cm):
+    """Where the stair core sits on every floor: the back corner of the footprint"""
+    margin = 200
+    inset = CATALOG.dims.stair_inset
+    return margin + width_cm - inset, margin + height_cm - inset
 
-    # Convert to cm
-    width_cm = int(width_m * 100)
-    height_cm = int(height_m * 100)
+def footprint_cm(requirements):
+    """Footprint width and height in cm, adjusted for the user's priority"""
+    width_cm = int(requirements.get('width_meters', 10) * 100)
+    height_cm = int(requirements.get('height_meters', 8) * 100)
 
     # Adjust size based on user priority
+    user_priority = requirements.get('user_priority', 'functionality')
     if user_priority == 'space_optimization':
         width_cm = int(width_cm * 0.9)
         height_cm = int(height_cm * 0.9)
@@ -639,15 +646,67 @@ def smart_floor_plan_builder(requirements):
         width_cm = int(width_cm * 1.2)
         height_cm = int(height_cm * 1.2)
 
+    return width_cm, height_cm
+
+def build_floor_model(requirements, rng, ids, stairs=None):
+    """Lay out and furnish one floor; stairs is an (x, y) stair core position or None"""
+    width_cm, height_cm = footprint_cm(requirements)
+
     # Import here to avoid circular imports
     from .design_utils import process_room_requirements
 
-    rooms = process_room_requirements(requirements)
+    with span("layout"):
+        rooms = process_room_requirements(requirements)
+
+        # Build professional layout
+        if requirements.get('layout') == 'treemap':
+            model = build_treemap_layout(rooms, width_cm, height_cm, rng, ids)
+        else:
+            model = build_grid_layout(rooms, width_cm, height_cm, rng, ids)
+
+    # Add furniture and accessories to the design, around the stair core if there is one
+    reserved = [centered_rect(stairs[0], stairs[1], *footprint("simple-stair"))] if stairs is not None else []
+    with span("furnish"):
+        model = add_furniture_and_accessories(model, model.rooms, ids, reserved)
+
+    if stairs is not None:
+        model.add_item(ids("item"), "simple-stair", stairs[0], stairs[1])
+
+    return model
+
+def smart_floor_plan_builder(requirements, seed=None, id_seed=None):
+    """Build a professional floor plan based on extracted requirements
+
+    With a seed the output is deterministic and served from the design cache when possible.
+    An id_seed draws element ids from their own stream, so successive designs in a session
+    reuse ids and diff compactly. Requirements with floors > 1 produce one layer per storey
+    (see floors.py); a malformed floor_overrides raises ValueError.
+    """
+    # Import here to avoid circular imports
+    from .floors import build_multistorey_design, check_floor_overrides, pack_instances, unpack_instances
+
+    check_floor_overrides(requirements)
+
+    if seed is not None:
+        cache_key = design_cache_key(requirements, seed if id_seed is None else [seed, id_seed])
+        cached = design_cache.get(cache_key)
+        if cached is not None:
+            return unpack_instances(cached)
+
+    # Per-call RNG and ID allocator so concurrent generations never share state
+    rng = random.Random(seed)
+
+    if floor_count(requirements) > 1:
+        design = build_multistorey_design(requirements, rng)
+    else:
+        ids = IdAllocator(rng if id_seed is None else random.Random(id_seed))
+        model = build_floor_model(requirements, rng, ids)
 
-    # Build professional layout
-    design = build_grid_layout(rooms, width_cm, height_cm)
+        # Write the react-planner JSON once, at the end
+        with span("serialize"):
+            design = serialize_design(model)
 
-    # Add furniture and accessories to the design
-    design = add_furniture_and_accessories(design, rooms)
+    if seed is not None:
+        design_cache.put(cache_key, pack_instances(design))
 
     return design
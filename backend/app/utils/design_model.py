@@ -0,0 +1,164 @@
+"""
+Compact in-memory design model used by the generator.
+
+Every element keeps only the fields the generator reads or writes. The
+react-planner dicts (with their misc/selected/visible/properties
+sub-dicts) are produced once, by serialize_design in design_generator.
+"""
+
+import math
+
+from .wall_openings import WallOpenings
+
+# Hole kinds
+HOLE_ENTRANCE = "entrance"
+HOLE_DOOR = "door"
+HOLE_WINDOW = "window"
+
+class Vertex:
+    __slots__ = ("id", "x", "y", "lines", "areas")
+
+    def __init__(self, vid, x, y):
+        self.id = vid
+        self.x = x
+        self.y = y
+        self.lines = []
+        self.areas = []
+
+class Wall:
+    __slots__ = ("id", "v1", "v2", "holes", "openings")
+
+    def __init__(self, wid, v1, v2):
+        self.id = wid
+        self.v1 = v1
+        self.v2 = v2
+        self.holes = []
+        self.openings = None
+
+class Hole:
+    __slots__ = ("id", "wall", "kind", "offset", "width")
+
+    def __init__(self, hid, wall_id, kind, offset, width=None):
+        self.id = hid
+        self.wall = wall_id
+        self.kind = kind
+        self.offset = offset
+        self.width = width
+
+    @property
+    def is_door(self):
+        return self.kind != HOLE_WINDOW
+
+class Area:
+    __slots__ = ("id", "name", "room_type", "vertices", "texture")
+
+    def __init__(self, aid, name, room_type, vertex_ids, texture=None):
+        self.id = aid
+        self.name = name
+        self.room_type = room_type
+        self.vertices = vertex_ids
+        self.texture = texture
+
+class Label:
+    __slots__ = ("id", "name", "x", "y", "room_type", "room_width")
+
+    def __init__(self, lid, name, x, y, room_type, room_width):
+        self.id = lid
+        self.name = name
+        self.x = x
+        self.y = y
+        self.room_type = room_type
+        self.room_width = room_width
+
+class Item:
+    __slots__ = ("id", "item_type", "x", "y", "rotation")
+
+    def __init__(self, iid, item_type, x, y, rotation=0):
+        self.id = iid
+        self.item_type = item_type
+        self.x = x
+        self.y = y
+        self.rotation = rotation
+
+class RoomPlacement:
+    """Where the layout put a room: its area, bounding box and centroid
+
+    bounds is the wall-enclosed cell (x1, y1, x2, y2) the room occupies; label, items
+    and walls (shared wall id -> neighbouring area id) are filled in as the room is built.
+    """
+    __slots__ = ("room", "area_id", "min_x", "min_y", "max_x", "max_y", "center_x", "center_y",
+                 "bounds", "label", "items", "walls")
+
+    def __init__(self, room, area_id, corners, bounds=None):
+        xs = [x for x, _ in corners]
+        ys = [y for _, y in corners]
+        self.room = room
+        self.area_id = area_id
+        self.bounds = bounds
+        self.label = None
+        self.items = []
+        self.walls = {}
+        self.min_x = min(xs)
+        self.min_y = min(ys)
+        self.max_x = max(xs)
+        self.max_y = max(ys)
+        self.center_x = sum(xs) / len(xs)
+        self.center_y = sum(ys) / len(ys)
+
+class DesignModel:
+    """Tables of model elements keyed by id, in insertion order, plus the room index"""
+    __slots__ = ("vertices", "walls", "holes", "areas", "items", "rooms")
+
+    def __init__(self):
+        self.vertices = {}
+        self.walls = {}
+        self.holes = {}
+        self.areas = {}
+        self.items = {}
+        self.rooms = []
+
+    def add_vertex(self, vid, x, y):
+        vertex = self.vertices[vid] = Vertex(vid, x, y)
+        return vertex
+
+    def add_wall(self, wid, v1, v2):
+        wall = self.walls[wid] = Wall(wid, v1, v2)
+        self.vertices[v1].lines.append(wid)
+        self.vertices[v2].lines.append(wid)
+        return wall
+
+    def wall_length(self, wid):
+        wall = self.walls[wid]
+        v1 = self.vertices[wall.v1]
+        v2 = self.vertices[wall.v2]
+        return math.hypot(v2.x - v1.x, v2.y - v1.y)
+
+    def wall_openings(self, wid):
+        """Interval index of the holes on a wall, built on first use"""
+        wall = self.walls[wid]
+        if wall.openings is None:
+            wall.openings = WallOpenings(self.wall_length(wid))
+        return wall.openings
+
+    def add_hole(self, hid, wall_id, kind, offset, width=None):
+        hole = self.holes[hid] = Hole(hid, wall_id, kind, offset, width)
+        self.walls[wall_id].holes.append(hid)
+        return hole
+
+    def add_area(self, aid, name, room_type, vertex_ids, texture=None):
+        area = self.areas[aid] = Area(aid, name, room_type, vertex_ids, texture)
+        return area
+
+    def add_room(self, room, area_id, corners, bounds=None):
+        """Index a room placed by the layout stage"""
+        placement = RoomPlacement(room, area_id, corners, bounds)
+        self.rooms.append(placement)
+        return placement
+
+    def add_label(self, lid, name, x, y, room_type, room_width):
+        label = self.items[lid] = Label(lid, name, x, y, room_type, room_width)
+        return label
+
+    def add_item(self, iid, item_type, x, y, rotation=0):
+        item = self.items[iid] = Item(iid, item_type, x, y, rotation)
+        return item
@@ -1,13 +1,82 @@
+import base64
 import json
 import math
 import random
 from collections import defaultdict
 
 from config import Config
+from .catalog import space_template
+from .room_classifier import classify_room
 
 # Store conversation history per session (could be moved to a database later)
 conversations = {}
 
+def process_custom_room(room, user_priority='functionality'):
+    """Process one explicitly requested room into a layout room"""
+    name = str(room.get('name', 'Room')).strip()
+    if not name or name.lower() == 'room':
+        name = "Room"
+
+    room_type = determine_room_type(name)
+
+    # Use room-type-specific default sizes, with AI override if specified
+    room_type_defaults = {
+        "bedroom": 2.0,    # Large bedrooms
+        "bathroom": 0.8,   # Small bathrooms
+        "kitchen": 1.5,    # Normal/medium kitchen
+        "living": 2.0,     # Large living room
+        "office": 2.5,     # Extra large office
+        "storage": 0.6,    # Very small storage
+        "dining": 1.5,     # Medium dining
+        "classroom": 2.5,  # Large classroom
+        "meeting": 2.0,    # Large meeting room
+        "reception": 1.8,  # Large reception
+        "consultation": 1.5, # Medium consultation
+        "waiting": 1.2,    # Medium-small waiting
+        "generic": 1.5     # Default medium
+    }
+
+    # Get default size for room type
+    size_ratio = room_type_defaults.get(room_type, 1.5)
+
+    # Allow AI to override if it specifies a size
+    size_label = str(room.get('size', '')).lower().strip()
+    if size_label:
+        size_to_ratio = {
+            "xsmall": 0.6, "tiny": 0.6, "compact": 0.8,
+            "small": 0.8,
+            "medium": 1.5, "standard": 1.5, "normal": 1.5,
+            "large": 2.0, "big": 2.0, "spacious": 2.0,
+            "xlarge": 2.5, "huge": 2.5, "master": 2.5
+        }
+        ai_size_ratio = size_to_ratio.get(size_label)
+        if ai_size_ratio:
+            size_ratio = ai_size_ratio
+
+    # Extract furniture, accessories, and floor tile from AI response
+    furniture = room.get('furniture', [])
+    accessories = room.get('accessories', [])
+    floor_tile = room.get('floor_tile', 'parquet')
+
+    return {
+        'name': name,
+        'type': room_type,
+        'size_ratio': size_ratio,
+        'original_name': name,
+        'user_priority': user_priority,
+        'furniture': furniture,
+        'accessories': accessories,
+        'floor_tile': floor_tile
+    }
+
+def floor_count(requirements):
+    """Storeys requested: 1 when missing or not a number, at most Config.MAX_FLOORS"""
+    try:
+        floors = int(float(requirements.get('floors', 1) or 1))
+    except (TypeError, ValueError, OverflowError):
+        return 1
+    return min(max(floors, 1), Config.MAX_FLOORS)
+
 def process_room_requirements(requirements):
     """Process and validate room requirements"""
     space_type = requirements.get('space_type', 'apartment')
@@ -21,64 +90,10 @@ def process_room_requirements(requirements):
     if custom_rooms:
         # Use explicitly mentioned rooms
         for room in custom_rooms:
-            name = str(room.get('name', 'Room')).strip()
-            if not name or name.lower() == 'room':
-                name = "Room"
-
-            room_type = determine_room_type(name)
-
-            # Use room-type-specific default sizes, with AI override if specified
-            room_type_defaults = {
-                "bedroom": 2.0,    # Large bedrooms
-                "bathroom": 0.8,   # Small bathrooms
-                "kitchen": 1.5,    # Normal/medium kitchen
-                "living": 2.0,     # Large living room
-                "office": 2.5,     # Extra large office
-                "storage": 0.6,    # Very small storage
-                "dining": 1.5,     # Medium dining
-                "classroom": 2.5,  # Large classroom
-                "meeting": 2.0,    # Large meeting room
-                "reception": 1.8,  # Large reception
-                "consultation": 1.5, # Medium consultation
-                "waiting": 1.2,    # Medium-small waiting
-                "generic": 1.5     # Default medium
-            }
-
-            # Get default size for room type
-            size_ratio = room_type_defaults.get(room_type, 1.5)
-
-            # Allow AI to override if it specifies a size
-            size_label = str(room.get('size', '')).lower().strip()
-            if size_label:
-                size_to_ratio = {
-                    "xsmall": 0.6, "tiny": 0.6, "compact": 0.8,
-                    "small": 0.8,
-                    "medium": 1.5, "standard": 1.5, "normal": 1.5,
-                    "large": 2.0, "big": 2.0, "spacious": 2.0,
-                    "xlarge": 2.5, "huge": 2.5, "master": 2.5
-                }
-                ai_size_ratio = size_to_ratio.get(size_label)
-                if ai_size_ratio:
-                    size_ratio = ai_size_ratio
-
-            # Extract furniture, accessories, and floor tile from AI response
-            furniture = room.get('furniture', [])
-            accessories = room.get('accessories', [])
-            floor_tile = room.get('floor_tile', 'parquet')
-
-            rooms.append({
-                'name': name,
-                'type': room_type,
-                'size_ratio': size_ratio,
-                'original_name': name,
-                'user_priority': user_priority,
-                'furniture': furniture,
-                'accessories': accessories,
-                'floor_tile': floor_tile
-            })
+            rooms.append(process_custom_room(room, user_priority))
     else:
         # Use space type template
-        template = Config.PROFESSIONAL_CONFIG["space_templates"].get(space_type, ["generic", "generic", "storage"])
+        template = space_template(space_type)
 
         for i, room_type in enumerate(template):
             if room_type == "bedroom" and num_bedrooms > 0:
@@ -152,12 +167,48 @@ def process_room_requirements(requirements):
 
     return rooms
 
-def generate_unique_id(prefix=""):
-    """Generate a unique ID similar to the example format"""
-    chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
-    if prefix:
-        return f"{prefix}-{''.join(random.choice(chars) for _ in range(10))}"
-    return ''.join(random.choice(chars) for _ in range(11))
+class IdAllocator:
+    """Hands out IDs unique within one design: `prefix-` plus 10 random characters, or 11 without a prefix
+
+    Characters come from the URL-safe base64 alphabet and are drawn in bulk, so one
+    RNG call covers a whole batch of IDs. Pass a seeded
+    random.Random for deterministic output; each design should own its allocator.
+    """
+
+    BATCH_SIZE = 256
+    _CHUNK = 12  # 9 random bytes encode to 12 base64 characters
+
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+        self._issued = set()
+        self._buffer = ""
+        self._pos = 0
+
+    def _refill(self):
+        self._buffer = base64.urlsafe_b64encode(self._rng.randbytes(9 * self.BATCH_SIZE)).decode("ascii")
+        self._pos = 0
+
+    def __call__(self, prefix=""):
+        """Allocate one ID: `prefix-` plus 10 characters, or 11 characters without a prefix"""
+        issued = self._issued
+        while True:
+            if self._pos >= len(self._buffer):
+                self._refill()
+            chunk = self._buffer[self._pos:self._pos + self._CHUNK]
+            self._pos += self._CHUNK
+
+            new_id = f"{prefix}-{chunk[:10]}" if prefix else chunk[:11]
+            if new_id not in issued:
+                issued.add(new_id)
+                return new_id
+
+    def allocate(self, prefix="", count=1):
+        """Allocate `count` IDs at once"""
+        return [self(prefix) for _ in range(count)]
+
+    def reserve(self, existing_ids):
+        """Mark IDs already present in a design so they are never handed out"""
+        self._issued.update(existing_ids)
 
 def extract_requirements_with_ai(user_messages, client):
     """Use AI to extract floor plan requirements from conversation"""
@@ -203,27 +254,4 @@ def extract_requirements_with_ai(user_messages, client):
 
 def determine_room_type(room_name):
     """Determine room type from name"""
-    name_lower = room_name.lower()
-
-    if any(keyword in name_lower for keyword in ['bed', 'sleep', 'master', 'guest']):
-        return "bedroom"
-    elif any(keyword in name_lower for keyword in ['bath', 'toilet', 'wc', 'restroom', 'lavatory']):
-        return "bathroom"
-    elif any(keyword in name_lower for keyword in ['kitchen', 'cook', 'pantry']):
-        return "kitchen"
-    elif any(keyword in name_lower for keyword in ['living', 'lounge', 'family', 'sitting']):
-        return "living"
-    elif any(keyword in name_lower for keyword in ['office', 'study', 'library']):
-        return "office"
-    elif any(keyword in name_lower for keyword in ['class', 'school', 'lecture', 'training']):
-        return "classroom"
-    elif any(keyword in name_lower for keyword in ['dining', 'restaurant', 'cafeteria', 'eating']):
-        return "dining"
-    elif any(keyword in name_lower for keyword in ['storage', 'closet', 'wardrobe', 'utility']):
-        return "storage"
-    elif any(keyword in name_lower for keyword in ['reception', 'lobby', 'entry', 'foyer']):
-        return "living"
-    elif any(keyword in name_lower for keyword in ['meeting', 'conference', 'board']):
-        return "office"
-
-    return "generic"
+    return classify_room(room_name)
@@ -0,0 +1,204 @@
+"""
+Door-graph reachability check for generated and edited designs.
+
+Each door is located on its wall and probed a short step to either side; the
+rooms under the two probes are the rooms it connects. Probes are resolved
+through a uniform spatial hash of room boxes, so building the graph and the
+breadth-first walk from the Main Entrance are both linear in the size of the
+layer.
+"""
+
+import math
+from collections import deque
+
+from .catalog import room_type
+from .design_utils import determine_room_type
+from .plan_geometry import is_number, resolves, wall_ends
+
+# How far either side of a wall a door's probe points are tried, nearest first. Areas
+# without the room index may be drawn inset from their walls, hence the longer steps.
+PROBE_DISTANCES = (20, 60, 120)  # cm
+
+# Most dangling-reference issues listed per layer
+MAX_ISSUES = 10
+
+def _table(layer, name):
+    """A layer's element table, keeping only well-formed elements"""
+    elements = layer.get(name)
+    if not isinstance(elements, dict):
+        return {}
+    return {element_id: element for element_id, element in elements.items() if isinstance(element, dict)}
+
+def _misc(area):
+    misc = area.get("misc")
+    return misc if isinstance(misc, dict) else {}
+
+def _room_shape(vertices, area):
+    """(bounding box, polygon or None) of a room; the room index's bounds are used when present"""
+    bounds = _misc(area).get("bounds")
+    if isinstance(bounds, list) and len(bounds) == 4 and all(is_number(value) for value in bounds):
+        return tuple(bounds), None
+
+    vertex_ids = area.get("vertices")
+    if not isinstance(vertex_ids, list):
+        return None, None
+    polygon = [(vertices[vid]["x"], vertices[vid]["y"]) for vid in vertex_ids
+               if resolves(vertices, vid) and is_number(vertices[vid].get("x")) and is_number(vertices[vid].get("y"))]
+    if len(polygon) < 3:
+        return None, None
+    xs = [x for x, _ in polygon]
+    ys = [y for _, y in polygon]
+    return (min(xs), min(ys), max(xs), max(ys)), polygon
+
+def _inside_polygon(x, y, polygon):
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+class _RoomLocator:
+    """Spatial hash from points to the room containing them"""
+
+    def __init__(self, shapes):
+        self.shapes = shapes
+        total = sum((box[2] - box[0]) * (box[3] - box[1]) for box, _ in shapes.values())
+        self.size = max(50.0, math.sqrt(total / max(1, len(shapes))))
+        self.buckets = {}
+        for area_id, (box, _) in shapes.items():
+            for key in self._keys(*box):
+                self.buckets.setdefault(key, []).append(area_id)
+
+    def _keys(self, x1, y1, x2, y2):
+        size = self.size
+        for bx in range(math.floor(x1 / size), math.floor(x2 / size) + 1):
+            for by in range(math.floor(y1 / size), math.floor(y2 / size) + 1):
+                yield bx, by
+
+    def room_at(self, x, y):
+        for area_id in self.buckets.get((math.floor(x / self.size), math.floor(y / self.size)), ()):
+            (x1, y1, x2, y2), polygon = self.shapes[area_id]
+            if x1 <= x <= x2 and y1 <= y <= y2 and (polygon is None or _inside_polygon(x, y, polygon)):
+                return area_id
+        return None
+
+def _min_doors(area):
+    name = _misc(area).get("room_type") or determine_room_type(area.get("name", ""))
+    return room_type(name).min_doors
+
+def _door_position(vertices, wall, offset):
+    """(x, y, unit along the wall) of a door, or None when the wall's vertices don't resolve"""
+    ends = wall_ends(vertices, wall)
+    if ends is None or not is_number(offset):
+        return None
+    v1, v2 = ends
+    if not all(is_number(vertex.get(axis)) for vertex in ends for axis in ("x", "y")):
+        return None
+
+    length = math.hypot(v2["x"] - v1["x"], v2["y"] - v1["y"]) or 1
+    ux, uy = (v2["x"] - v1["x"]) / length, (v2["y"] - v1["y"]) / length
+    return v1["x"] + ux * offset * length, v1["y"] + uy * offset * length, ux, uy
+
+def validate_layer(layer):
+    """Reachability report for one layer: unreachable rooms, rooms short of min_doors and dangling references
+
+    A door whose wall or vertices don't resolve connects nothing, and an area's missing vertices are
+    left out of its outline; each is listed under "issues" (at most MAX_ISSUES) and fails the layer.
+    """
+    if not isinstance(layer, dict):
+        layer = {}
+    vertices, lines = _table(layer, "vertices"), _table(layer, "lines")
+    areas = _table(layer, "areas")
+    issues = []
+
+    shapes = {}
+    for area_id, area in areas.items():
+        area_vertices = area.get("vertices", [])
+        if not isinstance(area_vertices, list) or not all(resolves(vertices, vid) for vid in area_vertices):
+            issues.append(f"areas {area_id} has missing vertices")
+        box, polygon = _room_shape(vertices, area)
+        if box is not None:
+            shapes[area_id] = (box, polygon)
+    locator = _RoomLocator(shapes)
+
+    adjacency = {area_id: [] for area_id in areas}
+    doors = dict.fromkeys(areas, 0)
+    entrance_rooms = []
+
+    for hole_id, hole in _table(layer, "holes").items():
+        if hole.get("type") == "window":
+            continue
+        if not resolves(lines, hole.get("line")):
+            issues.append(f"holes {hole_id} is on missing line {hole.get('line')}")
+            continue
+        position = _door_position(vertices, lines[hole["line"]], hole.get("offset", 0.5))
+        if position is None:
+            issues.append(f"holes {hole_id} is on line {hole['line']}, which does not join two existing vertices")
+            continue
+        cx, cy, ux, uy = position
+
+        # The rooms a probe step away on each side of the door
+        sides = set()
+        for direction in (1, -1):
+            for step in PROBE_DISTANCES:
+                area_id = locator.room_at(cx - uy * step * direction, cy + ux * step * direction)
+                if area_id is not None:
+                    sides.add(area_id)
+                    break
+        for area_id in sides:
+            doors[area_id] += 1
+        if len(sides) == 2:
+            a, b = sides
+            adjacency[a].append(b)
+            adjacency[b].append(a)
+        if hole.get("name") == "Main Entrance":
+            entrance_rooms.extend(sides)
+
+    # Breadth-first walk from the room(s) behind the main entrance
+    reached = set(entrance_rooms)
+    queue = deque(entrance_rooms)
+    while queue:
+        for neighbour in adjacency[queue.popleft()]:
+            if neighbour not in reached:
+                reached.add(neighbour)
+                queue.append(neighbour)
+
+    unreachable = [areas[area_id].get("name", area_id) for area_id in areas if area_id not in reached]
+    below_min_doors = []
+    for area_id, area in areas.items():
+        min_doors = _min_doors(area)
+        if doors[area_id] < min_doors:
+            below_min_doors.append({"room": area.get("name", area_id), "doors": doors[area_id], "min_doors": min_doors})
+
+    return {
+        "valid": bool(entrance_rooms) and not unreachable and not below_min_doors and not issues,
+        "has_entrance": bool(entrance_rooms),
+        "rooms": len(areas),
+        "unreachable_rooms": unreachable,
+        "rooms_below_min_doors": below_min_doors,
+        "issues": issues[:MAX_ISSUES]
+    }
+
+def validate_design(design):
+    """Validate every layer of a design; layers sharing one unit's tables are checked once"""
+    reports = {}
+    checked = {}
+    layers = design.get("layers")
+    for layer_id, layer in (layers.items() if isinstance(layers, dict) else ()):
+        lines = layer.get("lines") if isinstance(layer, dict) else None
+        key = id(lines) if isinstance(lines, dict) else ("layer", layer_id)
+        if key not in checked:
+            checked[key] = validate_layer(layer)
+        reports[layer_id] = checked[key]
+
+    if len(reports) == 1:
+        return next(iter(reports.values()))
+
+    return {
+        "valid": all(report["valid"] for report in reports.values()),
+        "layers": reports
+    }
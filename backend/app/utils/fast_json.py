@@ -0,0 +1,128 @@
+import json
+from itertools import islice
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional: everything falls back to the stdlib encoder without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Elements per chunk when streaming a layer's vertices/lines/holes/areas/items
+STREAM_BATCH_SIZE = 256
+
+# Streamed pieces are coalesced into writes of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
+def dumps_bytes(obj, sort_keys=False):
+    """Encode to compact UTF-8 JSON bytes with the fastest available encoder"""
+    if orjson is not None:
+        # Dates go through Flask's default, so they encode as HTTP dates just like with the stdlib
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=DefaultJSONProvider.default, option=option)
+    return json.dumps(obj, default=DefaultJSONProvider.default, sort_keys=sort_keys,
+                      separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def loads(data):
+    """Decode JSON from str or bytes with the fastest available decoder"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps_bytes(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Serialize a single value, several values (as a list) or keyword arguments (as a dict)
+
+        Pretty-printed output (compact=False, or debug mode) is left to Flask's encoder.
+        """
+        if orjson is None or self.compact is False or (self.compact is None and current_app.debug):
+            return super().response(*args, **kwargs)
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+
+        obj = (args[0] if len(args) == 1 else list(args)) if args else (kwargs or None)
+
+        # Hand the encoded bytes straight to the response, skipping a str round trip
+        return current_app.response_class(dumps_bytes(obj, sort_keys=self.sort_keys) + b"\n", mimetype=self.mimetype)
+
+def _iter_elements(elements):
+    """Yield a dict of elements in batches of STREAM_BATCH_SIZE"""
+    yield b"{"
+    remaining = iter(elements.items())
+    first = True
+    while True:
+        batch = dict(islice(remaining, STREAM_BATCH_SIZE))
+        if not batch:
+            break
+        # Encode the batch as one object and drop its braces
+        yield (b"" if first else b",") + dumps_bytes(batch)[1:-1]
+        first = False
+    yield b"}"
+
+def _iter_layer(layer):
+    """Yield one layer, with its element tables streamed in batches"""
+    yield b"{"
+    for i, (key, value) in enumerate(layer.items()):
+        yield (b"," if i else b"") + dumps_bytes(str(key)) + b":"
+        if key in ("vertices", "lines", "holes", "areas", "items") and isinstance(value, dict):
+            yield from _iter_elements(value)
+        else:
+            yield dumps_bytes(value)
+    yield b"}"
+
+def iter_design_json(design):
+    """Yield a react-planner design as JSON chunks, layer by layer"""
+    yield b"{"
+    for i, (key, value) in enumerate(design.items()):
+        yield (b"," if i else b"") + dumps_bytes(str(key)) + b":"
+        if key == "layers" and isinstance(value, dict):
+            yield b"{"
+            for j, (layer_id, layer) in enumerate(value.items()):
+                yield (b"," if j else b"") + dumps_bytes(str(layer_id)) + b":"
+                yield from _iter_layer(layer)
+            yield b"}"
+        else:
+            yield dumps_bytes(value)
+    yield b"}"
+
+def _iter_response(payload, design_key):
+    yield b"{"
+    for i, (key, value) in enumerate(payload.items()):
+        yield (b"," if i else b"") + dumps_bytes(str(key)) + b":"
+        if key == design_key and isinstance(value, dict):
+            yield from iter_design_json(value)
+        else:
+            yield dumps_bytes(value)
+    yield b"}\n"
+
+def coalesce_chunks(pieces, chunk_bytes=STREAM_CHUNK_BYTES):
+    """Join small byte pieces into chunks of roughly chunk_bytes"""
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b"".join(buffer)
+
+def iter_response_json(payload, design_key="design"):
+    """Yield an API response as JSON chunks, streaming its design payload layer by layer"""
+    return coalesce_chunks(_iter_response(payload, design_key))
@@ -0,0 +1,154 @@
+"""
+Multi-storey designs.
+
+A design with floors > 1 gets one react-planner layer per storey. Floors whose
+effective requirements are identical form a unit: the unit is generated once
+and every floor built from it references the same element tables, placed by
+its own layer altitude. The unit table in design["meta"]["floors"] records
+those instance transforms, which also lets the design cache store each unit
+once. The sharing only saves server memory: a JSON response still writes
+every storey out in full. The stair core sits at the same position on every floor.
+"""
+
+import json
+import multiprocessing
+import random
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from .catalog import CATALOG
+from .design_generator import build_floor_model, create_base_structure, footprint_cm, serialize_layer, stair_position
+from .design_utils import IdAllocator, floor_count
+from .timing import call_with_spans, record_spans
+
+ELEMENT_TABLES = ("vertices", "lines", "holes", "areas", "items")
+
+# Building-level fields: every floor shares the footprint, so overrides cannot change them
+BUILDING_FIELDS = ('floors', 'floor_overrides', 'seed', 'width_meters', 'height_meters', 'user_priority')
+
+def check_floor_overrides(requirements):
+    """Raise ValueError unless floor_overrides is absent or maps floor numbers to requirement objects"""
+    overrides = requirements.get('floor_overrides')
+    if overrides is None:
+        return
+    if not isinstance(overrides, dict) or not all(isinstance(override, dict) for override in overrides.values()):
+        raise ValueError('floor_overrides must be an object mapping floor numbers to requirement objects')
+
+def floor_requirements(requirements, floor):
+    """Effective requirements of one floor: the typical floor plus any floor_overrides entry"""
+    floor_reqs = {key: value for key, value in requirements.items() if key not in ('floors', 'floor_overrides', 'seed')}
+
+    overrides = requirements.get('floor_overrides') or {}
+    override = overrides.get(str(floor)) or overrides.get(floor) or {}
+    floor_reqs.update((key, value) for key, value in override.items() if key not in BUILDING_FIELDS)
+    return floor_reqs
+
+def floor_name(floor):
+    return "Ground Floor" if floor == 0 else f"Floor {floor}"
+
+def build_unit_tables(job):
+    """Generate one unit's element tables (runs in a worker for multi-unit buildings)"""
+    floor_reqs, unit_seed, stairs = job
+    rng = random.Random(unit_seed)
+    model = build_floor_model(floor_reqs, rng, IdAllocator(rng), stairs)
+    return serialize_layer(model)
+
+def _map_units(jobs):
+    """Build distinct units in parallel, unless there is only one or we already are a pool worker"""
+    if len(jobs) > 1 and multiprocessing.parent_process() is None:
+        # Import here to avoid circular imports
+        from ..services.generation_pool import discard_generation_pool, get_generation_pool
+        pool = get_generation_pool()
+        try:
+            results = list(pool.map(partial(call_with_spans, build_unit_tables), jobs))
+        except BrokenProcessPool:
+            discard_generation_pool(pool)
+            raise
+        for _, spans in results:
+            record_spans(spans)
+        return [tables for tables, _ in results]
+    return [build_unit_tables(job) for job in jobs]
+
+def build_multistorey_design(requirements, rng):
+    """Build a design with one layer per floor, generating each distinct unit once"""
+    floors = floor_count(requirements)
+    stairs = stair_position(*footprint_cm(requirements))
+
+    # Group floors into units by their effective requirements
+    unit_keys = {}
+    floor_units = []
+    jobs = []
+    for floor in range(floors):
+        floor_reqs = floor_requirements(requirements, floor)
+        key = json.dumps(floor_reqs, sort_keys=True, default=str)
+        if key not in unit_keys:
+            unit_keys[key] = len(jobs)
+            jobs.append((floor_reqs, rng.getrandbits(64), stairs))
+        floor_units.append(unit_keys[key])
+
+    unit_tables = _map_units(jobs)
+
+    design = create_base_structure()
+    template = design["layers"].pop("layer-1")
+    wall_height = CATALOG.dims.wall_height
+    units = {}
+
+    for floor, unit in enumerate(floor_units):
+        layer_id = f"layer-{floor + 1}"
+        altitude = floor * wall_height
+
+        # Floors of the same unit share its element tables by reference
+        layer = dict(template, id=layer_id, altitude=altitude, order=floor, name=floor_name(floor))
+        layer.update(unit_tables[unit])
+        layer["selected"] = {table: [] for table in ELEMENT_TABLES}
+        design["layers"][layer_id] = layer
+
+        unit_id = f"unit-{unit + 1}"
+        entry = units.setdefault(unit_id, {"source": layer_id, "instances": []})
+        entry["instances"].append({"layer": layer_id, "transform": {"x": 0, "y": 0, "z": altitude}})
+
+    design["meta"]["floors"] = {
+        "count": floors,
+        "units": units,
+        "stairs": {"x": stairs[0], "y": stairs[1]}
+    }
+    return design
+
+def pack_instances(design):
+    """Copy of a design with each unit's element tables kept on its source layer only
+
+    Only floors that still share their source's tables by reference are packed, so a
+    design whose storeys were edited apart (or decoded from JSON) keeps every floor.
+    """
+    units = design.get("meta", {}).get("floors", {}).get("units")
+    if not units:
+        return design
+
+    layers = dict(design["layers"])
+    for unit in units.values():
+        source = layers.get(unit["source"], {})
+        for instance in unit["instances"]:
+            layer = layers.get(instance["layer"])
+            if instance["layer"] == unit["source"] or layer is None:
+                continue
+            if all(table in source and layer.get(table) is source[table] for table in ELEMENT_TABLES):
+                layers[instance["layer"]] = {key: value for key, value in layer.items() if key not in ELEMENT_TABLES}
+    return dict(design, layers=layers)
+
+def unpack_instances(design):
+    """Re-link packed instance layers to their unit's element tables (in place)"""
+    units = design.get("meta", {}).get("floors", {}).get("units")
+    if not units:
+        return design
+
+    layers = design["layers"]
+    for unit in units.values():
+        source = layers[unit["source"]]
+        tables = {table: source[table] for table in ELEMENT_TABLES}
+        for instance in unit["instances"]:
+            layer = layers[instance["layer"]]
+            if "vertices" not in layer:
+                selected = layer.pop("selected")
+                layer.update(tables)
+                layer["selected"] = selected
+    return design
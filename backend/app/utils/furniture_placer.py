@@ -0,0 +1,116 @@
+"""
+Collision-free furniture placement.
+
+Every occupied footprint on a floor (placed items, door swing clearances,
+the stair core) goes into one uniform spatial hash, so testing a candidate
+only looks at the few buckets it covers. Candidates are scanned row by row
+from the room's low corner. A blocked candidate jumps straight past the
+footprint it hit, and a fully blocked row jumps past the lowest top edge it
+met. Each footprint size resumes from the row its previous copy went into,
+which keeps rows of identical desks cheap.
+"""
+
+import math
+
+# Spatial hash bucket edge
+BUCKET_SIZE = 100  # cm
+
+class SpatialHash:
+    """Uniform grid of buckets holding axis-aligned rectangles (x1, y1, x2, y2)"""
+    __slots__ = ("bucket_size", "buckets")
+
+    def __init__(self, bucket_size=BUCKET_SIZE):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+
+    def _keys(self, x1, y1, x2, y2):
+        size = self.bucket_size
+        for bx in range(math.floor(x1 / size), math.floor(x2 / size) + 1):
+            for by in range(math.floor(y1 / size), math.floor(y2 / size) + 1):
+                yield bx, by
+
+    def insert(self, rect):
+        for key in self._keys(*rect):
+            self.buckets.setdefault(key, []).append(rect)
+
+    def first_hit(self, rect, gap=0):
+        """A stored rectangle closer than `gap` to rect, or None"""
+        x1, y1, x2, y2 = rect[0] - gap, rect[1] - gap, rect[2] + gap, rect[3] + gap
+        buckets = self.buckets
+        for key in self._keys(x1, y1, x2, y2):
+            for other in buckets.get(key, ()):
+                if x1 < other[2] and other[0] < x2 and y1 < other[3] and other[1] < y2:
+                    return other
+        return None
+
+def door_clearance(ax, ay, bx, by, offset, span):
+    """Bounding box of a door's swing on both sides of the wall from (ax, ay) to (bx, by)"""
+    length = math.hypot(bx - ax, by - ay) or 1
+    ux, uy = (bx - ax) / length, (by - ay) / length
+    cx, cy = ax + ux * offset * length, ay + uy * offset * length
+    half = span / 2
+
+    # Corners of the span, pushed a full door width out on either side
+    xs = []
+    ys = []
+    for along in (-half, half):
+        for across in (-span, span):
+            xs.append(cx + ux * along - uy * across)
+            ys.append(cy + uy * along + ux * across)
+    return min(xs), min(ys), max(xs), max(ys)
+
+class FurniturePlacer:
+    """Finds free spots for item footprints, keeping `gap` cm between everything placed"""
+
+    def __init__(self, gap=0):
+        self.gap = gap
+        self.occupied = SpatialHash()
+        self._resume = {}
+
+    def reserve(self, rect):
+        """Mark a rectangle as occupied (door clearances, stairs, fixed items)"""
+        self.occupied.insert(rect)
+
+    def _scan(self, region, width, depth):
+        rx1, ry1, rx2, ry2 = region
+        key = (region, width, depth)
+        gap = self.gap
+        y = self._resume.get(key, ry1)
+
+        while y + depth <= ry2:
+            x = rx1
+            lowest_top = None
+            while x + width <= rx2:
+                hit = self.occupied.first_hit((x, y, x + width, y + depth), gap)
+                if hit is None:
+                    self._resume[key] = y
+                    return x, y
+                # Always advance: float rounding can leave an edge exactly `gap` away
+                x = max(hit[2] + gap, x + 1)
+                lowest_top = hit[3] if lowest_top is None else min(lowest_top, hit[3])
+
+            if lowest_top is None:
+                # Nothing blocked this row, so the footprint is wider than the room
+                break
+            y = max(lowest_top + gap, y + 1)
+
+        self._resume[key] = ry2
+        return None
+
+    def place(self, region, width, depth):
+        """Claim a spot for a width x depth footprint inside region
+
+        Returns ((center_x, center_y), rotation), trying the footprint turned by 90
+        degrees if it does not fit as given, or None when the region has no room left.
+        """
+        options = [(width, depth, 0)]
+        if width != depth:
+            options.append((depth, width, 90))
+
+        for w, d, rotation in options:
+            spot = self._scan(region, w, d)
+            if spot is not None:
+                x, y = spot
+                self.occupied.insert((x, y, x + w, y + d))
+                return (x + w / 2, y + d / 2), rotation
+        return None
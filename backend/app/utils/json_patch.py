@@ -0,0 +1,94 @@
+"""
+RFC 6902 JSON Patch: diff two JSON documents and apply the result.
+
+make_patch emits only add, remove and replace operations. Objects are diffed
+key by key. Arrays are diffed index by index, with removals from the tail
+before additions, so the operations apply cleanly in order. Sub-documents
+that are the same object are skipped without being walked.
+"""
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _diff(old, new, path, ops):
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for index in range(common):
+            _diff(old[index], new[index], f"{path}/{index}", ops)
+        for index in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": new[index]})
+
+    # True == 1 in Python but not in JSON
+    elif old != new or type(old) is not type(new):
+        ops.append({"op": "replace", "path": path, "value": new})
+
+def make_patch(old, new):
+    """RFC 6902 operations that turn `old` into `new`"""
+    ops = []
+    _diff(old, new, "", ops)
+    return ops
+
+def _resolve(doc, path):
+    """(container, last token) for a JSON Pointer"""
+    tokens = [_unescape(token) for token in path.split("/")[1:]]
+    parent = doc
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    return parent, tokens[-1]
+
+def apply_patch(doc, patch):
+    """Apply add/remove/replace/test operations to a document in place and return it"""
+    for op in patch:
+        path = op["path"]
+        if path == "":
+            if op["op"] in ("add", "replace"):
+                doc = op["value"]
+                continue
+            raise ValueError(f"Unsupported root operation: {op['op']}")
+
+        parent, token = _resolve(doc, path)
+        if isinstance(parent, list):
+            index = len(parent) if token == "-" else int(token)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            elif op["op"] == "replace":
+                parent[index] = op["value"]
+            elif op["op"] == "test":
+                if parent[index] != op["value"]:
+                    raise ValueError(f"Test failed at {path}")
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+        else:
+            if op["op"] in ("add", "replace"):
+                if op["op"] == "replace" and token not in parent:
+                    raise ValueError(f"Cannot replace missing member {path}")
+                parent[token] = op["value"]
+            elif op["op"] == "remove":
+                del parent[token]
+            elif op["op"] == "test":
+                if parent.get(token) != op["value"]:
+                    raise ValueError(f"Test failed at {path}")
+            else:
+                raise ValueError(f"Unsupported operation: {op['op']}")
+    return doc
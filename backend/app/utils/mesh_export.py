@@ -0,0 +1,336 @@
+"""
+Binary glTF (GLB) export of react-planner designs, for the 3D viewer.
+
+Each wall is split along its length at the edges of its doors and windows.
+Every span then becomes one or two solid boxes: the full wall height, or the
+parts below and above the openings over it. The boxes of a whole layer are
+extruded at once with NumPy from a single face template, into float32
+positions and normals and uint32 indices. Floors are triangulated per area
+and grouped into one primitive per texture colour.
+
+Floors that share element tables (multi-storey units, see floors.py) share
+one glTF mesh, which each storey's node places at its layer altitude.
+
+glTF is y-up and in metres. react-planner is in cm with its y axis pointing
+north on the plan, so plan (x, y, z) maps to glTF (x, z, -y) / 100.
+"""
+
+import math
+import struct
+
+import numpy as np
+
+from .catalog import CATALOG
+from .fast_json import dumps_bytes
+from .plan_geometry import area_colour, property_length, resolves, wall_ends
+
+WALL_COLOUR = "#E8E6E1"
+
+# Spans shorter than this (cm) are dropped when a wall is split at its openings
+MIN_SPAN = 0.5
+
+# glTF constants
+_FLOAT = 5126
+_UINT = 5125
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+
+# Box faces in wall-local coordinates: (outward normal along (wall, wall normal, up),
+# four corners as (start/end of span, -1/+1 side of the wall, bottom/top)), wound CCW from outside
+_BOX_FACES = (
+    ((0, 1, 0), ((0, 1, 0), (0, 1, 1), (1, 1, 1), (1, 1, 0))),
+    ((0, -1, 0), ((0, -1, 0), (1, -1, 0), (1, -1, 1), (0, -1, 1))),
+    ((1, 0, 0), ((1, -1, 0), (1, 1, 0), (1, 1, 1), (1, -1, 1))),
+    ((-1, 0, 0), ((0, -1, 0), (0, -1, 1), (0, 1, 1), (0, 1, 0))),
+    ((0, 0, 1), ((0, -1, 1), (1, -1, 1), (1, 1, 1), (0, 1, 1))),
+    ((0, 0, -1), ((0, -1, 0), (0, 1, 0), (1, 1, 0), (1, -1, 0))),
+)
+_FACE_NORMALS = np.array([normal for normal, _ in _BOX_FACES], dtype=np.float64)  # (6, 3)
+_FACE_CORNERS = np.array([corners for _, corners in _BOX_FACES], dtype=np.float64)  # (6, 4, 3)
+_QUAD_TRIANGLES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+
+def _solid_ranges(height, openings):
+    """Vertical ranges of a wall span left solid by the (bottom, top) openings over it"""
+    ranges = []
+    z = 0.0
+    for bottom, top in sorted(openings):
+        if bottom > z:
+            ranges.append((z, bottom))
+        z = max(z, top)
+    if z < height:
+        ranges.append((z, height))
+    return ranges
+
+def _wall_boxes(layer):
+    """Per-wall arrays (start, unit direction, thickness) and per-box arrays (wall, s0, s1, z0, z1)"""
+    vertices = layer.get("vertices", {})
+    lines = layer.get("lines", {})
+
+    openings = {}
+    for hole in layer.get("holes", {}).values():
+        if resolves(lines, hole.get("line")):
+            openings.setdefault(hole["line"], []).append(hole)
+
+    walls = []
+    boxes = []
+    for line_id, line in lines.items():
+        ends = wall_ends(vertices, line)
+        if ends is None:
+            continue
+        a, b = ends
+        length = math.hypot(b["x"] - a["x"], b["y"] - a["y"])
+        if not length:
+            continue
+
+        properties = line.get("properties", {})
+        height = property_length(properties, "height", CATALOG.dims.wall_height)
+        index = len(walls)
+        walls.append((a["x"], a["y"], (b["x"] - a["x"]) / length, (b["y"] - a["y"]) / length,
+                      property_length(properties, "thickness", CATALOG.dims.wall_thickness)))
+
+        cuts = []
+        for hole in openings.get(line_id, ()):
+            hole_properties = hole.get("properties", {})
+            centre = hole.get("offset", 0.5) * length
+            half_width = property_length(hole_properties, "width", 80) / 2
+            bottom = property_length(hole_properties, "altitude", 0)
+            top = bottom + property_length(hole_properties, "height", CATALOG.dims.door_height)
+            s0, s1 = max(0.0, centre - half_width), min(length, centre + half_width)
+            if s1 - s0 >= MIN_SPAN and top > bottom:
+                cuts.append((s0, s1, bottom, min(top, height)))
+
+        if not cuts:
+            boxes.append((index, 0.0, length, 0.0, height))
+            continue
+
+        stops = sorted({0.0, length, *(cut[0] for cut in cuts), *(cut[1] for cut in cuts)})
+        for s0, s1 in zip(stops, stops[1:]):
+            if s1 - s0 < MIN_SPAN:
+                continue
+            over = [(bottom, top) for c0, c1, bottom, top in cuts if c0 <= s0 and c1 >= s1]
+            for z0, z1 in _solid_ranges(height, over) if over else ((0.0, height),):
+                boxes.append((index, s0, s1, z0, z1))
+
+    return np.array(walls, dtype=np.float64).reshape(-1, 5), np.array(boxes, dtype=np.float64).reshape(-1, 5)
+
+def wall_mesh(layer):
+    """(positions, normals, indices) of a layer's walls with their openings cut out"""
+    walls, boxes = _wall_boxes(layer)
+    if not len(boxes):
+        return None
+
+    wall = boxes[:, 0].astype(np.intp)
+    ax, ay, ux, uy, thickness = (walls[wall, i][:, None, None] for i in range(5))
+    s0, s1, z0, z1 = (boxes[:, i][:, None, None] for i in range(1, 5))
+
+    # (boxes, 6 faces, 4 corners) of span position, side and height
+    s = np.where(_FACE_CORNERS[:, :, 0] > 0, s1, s0)
+    side = _FACE_CORNERS[:, :, 1] * thickness / 2
+    z = np.where(_FACE_CORNERS[:, :, 2] > 0, z1, z0)
+
+    # The wall normal is the direction turned 90 degrees anticlockwise
+    x = ax + ux * s - uy * side
+    y = ay + uy * s + ux * side
+    positions = np.stack([x, z, -y], axis=-1).reshape(-1, 3) / 100
+
+    nu, nn, nz = (_FACE_NORMALS[:, i][None, :] for i in range(3))
+    ux, uy = ux[:, :, 0], uy[:, :, 0]
+    normal_x = nu * ux - nn * uy
+    normal_y = nu * uy + nn * ux
+    normals = np.stack([normal_x, np.broadcast_to(nz, normal_x.shape), -normal_y], axis=-1)
+    normals = np.repeat(normals, 4, axis=1).reshape(-1, 3)
+
+    face_starts = np.arange(len(boxes) * 6, dtype=np.uint32) * 4
+    indices = (face_starts[:, None] + _QUAD_TRIANGLES).ravel()
+    return positions.astype(np.float32), normals.astype(np.float32), indices
+
+def _ear_clip(points):
+    """Triangles (index triples) of a simple anticlockwise polygon"""
+    remaining = list(range(len(points)))
+    triangles = []
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    guard = len(remaining) ** 2
+    while len(remaining) > 3 and guard:
+        guard -= 1
+        count = len(remaining)
+        for i in range(count):
+            prev, cur, nxt = remaining[i - 1], remaining[i], remaining[(i + 1) % count]
+            a, b, c = points[prev], points[cur], points[nxt]
+            if cross(a, b, c) <= 0:
+                continue
+            if any(cross(a, b, points[j]) >= 0 and cross(b, c, points[j]) >= 0 and cross(c, a, points[j]) >= 0
+                   for j in remaining if j not in (prev, cur, nxt)):
+                continue
+            triangles.append((prev, cur, nxt))
+            del remaining[i]
+            break
+        else:
+            break  # No ear left (self-intersecting outline): fan the rest
+    for i in range(1, len(remaining) - 1):
+        triangles.append((remaining[0], remaining[i], remaining[i + 1]))
+    return triangles
+
+def floor_meshes(layer):
+    """{colour: (positions, normals, indices)} of a layer's area floors"""
+    vertices = layer.get("vertices", {})
+    groups = {}
+    for area in layer.get("areas", {}).values():
+        points = [(vertices[vid]["x"], vertices[vid]["y"]) for vid in area.get("vertices", ()) if resolves(vertices, vid)]
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        if len(points) < 3:
+            continue
+
+        # Wind anticlockwise on the plan so the floor faces up
+        twice_area = sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]))
+        if twice_area < 0:
+            points.reverse()
+        elif twice_area == 0:
+            continue
+
+        if all(
+                (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) >= 0
+                for a, b, c in zip(points, points[1:] + points[:1], points[2:] + points[:2])):
+            triangles = None  # Convex: fanned below
+        else:
+            triangles = _ear_clip(points)
+
+        group = groups.setdefault(area_colour(area), [[], [], 0])  # outlines, triangles, vertex count
+        start = group[2]
+        group[0].append(points)
+        group[2] += len(points)
+        if triangles is None:
+            group[1].extend((start, start + i, start + i + 1) for i in range(1, len(points) - 1))
+        else:
+            group[1].extend((start + a, start + b, start + c) for a, b, c in triangles)
+
+    meshes = {}
+    for colour, (outlines, triangles, _) in groups.items():
+        plan = np.array([point for outline in outlines for point in outline], dtype=np.float64)
+        positions = np.column_stack([plan[:, 0], np.zeros(len(plan)), -plan[:, 1]]) / 100
+        normals = np.zeros_like(positions)
+        normals[:, 1] = 1
+        meshes[colour] = (positions.astype(np.float32), normals.astype(np.float32),
+                          np.array(triangles, dtype=np.uint32).ravel())
+    return meshes
+
+def _linear_rgba(colour):
+    """glTF base colour factor (linear RGBA) for a #RRGGBB colour"""
+    colour = str(colour).lstrip("#")
+    try:
+        channels = [int(colour[i:i + 2], 16) / 255 for i in (0, 2, 4)]
+    except ValueError:
+        channels = [0.8, 0.8, 0.8]
+    return [round(c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4, 4) for c in channels] + [1.0]
+
+class _GltfBuilder:
+    """Accumulates accessors, materials and meshes into one glTF document and binary buffer"""
+
+    __slots__ = ("gltf", "chunks", "offset", "materials")
+
+    def __init__(self):
+        self.gltf = {
+            "asset": {"version": "2.0", "generator": "ARCHIFY"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [], "meshes": [], "materials": [],
+            "accessors": [], "bufferViews": [], "buffers": []
+        }
+        self.chunks = []
+        self.offset = 0
+        self.materials = {}
+
+    def _accessor(self, array, kind, target, bounds=False):
+        data = np.ascontiguousarray(array).tobytes()
+        self.gltf["bufferViews"].append({"buffer": 0, "byteOffset": self.offset, "byteLength": len(data), "target": target})
+        self.chunks.append(data)
+        self.offset += len(data)  # float32 and uint32 keep every view 4-byte aligned
+
+        accessor = {
+            "bufferView": len(self.gltf["bufferViews"]) - 1,
+            "componentType": _UINT if array.dtype == np.uint32 else _FLOAT,
+            "count": len(array),
+            "type": kind
+        }
+        if bounds:
+            accessor["min"] = array.min(axis=0).tolist()
+            accessor["max"] = array.max(axis=0).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def material(self, name, colour):
+        if colour not in self.materials:
+            self.materials[colour] = len(self.gltf["materials"])
+            self.gltf["materials"].append({
+                "name": name,
+                "pbrMetallicRoughness": {"baseColorFactor": _linear_rgba(colour), "metallicFactor": 0, "roughnessFactor": 0.9}
+            })
+        return self.materials[colour]
+
+    def primitive(self, mesh, material):
+        positions, normals, indices = mesh
+        return {
+            "attributes": {
+                "POSITION": self._accessor(positions, "VEC3", _ARRAY_BUFFER, bounds=True),
+                "NORMAL": self._accessor(normals, "VEC3", _ARRAY_BUFFER)
+            },
+            "indices": self._accessor(indices, "SCALAR", _ELEMENT_ARRAY_BUFFER),
+            "material": material
+        }
+
+    def glb(self):
+        binary = b"".join(self.chunks)
+        if binary:
+            self.gltf["buffers"].append({"byteLength": len(binary)})
+
+        # glTF forbids empty arrays, including a scene without nodes
+        if not self.gltf["scenes"][0]["nodes"]:
+            del self.gltf["scenes"][0]["nodes"]
+        document = dumps_bytes({key: value for key, value in self.gltf.items() if value != []})
+        document += b" " * (-len(document) % 4)
+        chunks = [struct.pack("<I4s", len(document), b"JSON"), document]
+        if binary:
+            binary += b"\0" * (-len(binary) % 4)
+            chunks += [struct.pack("<I4s", len(binary), b"BIN\0"), binary]
+        return struct.pack("<4sII", b"glTF", 2, 12 + sum(len(chunk) for chunk in chunks)) + b"".join(chunks)
+
+def _layer_mesh(builder, name, layer):
+    """Index of a new glTF mesh for one layer's walls and floors, or None if it has neither"""
+    primitives = []
+    walls = wall_mesh(layer)
+    if walls is not None:
+        primitives.append(builder.primitive(walls, builder.material("wall", WALL_COLOUR)))
+    for colour, floor in floor_meshes(layer).items():
+        if len(floor[2]):
+            primitives.append(builder.primitive(floor, builder.material(f"floor {colour}", colour)))
+    if not primitives:
+        return None
+
+    builder.gltf["meshes"].append({"name": name, "primitives": primitives})
+    return len(builder.gltf["meshes"]) - 1
+
+def render_glb(design):
+    """GLB bytes of a design: one node per layer, placed at the layer's altitude"""
+    builder = _GltfBuilder()
+    shared = {}
+
+    layers = sorted(design.get("layers", {}).items(), key=lambda entry: entry[1].get("order", 0))
+    for layer_id, layer in layers:
+        # Storeys built from the same unit hold the very same tables, so they share a mesh
+        tables = tuple(id(layer.get(table)) for table in ("vertices", "lines", "holes", "areas"))
+        if tables not in shared:
+            shared[tables] = _layer_mesh(builder, str(layer_id), layer)
+
+        node = {"name": str(layer.get("name") or layer_id)}
+        if shared[tables] is not None:
+            node["mesh"] = shared[tables]
+        altitude = property_length(layer, "altitude", 0) or 0
+        if altitude:
+            node["translation"] = [0, altitude / 100, 0]
+        builder.gltf["scenes"][0]["nodes"].append(len(builder.gltf["nodes"]))
+        builder.gltf["nodes"].append(node)
+
+    return builder.glb()
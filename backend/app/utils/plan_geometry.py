@@ -0,0 +1,141 @@
+"""
+Shared reference and geometry helpers for react-planner designs, used by
+the SVG/DXF, PNG and glTF exporters.
+
+The exporters read client-supplied designs, so every cross-reference (a
+wall's vertices, a hole's wall, an area's vertices) may dangle. Writers
+skip what they cannot resolve. design_problems lists what is wrong up
+front, so a route can answer 400 before it starts streaming a body.
+"""
+
+import math
+
+from .catalog import item_footprint, room_type, texture_colour
+
+TABLES = ("vertices", "lines", "holes", "areas", "items")
+
+# Numeric properties the exporters read from each table, as numbers or {"length": n}
+LENGTH_PROPERTIES = {
+    "lines": ("thickness", "height"),
+    "holes": ("width", "height", "altitude"),
+    "items": ("fontSize",),
+}
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+def resolves(table, element_id):
+    """Whether element_id names an element of table; ids are strings, so anything else never does"""
+    return isinstance(element_id, str) and element_id in table
+
+def wall_ends(vertices, line):
+    """(start vertex, end vertex) of a line, or None when its vertex references don't resolve"""
+    ids = line.get("vertices")
+    if not isinstance(ids, list) or len(ids) != 2 or not all(resolves(vertices, vid) for vid in ids):
+        return None
+    return vertices[ids[0]], vertices[ids[1]]
+
+def property_length(properties, key, default):
+    """A numeric property, stored either bare or as {"length": n}"""
+    value = properties.get(key, default)
+    return value.get("length", default) if isinstance(value, dict) else value
+
+def hole_geometry(layer, hole):
+    """(centre x, centre y, unit along the wall, unit normal, width, wall thickness) of a hole, or None"""
+    lines = layer.get("lines", {})
+    if not resolves(lines, hole.get("line")):
+        return None
+    wall = lines[hole["line"]]
+    ends = wall_ends(layer.get("vertices", {}), wall)
+    if ends is None:
+        return None
+    a, b = ends
+    length = math.hypot(b["x"] - a["x"], b["y"] - a["y"])
+    if not length:
+        return None
+    ux, uy = (b["x"] - a["x"]) / length, (b["y"] - a["y"]) / length
+    offset = hole.get("offset", 0.5) * length
+    properties = hole.get("properties", {})
+    width = property_length(properties, "width", 80)
+    thickness = property_length(wall.get("properties", {}), "thickness", 20)
+    return a["x"] + ux * offset, a["y"] + uy * offset, (ux, uy), (-uy, ux), width, thickness
+
+def item_corners(item):
+    """Corners of an item's rotated footprint"""
+    width, depth = item_footprint(item.get("type"))
+    angle = math.radians(item.get("rotation", 0) or 0)
+    cos, sin = math.cos(angle), math.sin(angle)
+    corners = []
+    for dx, dy in ((-width / 2, -depth / 2), (width / 2, -depth / 2), (width / 2, depth / 2), (-width / 2, depth / 2)):
+        corners.append((item["x"] + dx * cos - dy * sin, item["y"] + dx * sin + dy * cos))
+    return corners
+
+def is_label(item):
+    """Whether an item is a room label rather than furniture"""
+    return item.get("type") == "text"
+
+def area_colour(area):
+    """Fill colour of an area: its texture's, else its room type's label colour"""
+    texture = area.get("properties", {}).get("texture")
+    if texture:
+        return texture_colour(texture)
+    return room_type((area.get("misc") or {}).get("room_type")).label_color
+
+def _layer_problems(layer_id, layer):
+    if not isinstance(layer, dict):
+        yield f"layer {layer_id} is not an object"
+        return
+    if "altitude" in layer and not is_number(layer["altitude"]):
+        yield f"layer {layer_id}: altitude is not a number"
+
+    tables = {}
+    for table in TABLES:
+        elements = layer.get(table, {})
+        if not isinstance(elements, dict):
+            yield f"layer {layer_id}: {table} is not an object"
+            elements = {}
+        tables[table] = {}
+        for element_id, element in elements.items():
+            if not isinstance(element, dict):
+                yield f"{table} {element_id} is not an object"
+                continue
+            properties = element.get("properties", {})
+            if not isinstance(properties, dict):
+                yield f"{table} {element_id}: properties is not an object"
+                continue
+            for key in LENGTH_PROPERTIES.get(table, ()):
+                value = properties.get(key, 0)
+                if not is_number(value.get("length", 0) if isinstance(value, dict) else value):
+                    yield f"{table} {element_id}: {key} is not a number"
+            tables[table][element_id] = element
+
+    vertices, lines = tables["vertices"], tables["lines"]
+    for table in ("vertices", "items"):
+        for element_id, element in tables[table].items():
+            if not (is_number(element.get("x")) and is_number(element.get("y"))):
+                yield f"{table} {element_id} has no numeric x and y"
+    for item_id, item in tables["items"].items():
+        if not is_number(item.get("rotation", 0) or 0):
+            yield f"items {item_id}: rotation is not a number"
+    for line_id, line in lines.items():
+        if wall_ends(vertices, line) is None:
+            yield f"lines {line_id} does not join two existing vertices"
+    for hole_id, hole in tables["holes"].items():
+        if not resolves(lines, hole.get("line")):
+            yield f"holes {hole_id} is on missing line {hole.get('line')}"
+        if not is_number(hole.get("offset", 0.5)):
+            yield f"holes {hole_id}: offset is not a number"
+    for area_id, area in tables["areas"].items():
+        area_vertices = area.get("vertices", [])
+        if not isinstance(area_vertices, list) or not all(resolves(vertices, vid) for vid in area_vertices):
+            yield f"areas {area_id} has missing vertices"
+
+def design_problems(design, limit=10):
+    """Readable descriptions of dangling references and non-numeric coordinates, at most `limit`"""
+    problems = []
+    for layer_id, layer in design.get("layers", {}).items():
+        for problem in _layer_problems(layer_id, layer):
+            problems.append(problem)
+            if len(problems) >= limit:
+                return problems
+    return problems
@@ -0,0 +1,264 @@
+"""
+Headless PNG rendering of react-planner designs.
+
+One floor is drawn into a NumPy RGB canvas, back to front: areas in their
+texture's flat colour, walls, door and window openings, item footprints, then
+room labels. Labels use the colours create_room_label gives them and a
+built-in 5x7 bitmap font. Axis-aligned rectangles, which cover nearly every
+element the generator writes, are filled with a single slice assignment.
+Other polygons fall back to a vectorised even-odd scanline fill. The PNG is
+encoded with zlib, so nothing beyond NumPy is needed.
+"""
+
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from .catalog import texture_colour
+from .plan_geometry import hole_geometry, is_label, item_corners, property_length, resolves, wall_ends
+
+DEFAULT_WIDTH = 512  # px
+MAX_WIDTH = 4096  # px
+MAX_HEIGHT = 4096  # px; taller plans are drawn narrower than requested
+
+# Blank border around the plan, as a fraction of its larger side
+MARGIN = 0.04
+
+BACKGROUND = (255, 255, 255)
+WALL_COLOUR = (51, 51, 51)
+DOOR_COLOUR = (139, 69, 19)
+WINDOW_COLOUR = (74, 144, 217)
+ITEM_COLOUR = (170, 170, 170)
+TEXT_COLOUR = (0, 0, 0)
+
+# 5x7 glyphs, one string of five pixels per row
+_GLYPH_ROWS = {
+    "A": "01110 10001 10001 11111 10001 10001 10001", "B": "11110 10001 10001 11110 10001 10001 11110",
+    "C": "01110 10001 10000 10000 10000 10001 01110", "D": "11110 10001 10001 10001 10001 10001 11110",
+    "E": "11111 10000 10000 11110 10000 10000 11111", "F": "11111 10000 10000 11110 10000 10000 10000",
+    "G": "01110 10001 10000 10111 10001 10001 01111", "H": "10001 10001 10001 11111 10001 10001 10001",
+    "I": "01110 00100 00100 00100 00100 00100 01110", "J": "00111 00010 00010 00010 00010 10010 01100",
+    "K": "10001 10010 10100 11000 10100 10010 10001", "L": "10000 10000 10000 10000 10000 10000 11111",
+    "M": "10001 11011 10101 10101 10001 10001 10001", "N": "10001 10001 11001 10101 10011 10001 10001",
+    "O": "01110 10001 10001 10001 10001 10001 01110", "P": "11110 10001 10001 11110 10000 10000 10000",
+    "Q": "01110 10001 10001 10001 10101 10010 01101", "R": "11110 10001 10001 11110 10100 10010 10001",
+    "S": "01111 10000 10000 01110 00001 00001 11110", "T": "11111 00100 00100 00100 00100 00100 00100",
+    "U": "10001 10001 10001 10001 10001 10001 01110", "V": "10001 10001 10001 10001 10001 01010 00100",
+    "W": "10001 10001 10001 10101 10101 10101 01010", "X": "10001 10001 01010 00100 01010 10001 10001",
+    "Y": "10001 10001 01010 00100 00100 00100 00100", "Z": "11111 00001 00010 00100 01000 10000 11111",
+    "0": "01110 10001 10011 10101 11001 10001 01110", "1": "00100 01100 00100 00100 00100 00100 01110",
+    "2": "01110 10001 00001 00010 00100 01000 11111", "3": "11111 00010 00100 00010 00001 10001 01110",
+    "4": "00010 00110 01010 10010 11111 00010 00010", "5": "11111 10000 11110 00001 00001 10001 01110",
+    "6": "00110 01000 10000 11110 10001 10001 01110", "7": "11111 00001 00010 00100 01000 01000 01000",
+    "8": "01110 10001 10001 01110 10001 10001 01110", "9": "01110 10001 10001 01111 00001 00010 01100",
+    " ": "00000 00000 00000 00000 00000 00000 00000", "-": "00000 00000 00000 11111 00000 00000 00000",
+    ".": "00000 00000 00000 00000 00000 01100 01100", "/": "00000 00001 00010 00100 01000 10000 00000",
+    "&": "01100 10010 10100 01000 10101 10010 01101", "'": "01100 00100 01000 00000 00000 00000 00000",
+    "(": "00010 00100 01000 01000 01000 00100 00010", ")": "01000 00100 00010 00010 00010 00100 01000",
+    ":": "00000 01100 01100 00000 01100 01100 00000", "?": "01110 10001 00001 00010 00100 00000 00100"
+}
+_GLYPHS = {char: np.array([[bit == "1" for bit in row] for row in rows.split()]) for char, rows in _GLYPH_ROWS.items()}
+GLYPH_WIDTH, GLYPH_HEIGHT = 5, 7
+
+def _rgb(colour, default=BACKGROUND):
+    """(r, g, b, alpha) from #RGB, #RRGGBB or #RRGGBBAA"""
+    colour = str(colour or "").lstrip("#")
+    if len(colour) == 3:
+        colour = "".join(c * 2 for c in colour)
+    try:
+        r, g, b = (int(colour[i:i + 2], 16) for i in (0, 2, 4))
+        alpha = int(colour[6:8], 16) / 255 if len(colour) >= 8 else 1.0
+    except ValueError:
+        return default + (1.0,)
+    return r, g, b, alpha
+
+class _Canvas:
+    """RGB pixel buffer with plan-to-pixel mapping (plan y points up, pixel rows down)"""
+
+    def __init__(self, bounds, width):
+        min_x, min_y, max_x, max_y = bounds
+        span = max(max_x - min_x, max_y - min_y, 1)
+        margin = span * MARGIN
+        plan_width = max_x - min_x + 2 * margin or 1
+        plan_height = max_y - min_y + 2 * margin
+        # The height follows the plan's aspect ratio, so it is capped too
+        self.scale = min(width / plan_width, MAX_HEIGHT / plan_height)
+        self.left = min_x - margin
+        self.top = max_y + margin
+        width = max(1, min(width, int(math.ceil(plan_width * self.scale))))
+        height = max(1, min(MAX_HEIGHT, int(math.ceil(plan_height * self.scale))))
+        self.pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self.pixels[:] = BACKGROUND
+
+    def to_px(self, x, y):
+        return (x - self.left) * self.scale, (self.top - y) * self.scale
+
+    def fill_rect_px(self, x1, y1, x2, y2, colour, alpha=1.0):
+        height, width, _ = self.pixels.shape
+        c1, c2 = max(0, int(round(min(x1, x2)))), min(width, int(round(max(x1, x2))))
+        r1, r2 = max(0, int(round(min(y1, y2)))), min(height, int(round(max(y1, y2))))
+        if c1 >= c2 or r1 >= r2:
+            return
+        region = self.pixels[r1:r2, c1:c2]
+        if alpha >= 1.0:
+            region[:] = colour
+        else:
+            region[:] = (region * (1 - alpha) + np.array(colour) * alpha).astype(np.uint8)
+
+    def fill_polygon(self, points, colour):
+        """Fill a plan-space polygon; axis-aligned rectangles take the slice fast path"""
+        px = [self.to_px(x, y) for x, y in points]
+        xs = [p[0] for p in px]
+        ys = [p[1] for p in px]
+        if len(px) == 4 and len({round(x, 3) for x in xs}) <= 2 and len({round(y, 3) for y in ys}) <= 2:
+            self.fill_rect_px(min(xs), min(ys), max(xs), max(ys), colour)
+            return
+        self._scanline(np.array(xs), np.array(ys), colour)
+
+    def _scanline(self, xs, ys, colour):
+        height, width, _ = self.pixels.shape
+        r1, r2 = max(0, int(math.floor(ys.min()))), min(height, int(math.ceil(ys.max())))
+        if r1 >= r2:
+            return
+
+        # Crossings of every pixel-row centre with every edge, at once
+        rows = np.arange(r1, r2) + 0.5
+        x0, y0, x1, y1 = xs, ys, np.roll(xs, -1), np.roll(ys, -1)
+        crosses = (y0[None, :] <= rows[:, None]) != (y1[None, :] <= rows[:, None])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            at = x0[None, :] + (rows[:, None] - y0[None, :]) * (x1 - x0)[None, :] / (y1 - y0)[None, :]
+        at = np.where(crosses, at, np.inf)
+        at.sort(axis=1)
+
+        for row, hits in zip(range(r1, r2), at):
+            hits = hits[np.isfinite(hits)]
+            for start, end in zip(hits[0::2], hits[1::2]):
+                c1, c2 = max(0, int(round(start))), min(width, int(round(end)))
+                if c1 < c2:
+                    self.pixels[row, c1:c2] = colour
+
+    def fill_segment(self, ax, ay, bx, by, thickness, colour):
+        """Fill the band of the given plan thickness around a plan segment"""
+        length = math.hypot(bx - ax, by - ay)
+        if not length:
+            return
+        half = thickness / 2
+        nx, ny = -(by - ay) / length * half, (bx - ax) / length * half
+        ex, ey = (bx - ax) / length * half, (by - ay) / length * half
+        self.fill_polygon([(ax - ex + nx, ay - ey + ny), (bx + ex + nx, by + ey + ny),
+                           (bx + ex - nx, by + ey - ny), (ax - ex - nx, ay - ey - ny)], colour)
+
+    def text(self, x, y, text, colour, scale, max_width=None):
+        """Draw text centred on a pixel position; returns nothing if it cannot fit at all"""
+        advance = (GLYPH_WIDTH + 1) * scale
+        if max_width is not None:
+            text = text[:max(0, int(max_width // advance))]
+        if not text:
+            return
+        left = int(round(x - (len(text) * advance - scale) / 2))
+        top = int(round(y - GLYPH_HEIGHT * scale / 2))
+        height, width, _ = self.pixels.shape
+        for i, char in enumerate(text):
+            glyph = _GLYPHS.get(char.upper(), _GLYPHS["?"])
+            if scale > 1:
+                glyph = glyph.repeat(scale, axis=0).repeat(scale, axis=1)
+            gx = left + i * advance
+            r1, c1 = max(0, top), max(0, gx)
+            r2, c2 = min(height, top + glyph.shape[0]), min(width, gx + glyph.shape[1])
+            if r1 < r2 and c1 < c2:
+                mask = glyph[r1 - top:r2 - top, c1 - gx:c2 - gx]
+                self.pixels[r1:r2, c1:c2][mask] = colour
+
+def _layer_bounds(layer):
+    xs = [v["x"] for v in layer.get("vertices", {}).values()]
+    ys = [v["y"] for v in layer.get("vertices", {}).values()]
+    if not xs:
+        return 0, 0, 1, 1
+    return min(xs), min(ys), max(xs), max(ys)
+
+def render_layer(layer, width=DEFAULT_WIDTH):
+    """RGB array (rows, columns, 3) of one layer, at most width x MAX_HEIGHT pixels"""
+    canvas = _Canvas(_layer_bounds(layer), width)
+    width = canvas.pixels.shape[1]
+    vertices = layer.get("vertices", {})
+
+    for area in layer.get("areas", {}).values():
+        # Dangling references are skipped, as the vector and mesh exporters do
+        points = [(vertices[vid]["x"], vertices[vid]["y"]) for vid in area.get("vertices", ()) if resolves(vertices, vid)]
+        if len(points) >= 3:
+            canvas.fill_polygon(points, _rgb(texture_colour(area.get("properties", {}).get("texture")))[:3])
+
+    for wall in layer.get("lines", {}).values():
+        ends = wall_ends(vertices, wall)
+        if ends is None:
+            continue
+        a, b = ends
+        thickness = property_length(wall.get("properties", {}), "thickness", 20)
+        canvas.fill_segment(a["x"], a["y"], b["x"], b["y"], thickness, WALL_COLOUR)
+
+    for hole in layer.get("holes", {}).values():
+        geometry = hole_geometry(layer, hole)
+        if geometry is None:
+            continue
+        cx, cy, (ux, uy), _, width_cm, thickness = geometry
+        ax, ay = cx - ux * width_cm / 2, cy - uy * width_cm / 2
+        bx, by = cx + ux * width_cm / 2, cy + uy * width_cm / 2
+        canvas.fill_segment(ax, ay, bx, by, thickness + 2, BACKGROUND)
+        colour = WINDOW_COLOUR if hole.get("type") == "window" else DOOR_COLOUR
+        canvas.fill_segment(ax, ay, bx, by, thickness / 3, colour)
+
+    labels = []
+    for item in layer.get("items", {}).values():
+        if is_label(item):
+            labels.append(item)
+            continue
+        canvas.fill_polygon(item_corners(item), ITEM_COLOUR)
+
+    # Labels no wider than their room, when the room index says how wide that is
+    room_widths = {}
+    for area in layer.get("areas", {}).values():
+        misc = area.get("misc") or {}
+        if misc.get("label") and misc.get("bounds"):
+            room_widths[misc["label"]] = (misc["bounds"][2] - misc["bounds"][0]) * canvas.scale
+
+    glyph_scale = max(1, width // 768)
+    for item in labels:
+        properties = item.get("properties", {})
+        text = str(properties.get("text", item.get("name", "")))
+        x, y = canvas.to_px(item["x"], item["y"])
+        max_width = room_widths.get(item.get("id"), width) - 4
+        shown = min(len(text), max(0, int(max_width // ((GLYPH_WIDTH + 1) * glyph_scale))))
+        if not shown:
+            continue
+        half_w = (shown * (GLYPH_WIDTH + 1) * glyph_scale) / 2 + 2
+        half_h = GLYPH_HEIGHT * glyph_scale / 2 + 2
+        r, g, b, alpha = _rgb(properties.get("backgroundColor"))
+        canvas.fill_rect_px(x - half_w, y - half_h, x + half_w, y + half_h, (r, g, b), alpha)
+        canvas.text(x, y, text, TEXT_COLOUR, glyph_scale, max_width)
+
+    return canvas.pixels
+
+def encode_png(pixels):
+    """PNG bytes for an RGB uint8 array"""
+    height, width, _ = pixels.shape
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # filter byte 0 per row
+    raw[:, 1:] = pixels.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), 6))
+            + chunk(b"IEND", b""))
+
+def render_png(design, width=DEFAULT_WIDTH, layer_id=None):
+    """PNG of one layer of a design (the selected layer by default)"""
+    layers = design.get("layers", {})
+    if not layers:
+        raise ValueError("design has no layers")
+    layer_id = layer_id or design.get("selectedLayer")
+    layer = layers.get(layer_id) or next(iter(layers.values()))
+    return encode_png(render_layer(layer, max(16, min(int(width), MAX_WIDTH))))
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from config import Config
+from .design_cache import design_hash
+from .mesh_export import render_glb
+from .raster import DEFAULT_WIDTH, MAX_WIDTH, render_png
+
+class RenderCache:
+    """Size-bounded on-disk cache of rendered files, evicting the least recently used
+
+    Files are written atomically (temp file + rename), so concurrent workers can share
+    the directory. A hit refreshes the file's mtime, which is what eviction orders by.
+    """
+
+    def __init__(self, directory, max_bytes, suffix):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self._current_bytes = None  # Scanned from disk on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        # Two-character fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def get(self, key):
+        """Cached bytes, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Store rendered bytes, evicting the oldest files over the byte budget"""
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            if self._current_bytes is None:
+                self._current_bytes = sum(size for _, size, _ in self._files())
+            try:
+                self._current_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp, path)
+            self._current_bytes += len(data)
+
+            if self._current_bytes > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        """(path, size, mtime) of every cached file"""
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Down to 90% of the budget, so a full cache does not rescan on every write
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._files(), key=lambda entry: entry[2]):
+            if self._current_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._current_bytes -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Delete every cached file"""
+        with self._lock:
+            for path, _, _ in list(self._files()):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._current_bytes = 0
+
+    def stats(self):
+        """Cache statistics for health and metrics endpoints"""
+        with self._lock:
+            return {
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Process-wide caches of PNG thumbnails and GLB meshes
+thumbnail_cache = RenderCache(Config.THUMBNAIL_CACHE_DIR, Config.THUMBNAIL_CACHE_MAX_BYTES, ".png")
+mesh_cache = RenderCache(Config.MESH_CACHE_DIR, Config.MESH_CACHE_MAX_BYTES, ".glb")
+
+def _thumbnail_width(width):
+    return max(16, min(int(width), MAX_WIDTH))
+
+def thumbnail_key(design, width=DEFAULT_WIDTH, layer_id=None):
+    """Cache key of a thumbnail: the design's content hash plus the render options, so it also serves as an ETag"""
+    # Hashed again with the options, so nothing from the request reaches the file path
+    options = f"{design_hash(design)}:{_thumbnail_width(width)}:{layer_id or design.get('selectedLayer') or ''}"
+    return hashlib.sha256(options.encode("utf-8")).hexdigest()
+
+def get_thumbnail(design, width=DEFAULT_WIDTH, layer_id=None, key=None):
+    """(cache key, PNG bytes) for a design, rendered only on a cache miss; pass key if it is already known"""
+    key = key or thumbnail_key(design, width, layer_id)
+    png = thumbnail_cache.get(key)
+    if png is None:
+        png = render_png(design, _thumbnail_width(width), layer_id)
+        thumbnail_cache.put(key, png)
+    return key, png
+
+def mesh_key(design):
+    """Cache key (and ETag) of a design's mesh: its content hash"""
+    return design_hash(design)
+
+def get_mesh(design, key=None):
+    """(cache key, GLB bytes) for a design, built only on a cache miss; pass key if it is already known"""
+    key = key or mesh_key(design)
+    glb = mesh_cache.get(key)
+    if glb is None:
+        glb = render_glb(design)
+        mesh_cache.put(key, glb)
+    return key, glb
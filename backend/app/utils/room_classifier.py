@@ -0,0 +1,59 @@
+"""
+Room-type classification from free-text room names.
+
+The keyword table (PROFESSIONAL_CONFIG["room_keywords"]) is compiled once into
+a single regex alternation, wrapped in a lookahead so one pass over the name
+reports every keyword at every position, overlaps included. Keywords match
+whole words, optionally compounded with "room" or inflected ("bedroom",
+"closets", "cooking"), so "Example room" is not an exam room and "Salad bar"
+is not a sala. Adding synonyms or languages grows the alternation, not the
+number of scans. The best (lowest)
+priority among the matches decides the type, and results are cached per
+normalised name.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from config import Config
+
+DEFAULT_ROOM_TYPE = "generic"
+
+# Endings a keyword may carry and still count as a whole-word match
+SUFFIXES = "rooms?|s|es|ing"
+
+def normalize_name(name):
+    """Casefolded name with accents removed and whitespace collapsed"""
+    decomposed = unicodedata.normalize("NFKD", str(name).casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+def _compile(table):
+    """(pattern, keyword -> (priority, room type)) for a keyword table"""
+    keywords = {}
+    for priority, room_type, words in table:
+        for word in words:
+            word = normalize_name(word)
+            # A keyword listed twice keeps its best priority
+            if word not in keywords or priority < keywords[word][0]:
+                keywords[word] = (priority, room_type)
+
+    # Longest first, so a position reports "powder room" rather than a shorter keyword
+    alternation = "|".join(re.escape(word) for word in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?=\b({alternation})(?:{SUFFIXES})?\b)"), keywords
+
+_pattern, _keywords = _compile(Config.PROFESSIONAL_CONFIG["room_keywords"])
+
+@lru_cache(maxsize=4096)
+def _classify(normalized):
+    best = None
+    for match in _pattern.finditer(normalized):
+        entry = _keywords[match.group(1)]
+        if best is None or entry[0] < best[0]:
+            best = entry
+    return best[1] if best else DEFAULT_ROOM_TYPE
+
+def classify_room(name):
+    """Room type for a room name, or "generic" when no keyword matches"""
+    return _classify(normalize_name(name))
@@ -0,0 +1,44 @@
+"""
+Server-Sent Events helpers for streamed chat replies.
+
+sse_event formats one event with a JSON payload. MarkerFilter removes a
+control marker (such as [GENERATE_DESIGN]) from text that arrives in chunks:
+a marker can be split across chunks, so any tail that could be the start of
+one is held back until the next chunk decides it.
+"""
+
+from .fast_json import dumps_bytes
+
+def sse_event(event, data):
+    """One SSE event named `event` with `data` encoded as JSON, as bytes"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps_bytes(data) + b"\n\n"
+
+class MarkerFilter:
+    """Strip `marker` from a stream of text chunks; `found` tells whether it appeared"""
+
+    __slots__ = ("marker", "found", "_pending")
+
+    def __init__(self, marker):
+        self.marker = marker
+        self.found = False
+        self._pending = ""
+
+    def feed(self, text):
+        """Text of this chunk that is safe to forward, with the marker removed"""
+        text = self._pending + text
+        if self.marker in text:
+            self.found = True
+            text = text.replace(self.marker, "")
+
+        # Hold back the longest tail that is a proper prefix of the marker
+        for size in range(min(len(text), len(self.marker) - 1), 0, -1):
+            if self.marker.startswith(text[-size:]):
+                self._pending = text[-size:]
+                return text[:-size]
+        self._pending = ""
+        return text
+
+    def flush(self):
+        """Text held back at the end of the stream"""
+        text, self._pending = self._pending, ""
+        return text
@@ -0,0 +1,125 @@
+"""
+Lightweight per-phase timing spans.
+
+Wrap a phase in `with span("layout"):`. Every span is added to process-wide
+per-phase statistics. While a request is being traced (begin_request), it is
+also collected for that request's Server-Timing header. The active request's
+span list lives in a contextvar, so threads and greenlets serving different
+requests never see each other's spans. Outside a traced request a span costs
+two perf_counter calls and one locked update.
+
+Work handed to the generation pool runs in other processes, whose stats nobody
+reads. Jobs run there through call_with_spans, and the parent adds the spans
+they send back with record_spans, to its own stats and to the request it is
+serving.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Spans of the request being served, or None when nothing is tracing
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+def record(name, ms):
+    """Add a finished phase of `ms` milliseconds to the request's spans and the aggregate stats"""
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, ms))
+
+    with _stats_lock:
+        entry = _stats.get(name)
+        if entry is None:
+            _stats[name] = [1, ms, ms]
+        else:
+            entry[0] += 1
+            entry[1] += ms
+            if ms > entry[2]:
+                entry[2] = ms
+
+def record_spans(spans):
+    """Record (name, ms) spans measured elsewhere, such as in a pool worker"""
+    for name, ms in spans:
+        record(name, ms)
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as phase `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - start) * 1000)
+
+def begin_request():
+    """Start collecting spans for the current request"""
+    _request_spans.set([])
+
+def end_request():
+    """Stop collecting and return the request's spans as (name, ms) pairs"""
+    spans = _request_spans.get()
+    _request_spans.set(None)
+    return spans or []
+
+def server_timing_header(spans):
+    """Server-Timing header value; repeated phases are summed into one metric"""
+    totals = {}
+    for name, ms in spans:
+        totals[name] = totals.get(name, 0.0) + ms
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in totals.items())
+
+def timed_iter(name, chunks):
+    """Yield from chunks, recording the time spent producing them as phase `name`
+
+    Used for streamed response bodies, which are encoded after the headers are sent,
+    so the phase only reaches the aggregate stats.
+    """
+    elapsed = 0.0
+    iterator = iter(chunks)
+    while True:
+        start = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            elapsed += time.perf_counter() - start
+        yield chunk
+    record(name, elapsed * 1000)
+
+def call_with_spans(fn, *args):
+    """Run fn(*args), returning (result, the spans it recorded); picklable for pool workers via partial"""
+    token = _request_spans.set([])
+    try:
+        result = fn(*args)
+        return result, _request_spans.get()
+    finally:
+        _request_spans.reset(token)
+
+def _summary(snapshot):
+    return {
+        name: {
+            "count": count,
+            "total_ms": round(total, 3),
+            "mean_ms": round(total / count, 3),
+            "max_ms": round(peak, 3)
+        }
+        for name, (count, total, peak) in sorted(snapshot.items())
+    }
+
+def timing_stats():
+    """Per-phase count, total, mean and max in milliseconds since startup (or the last reset)"""
+    with _stats_lock:
+        snapshot = {name: list(entry) for name, entry in _stats.items()}
+    return _summary(snapshot)
+
+def reset_timing_stats():
+    """Clear the stats, returning them as they stood so no span is lost between a read and the reset"""
+    with _stats_lock:
+        snapshot = dict(_stats)
+        _stats.clear()
+    return _summary(snapshot)
@@ -0,0 +1,99 @@
+from bisect import bisect_left
+from collections import defaultdict
+
+def _worst_ratio(row_sum, row_min, row_max, side):
+    """Worst aspect ratio of a row of areas laid along a side of the given length"""
+    side_sq = side * side
+    sum_sq = row_sum * row_sum
+    return max(side_sq * row_max / sum_sq, sum_sq / (side_sq * row_min))
+
+def squarify(sizes, x, y, width, height):
+    """Squarified treemap: rectangles (x1, y1, x2, y2) with areas proportional to sizes
+
+    Rectangles are returned in input order and tile the box exactly. Sorting
+    dominates, so the layout is O(n log n).
+    """
+    if not sizes:
+        return []
+
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True)
+    scale = width * height / sum(sizes)
+    values = [sizes[i] * scale for i in order]
+    rects = [None] * len(sizes)
+
+    start = 0
+    count = len(values)
+    while start < count:
+        side = min(width, height)
+
+        # Grow the row while the worst aspect ratio keeps improving
+        row_sum = row_min = row_max = values[start]
+        worst = _worst_ratio(row_sum, row_min, row_max, side)
+        end = start + 1
+        while end < count:
+            value = values[end]
+            ratio = _worst_ratio(row_sum + value, min(row_min, value), max(row_max, value), side)
+            if ratio > worst:
+                break
+            row_sum += value
+            row_min = min(row_min, value)
+            row_max = max(row_max, value)
+            worst = ratio
+            end += 1
+
+        # The last row takes whatever is left so the box is tiled exactly
+        last_row = end == count
+        if width >= height:
+            thickness = width if last_row else row_sum / side
+            x2 = x + thickness
+            position = y
+            for k in range(start, end):
+                next_position = y + height if k == end - 1 else position + values[k] / thickness
+                rects[order[k]] = (x, position, x2, next_position)
+                position = next_position
+            x, width = x2, width - thickness
+        else:
+            thickness = height if last_row else row_sum / side
+            y2 = y + thickness
+            position = x
+            for k in range(start, end):
+                next_position = x + width if k == end - 1 else position + values[k] / thickness
+                rects[order[k]] = (position, y, next_position, y2)
+                position = next_position
+            y, height = y2, height - thickness
+
+        start = end
+
+    return rects
+
+def _split_line(edges):
+    """Split collinear edges (start, end, owner) at every endpoint on the line"""
+    points = sorted({point for start, end, _ in edges for point in (start, end)})
+    pieces = defaultdict(list)
+    for start, end, owner in edges:
+        for k in range(bisect_left(points, start), bisect_left(points, end)):
+            pieces[(points[k], points[k + 1])].append(owner)
+    return pieces.items()
+
+def shared_segments(rects):
+    """Atomic wall segments of a tiling, each with the indices of the (one or two) rectangles it bounds
+
+    Returns a list of ((x1, y1), (x2, y2), owners). Segments with a single owner
+    lie on the outer boundary.
+    """
+    horizontal = defaultdict(list)
+    vertical = defaultdict(list)
+    for index, (x1, y1, x2, y2) in enumerate(rects):
+        horizontal[y1].append((x1, x2, index))
+        horizontal[y2].append((x1, x2, index))
+        vertical[x1].append((y1, y2, index))
+        vertical[x2].append((y1, y2, index))
+
+    segments = []
+    for y, edges in horizontal.items():
+        for (start, end), owners in _split_line(edges):
+            segments.append(((start, y), (end, y), owners))
+    for x, edges in vertical.items():
+        for (start, end), owners in _split_line(edges):
+            segments.append(((x, start), (x, end), owners))
+    return segments
@@ -0,0 +1,227 @@
+"""
+SVG and DXF export of react-planner designs, streamed entity by entity.
+
+Both writers walk the design once, layer by layer, and yield each entity as
+soon as it is formatted. The encoded output is coalesced into chunks of about
+64 KB (fast_json.coalesce_chunks). Memory therefore stays flat however many
+walls or layers a plan has. The one extra pass is over vertex coordinates,
+for the SVG viewBox.
+
+react-planner's y axis points up, like DXF's. SVG's points down, so SVG
+coordinates are flipped.
+"""
+
+import math
+from xml.sax.saxutils import escape, quoteattr
+
+from .fast_json import coalesce_chunks
+from .plan_geometry import area_colour, hole_geometry, is_label, item_corners, property_length, wall_ends
+
+# Blank border around an SVG drawing
+SVG_MARGIN = 100  # cm
+
+WALL_COLOUR = "#333333"
+DOOR_COLOUR = "#8B4513"
+WINDOW_COLOUR = "#4A90D9"
+ITEM_COLOUR = "#777777"
+
+# DXF layer suffixes and their ACI colours
+DXF_CATEGORIES = (("AREAS", 8), ("WALLS", 7), ("DOORS", 1), ("WINDOWS", 5), ("ITEMS", 3), ("TEXT", 2))
+
+def design_bounds(design):
+    """(min x, min y, max x, max y) over every layer's vertices and items"""
+    min_x = min_y = math.inf
+    max_x = max_y = -math.inf
+    for layer in design.get("layers", {}).values():
+        for table in ("vertices", "items"):
+            for element in layer.get(table, {}).values():
+                x, y = element["x"], element["y"]
+                if x < min_x: min_x = x
+                if x > max_x: max_x = x
+                if y < min_y: min_y = y
+                if y > max_y: max_y = y
+    if min_x == math.inf:
+        return 0, 0, 0, 0
+    return min_x, min_y, max_x, max_y
+
+def _svg_pieces(design):
+    min_x, min_y, max_x, max_y = design_bounds(design)
+    left = min_x - SVG_MARGIN
+    top = max_y + SVG_MARGIN
+    width = max_x - min_x + 2 * SVG_MARGIN
+    height = max_y - min_y + 2 * SVG_MARGIN
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{left:.1f} 0 {width:.1f} {height:.1f}" '
+           f'width="{width:.0f}" height="{height:.0f}">\n')
+
+    for layer_id, layer in design.get("layers", {}).items():
+        vertices = layer.get("vertices", {})
+        yield f'<g id={quoteattr(str(layer_id))} data-altitude="{layer.get("altitude", 0)}">\n'
+
+        yield '<g class="areas" stroke="none">\n'
+        for area in layer.get("areas", {}).values():
+            points = " ".join(f"{vertices[vid]['x']:.1f},{top - vertices[vid]['y']:.1f}"
+                              for vid in area.get("vertices", ()) if vid in vertices)
+            yield f'<polygon points="{points}" fill="{area_colour(area)}"/>\n'
+        yield '</g>\n'
+
+        yield f'<g class="walls" stroke="{WALL_COLOUR}" stroke-linecap="square">\n'
+        for wall in layer.get("lines", {}).values():
+            ends = wall_ends(vertices, wall)
+            if ends is None:
+                continue
+            a, b = ends
+            thickness = property_length(wall.get("properties", {}), "thickness", 20)
+            yield (f'<line x1="{a["x"]:.1f}" y1="{top - a["y"]:.1f}" x2="{b["x"]:.1f}" y2="{top - b["y"]:.1f}" '
+                   f'stroke-width="{thickness:.1f}"/>\n')
+        yield '</g>\n'
+
+        yield '<g class="holes" fill="none">\n'
+        for hole in layer.get("holes", {}).values():
+            geometry = hole_geometry(layer, hole)
+            if geometry is None:
+                continue
+            cx, cy, (ux, uy), (nx, ny), width, thickness = geometry
+            ax, ay = cx - ux * width / 2, cy - uy * width / 2
+            bx, by = cx + ux * width / 2, cy + uy * width / 2
+
+            # Clear the wall across the opening, then draw the window or the door swing
+            yield (f'<line x1="{ax:.1f}" y1="{top - ay:.1f}" x2="{bx:.1f}" y2="{top - by:.1f}" '
+                   f'stroke="#FFFFFF" stroke-width="{thickness + 2:.1f}"/>\n')
+            if hole.get("type") == "window":
+                yield (f'<line x1="{ax:.1f}" y1="{top - ay:.1f}" x2="{bx:.1f}" y2="{top - by:.1f}" '
+                       f'stroke="{WINDOW_COLOUR}" stroke-width="{thickness / 3:.1f}"/>\n')
+            elif hole.get("type") == "door":
+                ex, ey = ax + nx * width, ay + ny * width
+                yield (f'<path d="M{ax:.1f},{top - ay:.1f} L{ex:.1f},{top - ey:.1f} '
+                       f'A{width:.1f},{width:.1f} 0 0 0 {bx:.1f},{top - by:.1f}" '
+                       f'stroke="{DOOR_COLOUR}" stroke-width="3"/>\n')
+            else:
+                yield (f'<line x1="{ax:.1f}" y1="{top - ay:.1f}" x2="{bx:.1f}" y2="{top - by:.1f}" '
+                       f'stroke="{DOOR_COLOUR}" stroke-width="{thickness / 3:.1f}" stroke-dasharray="20,10"/>\n')
+        yield '</g>\n'
+
+        yield f'<g class="items" fill="none" stroke="{ITEM_COLOUR}" stroke-width="2">\n'
+        for item in layer.get("items", {}).values():
+            if is_label(item):
+                continue
+            points = " ".join(f"{x:.1f},{top - y:.1f}" for x, y in item_corners(item))
+            yield f'<polygon points="{points}"><title>{escape(str(item.get("name", "")))}</title></polygon>\n'
+        yield '</g>\n'
+
+        yield '<g class="labels" text-anchor="middle" dominant-baseline="middle" font-family="sans-serif">\n'
+        for item in layer.get("items", {}).values():
+            if not is_label(item):
+                continue
+            properties = item.get("properties", {})
+            size = property_length(properties, "fontSize", 30)
+            yield (f'<text x="{item["x"]:.1f}" y="{top - item["y"]:.1f}" font-size="{size}" font-weight="bold">'
+                   f'{escape(str(properties.get("text", item.get("name", ""))))}</text>\n')
+        yield '</g>\n'
+
+        yield '</g>\n'
+
+    yield '</svg>\n'
+
+def iter_svg(design):
+    """Yield a design as SVG in byte chunks"""
+    return coalesce_chunks(piece.encode("utf-8") for piece in _svg_pieces(design))
+
+def _dxf_layer_name(layer_id, category):
+    return f"{layer_id}-{category}".upper().replace(" ", "_")
+
+def _dxf_polyline(layer_name, points, elevation, closed=True, thickness=0):
+    head = f"0\nPOLYLINE\n8\n{layer_name}\n66\n1\n70\n{1 if closed else 0}\n10\n0\n20\n0\n30\n{elevation:.1f}\n"
+    if thickness:
+        head += f"39\n{thickness:.1f}\n"
+    body = "".join(f"0\nVERTEX\n8\n{layer_name}\n10\n{x:.2f}\n20\n{y:.2f}\n30\n{elevation:.1f}\n" for x, y in points)
+    return head + body + f"0\nSEQEND\n8\n{layer_name}\n"
+
+def _dxf_line(layer_name, x1, y1, x2, y2, elevation):
+    return (f"0\nLINE\n8\n{layer_name}\n10\n{x1:.2f}\n20\n{y1:.2f}\n30\n{elevation:.1f}\n"
+            f"11\n{x2:.2f}\n21\n{y2:.2f}\n31\n{elevation:.1f}\n")
+
+def _dxf_pieces(design):
+    layers = design.get("layers", {})
+
+    # AutoCAD R12 ASCII DXF, in centimetres
+    yield "0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n9\n$INSUNITS\n70\n5\n0\nENDSEC\n"
+
+    yield f"0\nSECTION\n2\nTABLES\n0\nTABLE\n2\nLAYER\n70\n{len(layers) * len(DXF_CATEGORIES)}\n"
+    for layer_id in layers:
+        for category, colour in DXF_CATEGORIES:
+            yield f"0\nLAYER\n2\n{_dxf_layer_name(layer_id, category)}\n70\n0\n62\n{colour}\n6\nCONTINUOUS\n"
+    yield "0\nENDTAB\n0\nENDSEC\n"
+
+    yield "0\nSECTION\n2\nENTITIES\n"
+    for layer_id, layer in layers.items():
+        vertices = layer.get("vertices", {})
+        elevation = layer.get("altitude", 0) or 0
+        names = {category: _dxf_layer_name(layer_id, category) for category, _ in DXF_CATEGORIES}
+
+        for area in layer.get("areas", {}).values():
+            points = [(vertices[vid]["x"], vertices[vid]["y"]) for vid in area.get("vertices", ()) if vid in vertices]
+            if len(points) >= 3:
+                yield _dxf_polyline(names["AREAS"], points, elevation)
+
+        # Walls as closed outlines extruded to their height
+        for wall in layer.get("lines", {}).values():
+            ends = wall_ends(vertices, wall)
+            if ends is None:
+                continue
+            a, b = ends
+            length = math.hypot(b["x"] - a["x"], b["y"] - a["y"])
+            if not length:
+                continue
+            properties = wall.get("properties", {})
+            half = property_length(properties, "thickness", 20) / 2
+            nx, ny = -(b["y"] - a["y"]) / length * half, (b["x"] - a["x"]) / length * half
+            outline = [(a["x"] + nx, a["y"] + ny), (b["x"] + nx, b["y"] + ny),
+                       (b["x"] - nx, b["y"] - ny), (a["x"] - nx, a["y"] - ny)]
+            yield _dxf_polyline(names["WALLS"], outline, elevation, thickness=property_length(properties, "height", 300))
+
+        for hole in layer.get("holes", {}).values():
+            geometry = hole_geometry(layer, hole)
+            if geometry is None:
+                continue
+            cx, cy, (ux, uy), (nx, ny), width, thickness = geometry
+            ax, ay = cx - ux * width / 2, cy - uy * width / 2
+            bx, by = cx + ux * width / 2, cy + uy * width / 2
+
+            if hole.get("type") == "window":
+                for side in (-0.5, 0.5):
+                    ox, oy = nx * thickness * side, ny * thickness * side
+                    yield _dxf_line(names["WINDOWS"], ax + ox, ay + oy, bx + ox, by + oy, elevation)
+            elif hole.get("type") == "door":
+                # Leaf from the hinge and its quarter-circle swing, counter-clockwise from the far jamb
+                yield _dxf_line(names["DOORS"], ax, ay, ax + nx * width, ay + ny * width, elevation)
+                start = math.degrees(math.atan2(uy, ux))
+                end = start + 90
+                yield (f"0\nARC\n8\n{names['DOORS']}\n10\n{ax:.2f}\n20\n{ay:.2f}\n30\n{elevation:.1f}\n"
+                       f"40\n{width:.2f}\n50\n{start % 360:.2f}\n51\n{end % 360:.2f}\n")
+            else:
+                yield _dxf_line(names["DOORS"], ax, ay, bx, by, elevation)
+
+        for item in layer.get("items", {}).values():
+            if is_label(item):
+                properties = item.get("properties", {})
+                text = str(properties.get("text", item.get("name", ""))).replace("\n", " ")
+                size = property_length(properties, "fontSize", 30)
+                yield (f"0\nTEXT\n8\n{names['TEXT']}\n10\n{item['x']:.2f}\n20\n{item['y']:.2f}\n30\n{elevation:.1f}\n"
+                       f"40\n{size}\n1\n{text}\n72\n1\n73\n2\n"
+                       f"11\n{item['x']:.2f}\n21\n{item['y']:.2f}\n31\n{elevation:.1f}\n")
+            else:
+                yield _dxf_polyline(names["ITEMS"], item_corners(item), elevation)
+
+    yield "0\nENDSEC\n0\nEOF\n"
+
+def iter_dxf(design):
+    """Yield a design as ASCII DXF (R12) in byte chunks"""
+    return coalesce_chunks(piece.encode("utf-8") for piece in _dxf_pieces(design))
+
+# Format -> (chunk iterator, MIME type)
+VECTOR_EXPORTERS = {
+    "svg": (iter_svg, "image/svg+xml"),
+    "dxf": (iter_dxf, "application/dxf")
+}
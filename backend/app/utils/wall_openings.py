@@ -0,0 +1,58 @@
+from bisect import bisect_right, insort
+
+class WallOpenings:
+    """Sorted, non-overlapping intervals (cm along the wall) occupied by holes on one wall"""
+    __slots__ = ("length", "starts", "ends")
+
+    def __init__(self, length):
+        self.length = length
+        self.starts = []
+        self.ends = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def fits(self, center, width, clearance=0):
+        """Whether a hole of the given width centred at `center` leaves `clearance` to walls ends and other holes"""
+        low = center - width / 2 - clearance
+        high = center + width / 2 + clearance
+        if low < 0 or high > self.length:
+            return False
+
+        # First interval ending after `low` is the only one that can overlap
+        i = bisect_right(self.ends, low)
+        return i == len(self.starts) or self.starts[i] >= high
+
+    def _slot_in_gap(self, k, center, width, clearance):
+        """Nearest centre to `center` in the k-th free gap (between intervals k-1 and k), or None if too narrow"""
+        low = (self.ends[k - 1] if k else 0) + clearance + width / 2
+        high = (self.starts[k] if k < len(self.starts) else self.length) - clearance - width / 2
+        if low > high:
+            return None
+        return min(max(center, low), high)
+
+    def _first_slot(self, gaps, center, width, clearance):
+        for k in gaps:
+            slot = self._slot_in_gap(k, center, width, clearance)
+            if slot is not None:
+                return slot
+        return None
+
+    def find_slot(self, center, width, clearance=0):
+        """Nearest centre to `center` where the hole fits; None if no gap on the wall is wide enough
+
+        The first gap wide enough on each side of `center` is the nearest one on that side,
+        so the sorted gaps are scanned outwards from the bisect position until one fits.
+        """
+        i = bisect_right(self.starts, center)
+        after = self._first_slot(range(i, len(self.starts) + 1), center, width, clearance)
+        before = self._first_slot(range(i - 1, -1, -1), center, width, clearance)
+
+        if after is None or (before is not None and abs(center - before) <= abs(after - center)):
+            return before
+        return after
+
+    def add(self, center, width):
+        """Record a hole occupying [center - width/2, center + width/2]"""
+        insort(self.starts, center - width / 2)
+        insort(self.ends, center + width / 2)
@@ -0,0 +1,73 @@
+"""
+Vector export benchmark
+Streams SVG and DXF exports of generated plans with about 1k and 10k walls
+(single storey) and the same plans repeated over several storeys. Each case
+reports wall time, output size and peak traced memory during the export, which
+should stay near one output chunk however large the plan is.
+
+Run from backend/:  python -m benchmarks.bench_export [--walls 10000] [--floors 4]
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.vector_export import VECTOR_EXPORTERS
+
+SEED = 1234
+
+# Treemap plans produce roughly this many walls per room
+WALLS_PER_ROOM = 2.8
+
+def build_plan(walls, floors=1):
+    rooms = max(1, round(walls / WALLS_PER_ROOM))
+    side = max(20, int((rooms * 25) ** 0.5))  # about 25 m2 per room
+    return smart_floor_plan_builder({
+        'space_type': 'office',
+        'width_meters': side,
+        'height_meters': side,
+        'layout': 'treemap',
+        'floors': floors,
+        'rooms': [{'name': f"Office {i + 1}"} for i in range(rooms)]
+    }, seed=SEED)
+
+def count(design, table):
+    return sum(len(layer[table]) for layer in design['layers'].values())
+
+def measure(exporter, design):
+    """(ms, output bytes, peak traced KB) for one full streamed export"""
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in exporter(design))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in exporter(design):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed * 1000, size, peak / 1024
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--walls', type=int, default=10000, help='walls in the largest plan (default 10000)')
+    parser.add_argument('--floors', type=int, default=4, help='storeys in the multi-storey cases (default 4)')
+    args = parser.parse_args(argv)
+
+    cases = []
+    for walls in sorted({min(1000, args.walls), args.walls}):
+        cases.append((f"{walls} walls", build_plan(walls)))
+        cases.append((f"{walls} walls x {args.floors} floors", build_plan(walls, args.floors)))
+
+    print(f"{'case':<26} {'walls':>7} {'items':>7} {'format':<6} {'ms':>9} {'MB':>8} {'peak KB':>9}")
+    for name, design in cases:
+        walls, items = count(design, 'lines'), count(design, 'items')
+        for fmt, (exporter, _) in VECTOR_EXPORTERS.items():
+            ms, size, peak_kb = measure(exporter, design)
+            print(f"{name:<26} {walls:>7} {items:>7} {fmt:<6} {ms:>9.1f} {size / 1e6:>8.2f} {peak_kb:>9.1f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
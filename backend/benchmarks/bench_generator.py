@@ -0,0 +1,200 @@
+"""
+Design generator benchmark suite with regression budgets
+Times process_room_requirements, build_grid_layout, add_furniture_and_accessories
+and the whole smart_floor_plan_builder over a fixed-seed matrix of space types,
+room counts and footprints, recording wall time, retained allocations and peak
+traced memory. Results are compared with benchmarks/baselines.json and the run
+fails when any case regresses beyond the budget. Wall times are only comparable
+on the machine that recorded them, so record baselines where the check runs.
+
+Run from backend/:  python -m benchmarks.bench_generator [--budget 0.25] [--update] [--filter hotel]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from config import Config
+from app.utils.design_cache import design_cache
+from app.utils.design_generator import add_furniture_and_accessories, build_grid_layout, footprint_cm, smart_floor_plan_builder
+from app.utils.design_utils import IdAllocator, process_room_requirements
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+SEED = 1234
+ROOM_COUNTS = (None, 25, 100)  # None = the space type's own template
+FOOTPRINTS = ((10, 8), (40, 30))  # metres
+METRICS = ('ms', 'blocks', 'peak_kb')
+
+# Wall times below this are too noisy to budget
+MIN_BUDGET_MS = 0.5
+
+def build_cases():
+    """Fixed requirement matrix: every space template x room count x footprint"""
+    cases = {}
+    for space_type, template in Config.PROFESSIONAL_CONFIG["space_templates"].items():
+        for count in ROOM_COUNTS:
+            for width, height in FOOTPRINTS:
+                requirements = {
+                    'space_type': space_type,
+                    'width_meters': width,
+                    'height_meters': height,
+                    'num_bedrooms': 2,
+                    'num_bathrooms': 1
+                }
+                if count is not None:
+                    # Cycle the template's room types, so the mix stays true to the space type
+                    requirements['rooms'] = [
+                        {'name': f"{template[i % len(template)].title()} {i + 1}"} for i in range(count)
+                    ]
+                case_id = f"{space_type}/{count or 'template'}/{width}x{height}"
+                cases[case_id] = requirements
+    return cases
+
+def stage_functions(requirements):
+    """name -> (setup, run); setup builds fresh inputs so every run sees the same state"""
+    width_cm, height_cm = footprint_cm(requirements)
+
+    def layout_inputs():
+        return process_room_requirements(requirements), width_cm, height_cm, random.Random(SEED)
+
+    def furnish_inputs():
+        rng = random.Random(SEED)
+        ids = IdAllocator(rng)
+        model = build_grid_layout(process_room_requirements(requirements), width_cm, height_cm, rng, ids)
+        return model, model.rooms, ids
+
+    return {
+        'process_room_requirements': (lambda: (requirements,), process_room_requirements),
+        'build_grid_layout': (layout_inputs, build_grid_layout),
+        'add_furniture_and_accessories': (furnish_inputs, add_furniture_and_accessories),
+        'smart_floor_plan_builder': (lambda: (requirements, SEED), smart_floor_plan_builder),
+    }
+
+def measure(setup, run, repeat):
+    """Best wall time (ms), blocks retained by the result, and peak traced memory (KB)"""
+    best = float('inf')
+    for _ in range(repeat):
+        args = setup()
+        # As timeit does, keep collector pauses out of the timings
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(*args)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    args = setup()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks() - blocks_before
+    del result
+
+    return {'ms': round(best * 1000, 3), 'blocks': blocks, 'peak_kb': round(peak / 1024, 1)}
+
+def run_suite(case_filter=None, repeat=5):
+    # Seeded designs would otherwise be served from the design cache after the first run
+    design_cache.clear()
+    design_cache.max_bytes = 0
+
+    results = {}
+    for case_id, requirements in build_cases().items():
+        if case_filter and case_filter not in case_id:
+            continue
+        results[case_id] = {}
+        for stage, (setup, run) in stage_functions(requirements).items():
+            try:
+                results[case_id][stage] = measure(setup, run, repeat)
+            except Exception as e:
+                results[case_id][stage] = {'error': f"{type(e).__name__}: {e}"}
+    return results
+
+def compare(results, baselines, budget, case_filter=None):
+    """Readable problems: errored stages, baseline stages the run did not produce, and regressions beyond the budget"""
+    problems = []
+    for case_id, stages in results.items():
+        for stage, current in stages.items():
+            if 'error' in current:
+                problems.append(f"{case_id} {stage} failed: {current['error']}")
+                continue
+            base = baselines.get(case_id, {}).get(stage)
+            if not base or 'error' in base:
+                continue
+            for metric in METRICS:
+                if metric == 'ms' and base['ms'] < MIN_BUDGET_MS:
+                    continue
+                if current[metric] > base[metric] * (1 + budget) and current[metric] - base[metric] > 1:
+                    problems.append(f"{case_id} {stage} {metric}: {base[metric]} -> {current[metric]}")
+
+    for case_id, stages in baselines.items():
+        if case_filter and case_filter not in case_id:
+            continue
+        for stage in stages:
+            if stage not in results.get(case_id, {}):
+                problems.append(f"{case_id} {stage} missing from the results")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('BENCH_BUDGET', 0.25)),
+                        help='allowed regression as a fraction of the baseline (default 0.25)')
+    parser.add_argument('--update', action='store_true', help='write the results as the new baselines')
+    parser.add_argument('--filter', help='only run cases whose id contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per stage; the best is kept')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.filter, args.repeat)
+
+    print(f"{'case':<28} {'stage':<30} {'ms':>9} {'blocks':>9} {'peak KB':>9}")
+    for case_id, stages in results.items():
+        for stage, metrics in stages.items():
+            if 'error' in metrics:
+                print(f"{case_id:<28} {stage:<30} {metrics['error']}")
+            else:
+                print(f"{case_id:<28} {stage:<30} {metrics['ms']:>9.3f} {metrics['blocks']:>9} {metrics['peak_kb']:>9.1f}")
+
+    errors = sum('error' in metrics for stages in results.values() for metrics in stages.values())
+    if args.update:
+        if errors:
+            print(f"\n{errors} stage(s) failed; fix them before recording baselines")
+            return 1
+        baselines = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                baselines = json.load(f)
+        baselines.update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaselines written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("\nNo baselines yet; run with --update to record them")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baselines = json.load(f)
+
+    problems = compare(results, baselines, args.budget, args.filter)
+    if problems:
+        print(f"\n{len(problems)} problem(s) against the baselines ({args.budget:.0%} budget):")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+
+    print(f"\nAll cases within the {args.budget:.0%} budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
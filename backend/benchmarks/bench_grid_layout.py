@@ -0,0 +1,44 @@
+"""
+Grid layout benchmark
+Compares the two paths of the layout core, plain loops and batched NumPy arrays,
+across room counts; compute_grid_geometry switches at NUMPY_MIN_ROOMS.
+
+Run from backend/:  python -m benchmarks.bench_grid_layout
+"""
+
+import os
+import random
+import timeit
+
+# The generator only needs the catalogue; no Groq access is made
+os.environ.setdefault('GROQ_API_KEY', 'offline-benchmark')
+
+from app.utils.design_generator import build_grid_layout
+from app.utils.layout_core import NUMPY_MIN_ROOMS, _array_grid_geometry, _loop_grid_geometry
+
+ROOM_COUNTS = (5, 10, 20, 30, 40, 50, 100, 200)
+WIDTH_CM = 4000
+HEIGHT_CM = 3000
+
+def make_rooms(count):
+    """Synthetic office-floor rooms"""
+    return [{'name': f'Office {i + 1}', 'type': 'office', 'size_ratio': 2.5} for i in range(count)]
+
+def best_of(func, repeat=5, number=20):
+    """Best per-call time in milliseconds"""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number * 1000
+
+def main():
+    print(f"{'rooms':>6} {'loop core':>11} {'numpy core':>11} {'speedup':>8} {'full layout':>12}  (numpy from {NUMPY_MIN_ROOMS})")
+    for count in ROOM_COUNTS:
+        rng = random.Random(42)
+        rooms = make_rooms(count)
+
+        loop_ms = best_of(lambda: _loop_grid_geometry(count, WIDTH_CM, HEIGHT_CM, 200, 200, rng))
+        numpy_ms = best_of(lambda: _array_grid_geometry(count, WIDTH_CM, HEIGHT_CM, 200, 200, rng))
+        full_ms = best_of(lambda: build_grid_layout(rooms, WIDTH_CM, HEIGHT_CM, rng), number=5)
+
+        print(f"{count:>6} {loop_ms:>9.3f}ms {numpy_ms:>9.3f}ms {loop_ms / numpy_ms:>7.1f}x {full_ms:>10.2f}ms")
+
+if __name__ == '__main__':
+    main()
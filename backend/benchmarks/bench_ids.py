@@ -0,0 +1,39 @@
+"""
+ID allocation benchmark
+Compares IdAllocator with generate_unique_id, the per-character generator it
+replaced, kept here as the reference for the ID format. Uniqueness, format and
+determinism are covered by tests/test_ids.py.
+
+Run from backend/:  python -m benchmarks.bench_ids
+"""
+
+import os
+import random
+import timeit
+
+# The generator only needs the catalogue; no Groq access is made
+os.environ.setdefault('GROQ_API_KEY', 'offline-benchmark')
+
+from app.utils.design_utils import IdAllocator
+
+def generate_unique_id(prefix="", rng=None):
+    """Reference ID format: `prefix-` plus 10 characters, or 11 without a prefix"""
+    rng = rng or random
+    chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    if prefix:
+        return f"{prefix}-{''.join(rng.choice(chars) for _ in range(10))}"
+    return ''.join(rng.choice(chars) for _ in range(11))
+
+def bench():
+    number = 20_000
+    rng = random.Random(1)
+    legacy = min(timeit.repeat(lambda: generate_unique_id("item", rng=rng), number=number, repeat=5))
+
+    allocator = IdAllocator(random.Random(1))
+    bulk = min(timeit.repeat(lambda: allocator("item"), number=number, repeat=5))
+
+    print(f"generate_unique_id: {legacy / number * 1e6:.2f} us/id")
+    print(f"IdAllocator:        {bulk / number * 1e6:.2f} us/id  ({legacy / bulk:.1f}x faster)")
+
+if __name__ == '__main__':
+    bench()
@@ -0,0 +1,66 @@
+"""
+Design JSON encoding benchmark
+Compares the stdlib encoder used by Flask's default jsonify with the fast
+provider and the streaming encoder, on generated designs.
+
+Run from backend/:  python -m benchmarks.bench_json
+"""
+
+import json
+import os
+import time
+import timeit
+import tracemalloc
+
+# The generator only needs the catalogue; no Groq access is made
+os.environ.setdefault('GROQ_API_KEY', 'offline-benchmark')
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.fast_json import dumps_bytes, iter_response_json, orjson
+
+CASES = {
+    'apartment': {'space_type': 'apartment', 'num_bedrooms': 2, 'num_bathrooms': 1},
+    '50 offices': {'rooms': [{'name': f'Office {i + 1}'} for i in range(50)], 'width_meters': 40, 'height_meters': 30},
+    '200 offices': {'rooms': [{'name': f'Office {i + 1}'} for i in range(200)], 'width_meters': 80, 'height_meters': 60},
+}
+
+def stdlib_encode(payload):
+    """What Flask's default provider does: sorted keys, one in-memory string"""
+    return (json.dumps(payload, sort_keys=True, ensure_ascii=True) + "\n").encode('utf-8')
+
+def consume_stream(payload):
+    for _ in iter_response_json(payload):
+        pass
+
+def time_to_first_chunk(payload):
+    start = time.perf_counter()
+    next(iter(iter_response_json(payload)))
+    return (time.perf_counter() - start) * 1000
+
+def peak_kb(func, payload):
+    tracemalloc.start()
+    func(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+def best_ms(func, payload, number=10):
+    return min(timeit.repeat(lambda: func(payload), number=number, repeat=5)) / number * 1000
+
+def main():
+    print(f"orjson available: {orjson is not None}")
+    print(f"{'case':>12} {'size':>8} {'stdlib':>9} {'fast':>9} {'stream':>9} {'ttfb':>8} {'peak stdlib':>12} {'peak stream':>12}")
+    for name, requirements in CASES.items():
+        payload = {'success': True, 'design': smart_floor_plan_builder(requirements, seed=1), 'message': name}
+        size_kb = len(dumps_bytes(payload)) / 1024
+
+        print(f"{name:>12} {size_kb:>6.0f}KB"
+              f" {best_ms(stdlib_encode, payload):>7.2f}ms"
+              f" {best_ms(dumps_bytes, payload):>7.2f}ms"
+              f" {best_ms(consume_stream, payload):>7.2f}ms"
+              f" {time_to_first_chunk(payload):>6.2f}ms"
+              f" {peak_kb(stdlib_encode, payload):>10.0f}KB"
+              f" {peak_kb(consume_stream, payload):>10.0f}KB")
+
+if __name__ == '__main__':
+    main()
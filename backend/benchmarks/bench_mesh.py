@@ -0,0 +1,55 @@
+"""
+GLB mesh export benchmark
+Builds binary glTF meshes of generated plans with about 1k and 5k walls, single
+storey and repeated over several storeys (which share one mesh). Each case
+reports the best wall time of a few runs, the GLB size and the triangle count.
+5k walls should stay well under a second.
+
+Run from backend/:  python -m benchmarks.bench_mesh [--walls 5000] [--floors 4] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+
+from app.utils.mesh_export import floor_meshes, render_glb, wall_mesh
+from benchmarks.bench_export import build_plan, count
+
+def triangles(design):
+    """Triangles over the distinct layer meshes, as render_glb builds them"""
+    total = 0
+    seen = set()
+    for layer in design['layers'].values():
+        if id(layer['lines']) in seen:
+            continue
+        seen.add(id(layer['lines']))
+        for mesh in [wall_mesh(layer), *floor_meshes(layer).values()]:
+            if mesh is not None:
+                total += len(mesh[2]) // 3
+    return total
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--walls', type=int, default=5000, help='walls in the largest plan (default 5000)')
+    parser.add_argument('--floors', type=int, default=4, help='storeys in the multi-storey cases (default 4)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, best time reported (default 3)')
+    args = parser.parse_args(argv)
+
+    cases = []
+    for walls in sorted({min(1000, args.walls), args.walls}):
+        cases.append((f"{walls} walls", build_plan(walls)))
+        cases.append((f"{walls} walls x {args.floors} floors", build_plan(walls, args.floors)))
+
+    print(f"{'case':<26} {'walls':>7} {'holes':>7} {'triangles':>10} {'ms':>9} {'MB':>8}")
+    for name, design in cases:
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            glb = render_glb(design)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<26} {count(design, 'lines'):>7} {count(design, 'holes'):>7} {triangles(design):>10} "
+              f"{best * 1000:>9.1f} {len(glb) / 1e6:>8.2f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Similar-design index benchmark
+Fills a scratch SQLite database with synthetic feature rows (1M by default), times
+loading them into the in-memory feature index, then times k-nearest queries over
+the shared designs (including the quick-generate fast path) and over one user's
+designs. Each case reports median and 95th percentile latency.
+
+Run from backend/:  python -m benchmarks.bench_similar [--designs 1000000] [--queries 200] [--k 10]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+from auth import db
+from designs import DesignFeatures, nearest_designs, refresh_feature_index
+from app.utils.catalog import CATALOG
+from app.utils.design_features import FEATURE_VERSION, requirement_features
+
+SEED = 1234
+STYLES = ('modern', 'minimalist', 'classic', 'industrial', 'scandinavian')
+PRIORITIES = ('functionality', 'aesthetics', 'space_optimization', 'luxury')
+USERS = 10000
+
+def random_requirements(rng):
+    return {
+        'space_type': rng.choice(sorted(CATALOG.space_templates)),
+        'width_meters': rng.uniform(6, 60),
+        'height_meters': rng.uniform(6, 60),
+        'num_bedrooms': rng.randint(0, 5),
+        'num_bathrooms': rng.randint(0, 3),
+        'style': rng.choice(STYLES),
+        'user_priority': rng.choice(PRIORITIES),
+        'layout': rng.choice(('grid', 'treemap')),
+        'floors': rng.choice((1, 1, 1, 2, 3, 5))
+    }
+
+def fill(count, rng, batch=50000):
+    """Insert `count` feature rows, built from a pool of distinct requirement sets"""
+    pool = [requirement_features(random_requirements(rng))._asdict() for _ in range(5000)]
+    insert = DesignFeatures.__table__.insert()
+    for start in range(0, count, batch):
+        rows = []
+        for design_id in range(start + 1, min(start + batch, count) + 1):
+            row = dict(rng.choice(pool), design_id=design_id, user_id=rng.randrange(USERS),
+                       shared=rng.random() < 0.8, version=FEATURE_VERSION)
+            row['area_bucket'] += rng.randint(-1, 1)
+            rows.append(row)
+        db.session.execute(insert, rows)
+    db.session.commit()
+
+def measure(queries, search):
+    times = []
+    for features in queries:
+        start = time.perf_counter()
+        search(features)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--designs', type=int, default=1000000, help='indexed designs (default 1000000)')
+    parser.add_argument('--queries', type=int, default=200, help='queries per case (default 200)')
+    parser.add_argument('--k', type=int, default=10, help='neighbours per query (default 10)')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(SEED)
+    with tempfile.TemporaryDirectory() as scratch:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(scratch, 'index.db')}"
+        db.init_app(app)
+
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            fill(args.designs, rng)
+            print(f"stored {args.designs} feature rows in {time.perf_counter() - start:.1f} s")
+
+            start = time.perf_counter()
+            refresh_feature_index()
+            print(f"loaded the index in {time.perf_counter() - start:.1f} s")
+
+            queries = [requirement_features(random_requirements(rng)) for _ in range(args.queries)]
+            cases = (
+                ('shared, k nearest', lambda f: nearest_designs(f, k=args.k, shared=True)),
+                ('shared, fast path', lambda f: nearest_designs(f, k=1, shared=True, max_distance=0, same_footprint=True)),
+                ('one user, k nearest', lambda f: nearest_designs(f, k=args.k, user_id=rng.randrange(USERS))),
+            )
+
+            print(f"{'case':<22} {'median ms':>10} {'p95 ms':>8}")
+            for name, search in cases:
+                median, p95 = measure(queries, search)
+                print(f"{name:<22} {median:>10.2f} {p95:>8.2f}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
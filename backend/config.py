@@ -20,10 +20,41 @@ class Config:
         "http://localhost:5173",
     ]
 
-    # AI Configuration
+    # AI Configuration (required by AIService, not by the design generator)
     GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-    if not GROQ_API_KEY:
-        raise ValueError("GROQ_API_KEY environment variable is required")
+
+    # Batch generation configuration
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 500))
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or None  # None = one per CPU
+
+    # Seeded design cache budget (serialized JSON bytes)
+    DESIGN_CACHE_MAX_BYTES = int(os.environ.get('DESIGN_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # Last design of each chat session, kept to send the next one as a JSON Patch
+    SESSION_DESIGNS_MAX_BYTES = int(os.environ.get('SESSION_DESIGNS_MAX_BYTES', 128 * 1024 * 1024))
+
+    # Saved designs: zlib level of the stored JSON and the largest design accepted (uncompressed)
+    DESIGN_STORE_COMPRESSION_LEVEL = int(os.environ.get('DESIGN_STORE_COMPRESSION_LEVEL', 6))
+    DESIGN_STORE_MAX_BYTES = int(os.environ.get('DESIGN_STORE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # Quick-generate fast path: largest feature distance at which a shared design is served instead
+    SIMILAR_DESIGN_MAX_DISTANCE = float(os.environ.get('SIMILAR_DESIGN_MAX_DISTANCE', 0))
+
+    # On-disk PNG thumbnail cache
+    THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'thumbnails'))
+    THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get('THUMBNAIL_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+    # On-disk GLB mesh cache for the 3D viewer
+    MESH_CACHE_DIR = os.environ.get('MESH_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'meshes'))
+    MESH_CACHE_MAX_BYTES = int(os.environ.get('MESH_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+    # Multi-storey generation
+    MAX_FLOORS = int(os.environ.get('MAX_FLOORS', 100))
+
+    # Per-phase Server-Timing headers on API responses (aggregate stats are always kept).
+    # Both are off by default: they expose internal phase timings to whoever can reach the API
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', 'false').lower() == 'true'
+    # GET /api/metrics/timings, for development and internal deployments only
+    TIMING_METRICS = os.environ.get('TIMING_METRICS', 'false').lower() == 'true'
 
     # AI Prompts and configurations
     EXTRACTION_PROMPT = """You are a floor plan requirements extractor. Analyze the user's message and extract floor plan requirements.
@@ -43,6 +74,7 @@ RESPOND WITH ONLY A JSON OBJECT in this exact format (no other text):
   "space_type": "apartment|office|classroom|restaurant|warehouse|gym|clinic|hotel|shop|house|custom",
   "width_meters": 10,
   "height_meters": 8,
+  "floors": 1,
   "rooms": [
     {
       "name": "Living Room",
@@ -80,6 +112,7 @@ INTERPRETATION RULES:
 4. Default to medium size if not specified
 5. Always include necessary rooms: at least one bathroom, living area
 6. Recognize style keywords: "modern", "traditional", "minimalist", "industrial", "scandinavian"
+7. Set floors to the number of storeys for multi-storey buildings; rooms describe one typical floor
 
 Return ONLY the JSON object."""
 
@@ -191,6 +224,38 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "cleaningcart": {"name": "cleaning_cart", "type": "cleaningcart"},
             "child-chair-desk": {"name": "child_chair_desk", "type": "child-chair-desk"}
         },
+
+        # Floor footprint (width, depth) in cm used to place items without overlap
+        "furniture_footprints": {
+            "bed": (160, 200), "wardrobe": (120, 60), "desk": (120, 60), "chair": (50, 50),
+            "chairdesk": (50, 50), "deskoffice": (140, 70), "sofa": (200, 90), "armchairs": (80, 80),
+            "tv": (120, 40), "coffee_table": (100, 60), "dining_table": (160, 90), "bookcase": (90, 35),
+            "fridge": (70, 70), "kitchen": (240, 60), "sink": (60, 50), "stove": (60, 60),
+            "toilet": (40, 70), "shower": (90, 90), "radiator": (80, 15), "trash": (30, 30),
+            "coat-hook": (40, 10), "umbrella-stand": (30, 30), "recycling-bins": (90, 40),
+            "smoke-detector": (15, 15), "fire-extinguisher": (20, 20), "monitor-pc": (60, 25),
+            "router-wifi": (20, 15), "air-conditioner": (80, 25), "hanger": (50, 40), "image": (60, 5),
+            "blackboard": (240, 10), "canteen-table": (180, 80), "canteencart": (80, 50), "camera": (15, 15),
+            "teaching-post": (140, 70), "school-desk": (70, 50), "school-desk-double": (130, 50),
+            "projector": (40, 30), "metal-detector": (90, 60), "electrical-panel": (60, 20),
+            "three-phase-panel": (60, 20), "schneider": (40, 20), "hiroos": (40, 20), "lim": (40, 20),
+            "hub": (30, 20), "naspo": (40, 20), "bench": (150, 45), "balcony": (200, 100),
+            "column": (30, 30), "column-square": (30, 30), "cube": (50, 50), "simple-stair": (100, 240),
+            "text-3d": (50, 10), "cleaningcart": (90, 50), "child-chair-desk": (60, 50)
+        },
+        "default_footprint": (60, 60),
+
+        # Other names the AI uses for catalog items
+        "furniture_aliases": {
+            "table": "coffee_table", "coffee-table": "coffee_table", "dining-table": "dining_table",
+            "monitor_pc": "monitor-pc", "router_wifi": "router-wifi", "conditioner": "air-conditioner",
+            "desks": "school-desk", "teacher_desk": "teaching-post", "chairs": "chair", "armchair": "armchairs",
+            "couch": "sofa", "shelves": "bookcase", "bookshelf": "bookcase", "oven": "stove",
+            "television": "tv", "refrigerator": "fridge", "bathtub": "shower", "canteen_table": "canteen-table"
+        },
+
+        # Clear space kept between placed items, and in front of each door
+        "furniture_gap": 10,  # cm
         "tile_catalog": {
             "parquet": "parquet",
             "ceramic": "ceramic-tile",
@@ -245,7 +310,7 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "max_doors": 3,
             "max_windows": 4,
             "texture": "parquet",
-            "furniture": ["sofa", "tv", "table", "armchairs"],
+            "furniture": ["sofa", "tv", "coffee_table", "armchairs"],
             "accessories": ["radiator", "smoke-detector", "image", "coat-hook"],
             "label_color": "#FFB6C1",
             "label_font_size": 34,
@@ -255,8 +320,8 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "min_doors": 1,  # ENSURE at least 1 door
             "max_doors": 2,
             "max_windows": 2,
-            "texture": "carpet",
-            "furniture": ["desk", "chair", "bookcase", "monitor_pc"],
+            "texture": "parquet",
+            "furniture": ["desk", "chair", "bookcase", "monitor-pc"],
             "accessories": ["router-wifi", "radiator", "smoke-detector", "fire-extinguisher", "image"],
             "label_color": "#D8BFD8",
             "label_font_size": 30,
@@ -267,7 +332,7 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "max_doors": 2,
             "max_windows": 3,
             "texture": "strand_porcelain",  # From your example
-            "furniture": ["desks", "blackboard", "projector", "teacher_desk"],
+            "furniture": ["school-desk", "blackboard", "projector", "teaching-post"],
             "label_color": "#B0E0E6",
             "label_font_size": 32,
             "door_required": True
@@ -277,7 +342,7 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "max_doors": 2,
             "max_windows": 3,
             "texture": "parquet",
-            "furniture": ["dining_table", "chairs", "sideboard"],
+            "furniture": ["dining_table", "chair", "chair"],
             "label_color": "#F0E68C",
             "label_font_size": 32,
             "door_required": True
@@ -286,12 +351,89 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
             "min_doors": 1,  # ENSURE at least 1 door (NEW REQUIREMENT)
             "max_doors": 1,
             "max_windows": 0,
-            "texture": "concrete",
-            "furniture": ["shelves", "racks"],
+            "texture": "tile1",
+            "furniture": ["bookcase", "bookcase"],
             "label_color": "#D3D3D3",
             "label_font_size": 28,
             "door_required": True  # Now required!
         },
+        "reception": {
+            "min_doors": 1,
+            "max_doors": 3,
+            "max_windows": 3,
+            "texture": "ceramic",
+            "furniture": ["deskoffice", "chair", "sofa"],
+            "accessories": ["coat-hook", "umbrella-stand", "image", "smoke-detector"],
+            "label_color": "#E6E6FA",
+            "label_font_size": 32,
+            "door_required": True
+        },
+        "meeting": {
+            "min_doors": 1,
+            "max_doors": 2,
+            "max_windows": 3,
+            "texture": "parquet",
+            "furniture": ["dining_table", "chair", "chair", "tv"],
+            "accessories": ["router-wifi", "air-conditioner", "smoke-detector"],
+            "label_color": "#E0FFFF",
+            "label_font_size": 30,
+            "door_required": True
+        },
+        "lobby": {
+            "min_doors": 1,
+            "max_doors": 4,
+            "max_windows": 4,
+            "texture": "ceramic",
+            "furniture": ["sofa", "armchairs", "coffee_table"],
+            "accessories": ["coat-hook", "umbrella-stand", "fire-extinguisher", "camera"],
+            "label_color": "#FFEFD5",
+            "label_font_size": 34,
+            "door_required": True
+        },
+        "room": {
+            "min_doors": 1,
+            "max_doors": 1,
+            "max_windows": 2,
+            "texture": "parquet",
+            "furniture": ["bed", "wardrobe", "tv", "armchairs"],
+            "accessories": ["radiator", "smoke-detector", "hanger", "air-conditioner"],
+            "label_color": "#FFE4C4",
+            "label_font_size": 30,
+            "door_required": True
+        },
+        "waiting": {
+            "min_doors": 1,
+            "max_doors": 2,
+            "max_windows": 3,
+            "texture": "ceramic",
+            "furniture": ["bench", "armchairs", "coffee_table"],
+            "accessories": ["coat-hook", "trash", "image", "smoke-detector"],
+            "label_color": "#F0FFF0",
+            "label_font_size": 30,
+            "door_required": True
+        },
+        "consultation": {
+            "min_doors": 1,
+            "max_doors": 1,
+            "max_windows": 2,
+            "texture": "tile1",
+            "furniture": ["deskoffice", "chair", "sink"],
+            "accessories": ["monitor-pc", "trash", "smoke-detector", "radiator"],
+            "label_color": "#E0F7FA",
+            "label_font_size": 30,
+            "door_required": True
+        },
+        "showroom": {
+            "min_doors": 1,
+            "max_doors": 2,
+            "max_windows": 4,
+            "texture": "strand_porcelain",
+            "furniture": ["cube", "cube", "bench"],
+            "accessories": ["camera", "image", "fire-extinguisher", "air-conditioner"],
+            "label_color": "#FFF0F5",
+            "label_font_size": 34,
+            "door_required": True
+        },
         "generic": {
             "min_doors": 1,  # ENSURE at least 1 door
             "max_doors": 2,
@@ -304,6 +446,28 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
         }
     },
 
+    # Room name keywords -> room type, as (priority, room type, keywords). Names are matched
+    # case- and accent-insensitively anywhere in the name; when several keywords match, the
+    # lowest priority wins, so room nouns beat modifiers like "master" ("Master Bath").
+    "room_keywords": [
+        (10, "bedroom", ["bed", "sleep", "dormitorio", "chambre", "schlafzimmer"]),
+        (20, "bathroom", ["bath", "toilet", "wc", "restroom", "lavatory", "washroom", "powder room",
+                          "ensuite", "en-suite", "bano", "salle de bain", "badezimmer"]),
+        (30, "kitchen", ["kitchen", "cook", "pantry", "kitchenette", "cocina", "cuisine", "kuche"]),
+        (40, "living", ["living", "lounge", "family", "sitting", "salon", "sala", "wohnzimmer"]),
+        (50, "office", ["office", "study", "library", "oficina", "bureau", "buro"]),
+        (60, "classroom", ["class", "school", "lecture", "training", "aula", "salle de classe"]),
+        (70, "dining", ["dining", "restaurant", "cafeteria", "eating", "comedor", "salle a manger"]),
+        (80, "storage", ["storage", "closet", "cupboard", "wardrobe", "utility", "almacen", "debarras", "abstellraum"]),
+        (90, "reception", ["reception", "front desk"]),
+        (90, "lobby", ["lobby", "entry", "foyer"]),
+        (100, "meeting", ["meeting", "conference", "board"]),
+        (100, "waiting", ["waiting"]),
+        (100, "consultation", ["consultation", "consulting", "examination", "exam"]),
+        (100, "showroom", ["showroom", "display"]),
+        (200, "bedroom", ["master", "guest"])
+    ],
+
     # Space type templates
     "space_templates": {
         "apartment": ["living", "kitchen", "bedroom", "bedroom", "bathroom", "storage"],
@@ -330,6 +494,26 @@ Remember: Always use catalog furniture, ensure proper room sizing (bedroom=mediu
     "window_width": 120,   # cm
     "window_height": 100,  # cm
     "window_altitude": 90, # cm from floor
+    "window_spacing": 400, # cm of facade per window on long walls
+
+    # Minimum gap between openings, and between an opening and the wall ends
+    "opening_clearance": 30,  # cm
+
+    # Smallest room side the design editor will leave after an edit
+    "min_room_size": 150,  # cm
+
+    # Stair core, at the same position on every floor of a multi-storey design
+    "stair_inset": 120,  # cm from the back corner of the footprint
+
+    # Flat colours standing in for floor textures in 2D exports and previews
+    "texture_colours": {
+        "parquet": "#D8B48A",
+        "tile1": "#D9D4CC",
+        "ceramic": "#E3ECEF",
+        "strand_porcelain": "#CFC8BE",
+        "grass": "#9CC27A",
+        "painted": "#F2F2F2"
+    },
 
     # Additional textures from your example
     "special_textures": {
@@ -0,0 +1,417 @@
+"""
+Saved designs for Archify
+Stores each user's designs as zlib-compressed JSON, deduplicated by content hash,
+with a feature index for similar-design lookups
+"""
+
+from flask import Blueprint, Response, request, jsonify
+from datetime import datetime
+import hashlib
+import threading
+import zlib
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+from app.utils.design_features import FEATURE_VERSION, FeatureIndex, design_features, requirement_features
+from app.utils.fast_json import dumps_bytes, iter_response_json, loads
+from app.utils.floors import pack_instances, unpack_instances
+
+# Import db from auth module
+from auth import db, get_current_user
+
+# Create blueprint
+designs_bp = Blueprint('designs', __name__, url_prefix='/api/designs')
+
+# Stored design content, shared by every saved design with the same hash
+class DesignBlob(db.Model):
+    __tablename__ = 'design_blobs'
+
+    content_hash = db.Column(db.String(64), primary_key=True)  # sha256 of the stored JSON
+    data = db.deferred(db.Column(db.LargeBinary, nullable=False))  # zlib-compressed JSON, loaded on access
+    size = db.Column(db.Integer, nullable=False)  # uncompressed bytes
+    stored_size = db.Column(db.Integer, nullable=False)  # compressed bytes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Saved Design Model
+class Design(db.Model):
+    __tablename__ = 'designs'
+    __table_args__ = {'sqlite_autoincrement': True}  # Ids are never reused: they key client caches and the feature index
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    content_hash = db.Column(db.String(64), db.ForeignKey('design_blobs.content_hash'), nullable=False, index=True)
+    name = db.Column(db.String(200), nullable=False, default='Untitled design')
+    source = db.Column(db.String(20), default='saved')  # 'saved', 'chat' or 'quick'
+    floors = db.Column(db.Integer, default=1)
+    room_count = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship('User', backref=db.backref('designs', lazy='dynamic'))
+    blob = db.relationship('DesignBlob')
+    features = db.relationship('DesignFeatures', uselist=False, cascade='all, delete-orphan')
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'source': self.source,
+            'floors': self.floors,
+            'room_count': self.room_count,
+            'content_hash': self.content_hash,
+            'size': self.blob.size if self.blob else None,
+            'stored_size': self.blob.stored_size if self.blob else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+# Similar-design index: one row of features per saved design
+class DesignFeatures(db.Model):
+    __tablename__ = 'design_features'
+    # Index refreshes read the current version's rows past the last loaded design id
+    __table_args__ = (db.Index('ix_design_features_version_design_id', 'version', 'design_id'),)
+
+    design_id = db.Column(db.Integer, db.ForeignKey('designs.id'), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=False)
+    shared = db.Column(db.Boolean, default=False)  # May be served to other users by the quick-generate fast path
+    version = db.Column(db.String(8), nullable=False)  # design_features.FEATURE_VERSION
+    space_type = db.Column(db.String(50), nullable=True)
+    style = db.Column(db.String(50), nullable=True)
+    user_priority = db.Column(db.String(50), nullable=True)
+    layout = db.Column(db.String(20), nullable=True)
+    floors = db.Column(db.Integer, default=1)
+    area_bucket = db.Column(db.Integer, nullable=False)
+    width_cm = db.Column(db.Integer, nullable=True)  # Requested footprint; unknown for designs indexed from content
+    height_cm = db.Column(db.Integer, nullable=True)
+    room_counts = db.Column(db.LargeBinary, nullable=False)
+
+# Columns added to existing tables after they were first created: (table, column, SQL type)
+_ADDED_COLUMNS = (
+    ('design_features', 'width_cm', 'INTEGER'),
+    ('design_features', 'height_cm', 'INTEGER'),
+)
+
+def upgrade_design_tables():
+    """Bring tables created by an earlier version up to date (create_all only creates missing tables)
+
+    Rows indexed before the footprint columns existed keep them NULL, so they are
+    never served by the quick-generate fast path.
+    """
+    inspector = db.inspect(db.engine)
+    with db.engine.begin() as connection:
+        for table, column, sql_type in _ADDED_COLUMNS:
+            if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+                connection.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {sql_type}'))
+        for index in DesignFeatures.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def features_row(design, requirements=None, shared=False):
+    """DesignFeatures for a design, from the requirements that produced it when known"""
+    features = requirement_features(requirements) if requirements else design_features(design)
+    return DesignFeatures(shared=shared, version=FEATURE_VERSION, **features._asdict())
+
+def encode_design(design):
+    """(content hash, compressed bytes, uncompressed size) of a design
+
+    Storeys that share a unit's element tables are stored once (floors.pack_instances).
+    """
+    data = dumps_bytes(pack_instances(design), sort_keys=True)
+    if len(data) > Config.DESIGN_STORE_MAX_BYTES:
+        raise ValueError(f'Design too large to save: at most {Config.DESIGN_STORE_MAX_BYTES // (1024 * 1024)} MB of JSON')
+    return hashlib.sha256(data).hexdigest(), zlib.compress(data, Config.DESIGN_STORE_COMPRESSION_LEVEL), len(data)
+
+def decode_design(blob):
+    """Design dict of a stored blob"""
+    return unpack_instances(loads(zlib.decompress(blob.data)))
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+def _insert_blob(values):
+    """Store a blob unless its content is stored already; safe when another request stores it concurrently"""
+    insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        db.session.execute(insert(DesignBlob).values(**values).on_conflict_do_nothing(index_elements=['content_hash']))
+        return
+
+    if db.session.get(DesignBlob, values['content_hash']) is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(DesignBlob(**values))
+        except IntegrityError:
+            pass  # Another request stored the same content first
+
+def _lock_blob(content_hash):
+    """Lock a blob row for the rest of the transaction; its hash, or None once it is gone
+
+    save_design and delete_design both take this lock, so a blob is never deleted
+    between a save finding it and its new design referencing it.
+    """
+    query = db.select(DesignBlob.content_hash).where(DesignBlob.content_hash == content_hash).with_for_update()
+    return db.session.execute(query).scalar()
+
+def save_design(user, design, name=None, source='saved', requirements=None, shared=False):
+    """Save a design for a user; saving content the user already has returns the existing Design
+
+    `requirements` (what the design was generated from) gives it full index features;
+    `shared` lets the quick-generate fast path serve it to other users.
+    """
+    content_hash, data, size = encode_design(design)
+
+    existing = Design.query.filter_by(user_id=user.id, content_hash=content_hash).first()
+    if existing:
+        return existing
+
+    blob = {'content_hash': content_hash, 'data': data, 'size': size, 'stored_size': len(data)}
+    _insert_blob(blob)
+    if _lock_blob(content_hash) is None:
+        # A concurrent delete_design removed it between the insert and the lock
+        _insert_blob(blob)
+
+    layers = design.get('layers', {})
+    saved = Design(
+        user_id=user.id,
+        content_hash=content_hash,
+        name=(name or 'Untitled design')[:200],
+        source=source,
+        floors=len(layers) or 1,
+        room_count=sum(len(layer.get('areas', {})) for layer in layers.values())
+    )
+    saved.features = features_row(design, requirements, shared)
+    saved.features.user_id = user.id
+    db.session.add(saved)
+    db.session.commit()
+    return saved
+
+def delete_design(saved):
+    """Delete a saved design, and its blob once no other design uses it"""
+    design_id, content_hash = saved.id, saved.content_hash
+    _lock_blob(content_hash)
+    db.session.delete(saved)
+    db.session.flush()
+    # One statement, under the blob lock: no save can start referencing it in between
+    still_used = db.select(Design.id).where(Design.content_hash == content_hash).exists()
+    db.session.execute(db.delete(DesignBlob).where(DesignBlob.content_hash == content_hash, ~still_used))
+    db.session.commit()
+    feature_index.remove(design_id)
+
+def reindex_features():
+    """Rebuild feature rows that are missing or from another FEATURE_VERSION (run after catalog room type changes)
+
+    Designs re-indexed from their content lose the requirement-only fields and sharing.
+    Running workers keep their loaded index rows until restarted.
+    """
+    stale = Design.query.outerjoin(DesignFeatures).filter(
+        db.or_(DesignFeatures.design_id.is_(None), DesignFeatures.version != FEATURE_VERSION)).all()
+    for saved in stale:
+        saved.features = features_row(decode_design(saved.blob))
+        saved.features.user_id = saved.user_id
+    db.session.commit()
+    return len(stale)
+
+# Per-process copy of the features table for k-nearest searches
+feature_index = FeatureIndex()
+
+_INDEX_COLUMNS = (DesignFeatures.design_id, DesignFeatures.user_id, DesignFeatures.shared, DesignFeatures.space_type,
+                  DesignFeatures.style, DesignFeatures.user_priority, DesignFeatures.layout, DesignFeatures.floors,
+                  DesignFeatures.area_bucket, DesignFeatures.width_cm, DesignFeatures.height_cm,
+                  DesignFeatures.room_counts)
+
+# Held while rows are read into feature_index, so no row is loaded twice
+_index_lock = threading.Lock()
+
+def _load_index_rows(*criteria):
+    query = db.select(*_INDEX_COLUMNS).where(DesignFeatures.version == FEATURE_VERSION, *criteria)
+    feature_index.add(db.session.execute(query.order_by(DesignFeatures.design_id)))
+
+def refresh_feature_index(blocking=True):
+    """Load feature rows added since the last refresh (by any worker) into feature_index
+
+    Design ids only grow (designs uses AUTOINCREMENT), so new rows are those past last_id.
+    Without blocking, returns at once while another thread is loading; searches then
+    see the rows loaded so far.
+    """
+    if not _index_lock.acquire(blocking):
+        return
+    try:
+        _load_index_rows(DesignFeatures.design_id > feature_index.last_id)
+    finally:
+        _index_lock.release()
+
+def start_feature_index_loader(app):
+    """Load the feature index in a background thread, so no request waits for the initial load"""
+    def load():
+        with app.app_context():
+            try:
+                refresh_feature_index()
+            except Exception as e:
+                app.logger.warning(f"Could not load the design feature index: {e}")
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=load, name='feature-index-loader', daemon=True)
+    thread.start()
+    return thread
+
+def nearest_designs(features, k=10, user_id=None, shared=False, max_distance=None, exclude_id=None,
+                    same_footprint=False):
+    """[(design_id, distance)] of the k indexed designs nearest to `features`, nearest first
+
+    Searches the user's designs (user_id) or the shared ones (shared=True, same space type).
+    Designs deleted by another worker can still appear; callers load the Design rows anyway.
+    While the index is still loading, designs not loaded yet are missed.
+    """
+    refresh_feature_index(blocking=False)
+    return feature_index.nearest(features, k, user_id, shared, max_distance, exclude_id, same_footprint)
+
+def find_reusable_design(requirements, max_distance, candidates=5):
+    """(Design, distance) of the closest shared design requested at the same footprint, or None"""
+    nearest = nearest_designs(requirement_features(requirements), k=candidates, shared=True, max_distance=max_distance,
+                              same_footprint=True)
+    for design_id, distance in nearest:
+        saved = Design.query.get(design_id)
+        if saved:
+            return saved, distance
+    return None
+
+@designs_bp.route('', methods=['GET'])
+def list_designs():
+    """List the user's saved designs, newest first"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        offset = max(request.args.get('offset', 0, type=int), 0)
+
+        query = Design.query.filter_by(user_id=user.id)
+        designs = (query.options(db.joinedload(Design.blob))
+                   .order_by(Design.created_at.desc(), Design.id.desc())
+                   .offset(offset).limit(limit).all())
+
+        return jsonify({
+            'success': True,
+            'designs': [saved.to_dict() for saved in designs],
+            'total': query.count()
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@designs_bp.route('', methods=['POST'])
+def create_design():
+    """Save a design from the editor"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+        data = request.json or {}
+        design = data.get('design')
+
+        if not isinstance(design, dict) or not isinstance(design.get('layers'), dict):
+            return jsonify({
+                'success': False,
+                'error': 'design must be a floor plan object with layers'
+            }), 400
+
+        try:
+            saved = save_design(user, design, data.get('name'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 413
+
+        return jsonify({
+            'success': True,
+            'design_id': saved.id,
+            'saved_design': saved.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@designs_bp.route('/<int:design_id>', methods=['GET'])
+def get_design(design_id):
+    """Fetch a saved design; the ETag is its content hash, so cached copies revalidate with a 304"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+        saved = Design.query.filter_by(id=design_id, user_id=user.id).first()
+        if not saved:
+            return jsonify({'success': False, 'error': 'Design not found'}), 404
+
+        # Answer revalidations from the hash alone, without loading the blob
+        if saved.content_hash in request.if_none_match:
+            response = Response(status=304)
+        else:
+            result = {
+                'success': True,
+                'design_id': saved.id,
+                'saved_design': saved.to_dict(),
+                'design': decode_design(saved.blob)
+            }
+            response = Response(iter_response_json(result), mimetype='application/json')
+
+        response.set_etag(saved.content_hash)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@designs_bp.route('/<int:design_id>/similar', methods=['GET'])
+def similar_designs(design_id):
+    """The user's saved designs most similar to one of them"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+        saved = Design.query.filter_by(id=design_id, user_id=user.id).first()
+        if not saved:
+            return jsonify({'success': False, 'error': 'Design not found'}), 404
+
+        if saved.features is None or saved.features.version != FEATURE_VERSION:
+            saved.features = features_row(decode_design(saved.blob))
+            saved.features.user_id = user.id
+            db.session.commit()
+            with _index_lock:
+                # Rows past last_id are picked up by the next refresh
+                if saved.id <= feature_index.last_id:
+                    _load_index_rows(DesignFeatures.design_id == saved.id)
+
+        features = saved.features
+        k = min(max(request.args.get('k', 10, type=int), 1), 100)
+        nearest = nearest_designs(features, k=k, user_id=user.id, exclude_id=saved.id)
+
+        designs = {similar.id: similar for similar in Design.query.filter(Design.id.in_([i for i, _ in nearest]))}
+        return jsonify({
+            'success': True,
+            'similar': [dict(designs[i].to_dict(), distance=distance) for i, distance in nearest if i in designs]
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@designs_bp.route('/<int:design_id>', methods=['DELETE'])
+def remove_design(design_id):
+    """Delete a saved design"""
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+        saved = Design.query.filter_by(id=design_id, user_id=user.id).first()
+        if not saved:
+            return jsonify({'success': False, 'error': 'Design not found'}), 404
+
+        delete_design(saved)
+        return jsonify({'success': True, 'message': 'Design deleted'})
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
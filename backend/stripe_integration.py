@@ -717,6 +717,12 @@ def get_plan_limits(plan):
     }
     return limits.get(plan, limits['free'])
 
+def get_user_plan_limits(user):
+    """Get the user's plan and its feature limits"""
+    subscription = Subscription.query.filter_by(user_id=user.id).first()
+    plan = subscription.plan if subscription else 'free'
+    return plan, get_plan_limits(plan)
+
 def get_or_create_ai_usage(user):
     """Get or create AI usage record for user"""
     usage = AIUsage.query.filter_by(user_id=user.id).first()
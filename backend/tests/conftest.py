@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+# The generator and editor only need the catalogue; no Groq access is made
+os.environ.setdefault('GROQ_API_KEY', 'offline-tests')
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """The Flask app on a scratch SQLite database, with an empty feature index"""
+    import designs
+    from app import create_app
+    from app.utils.design_features import FeatureIndex
+    from config import Config
+
+    monkeypatch.setattr(designs, 'feature_index', FeatureIndex())
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'designs.db'}"
+        TESTING = True
+
+    return create_app(TestConfig)
+
+@pytest.fixture
+def users(app):
+    """Ids of eight users"""
+    from auth import User, db
+    with app.app_context():
+        db.session.add_all([User(email=f"user{i}@example.com", name=f"User {i}", email_verified=True) for i in range(8)])
+        db.session.commit()
+        return [user.id for user in User.query.order_by(User.id)]
+
+@pytest.fixture
+def auth_header(app, users):
+    """Authorization header for the first user"""
+    from auth import User, generate_token
+    with app.app_context():
+        return {'Authorization': f"Bearer {generate_token(User.query.filter_by(id=users[0]).one())}"}
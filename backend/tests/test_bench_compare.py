@@ -0,0 +1,19 @@
+from benchmarks.bench_generator import compare
+
+BASE = {'ms': 10.0, 'blocks': 100, 'peak_kb': 50.0}
+
+def test_errors_fail_the_comparison():
+    problems = compare({'a/1': {'run': {'error': "KeyError: 'waiting'"}}}, {'a/1': {'run': BASE}}, 0.25)
+    assert problems == ["a/1 run failed: KeyError: 'waiting'"]
+
+def test_baseline_cases_missing_from_results_are_reported():
+    baselines = {'a/1': {'run': BASE, 'build': BASE}, 'b/1': {'run': BASE}}
+    problems = compare({'a/1': {'run': BASE}}, baselines, 0.25)
+    assert problems == ["a/1 build missing from the results", "b/1 run missing from the results"]
+
+    # Cases outside the filter were not meant to run
+    assert compare({'a/1': {'run': BASE, 'build': BASE}}, baselines, 0.25, case_filter='a/') == []
+
+def test_regressions_beyond_the_budget():
+    current = dict(BASE, blocks=130, ms=12.0)
+    assert compare({'a/1': {'run': current}}, {'a/1': {'run': BASE}}, 0.25) == ["a/1 run blocks: 100 -> 130"]
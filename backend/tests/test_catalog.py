@@ -0,0 +1,55 @@
+import copy
+
+import pytest
+
+from app.utils.catalog import CATALOG, catalog_item, compile_catalog, room_type
+from config import Config
+
+def test_the_shipped_catalog_has_no_issues():
+    assert CATALOG.issues == ()
+
+def test_every_reference_resolves():
+    for template in CATALOG.space_templates.values():
+        assert all(name in CATALOG.room_types for name in template)
+    for entry in CATALOG.room_types.values():
+        assert all(item_id in CATALOG.items for item_id in entry.furniture + entry.accessories)
+        assert entry.texture in CATALOG.textures.values()
+        assert entry.min_doors <= entry.max_doors
+
+@pytest.mark.parametrize("table", ["items", "item_aliases", "item_types", "textures", "texture_aliases",
+                                   "texture_colours", "room_types", "space_templates"])
+def test_catalog_tables_are_read_only(table):
+    mapping = getattr(CATALOG, table)
+    with pytest.raises(TypeError):
+        mapping["new"] = None
+    with pytest.raises(TypeError):
+        del mapping[next(iter(mapping))]
+
+def test_catalog_entries_are_read_only():
+    with pytest.raises(AttributeError):
+        CATALOG.dims = None
+    with pytest.raises(AttributeError):
+        CATALOG.dims.wall_height = 0
+    with pytest.raises(AttributeError):
+        room_type("bedroom").furniture = ()
+    with pytest.raises(AttributeError):
+        room_type("bedroom").furniture.append("bed")
+    with pytest.raises(AttributeError):
+        catalog_item("bed").footprint = (1, 1)
+
+def test_unresolved_references_fall_back_and_are_reported():
+    config = copy.deepcopy(Config.PROFESSIONAL_CONFIG)
+    config["room_types"]["bedroom"]["furniture"] = ["bed", "hovercraft"]
+    config["room_types"]["bedroom"]["texture"] = "lava"
+    config["space_templates"]["apartment"] = ["bedroom", "ballroom"]
+    config["furniture_aliases"] = {"couch": "settee-that-is-not-there"}
+    catalog = compile_catalog(config)
+
+    assert set(catalog.issues) == {
+        "room type 'bedroom': unknown item 'hovercraft'",
+        "room type 'bedroom': unknown texture 'lava'",
+        "space template 'apartment': unknown room type 'ballroom'",
+        "alias 'couch' points at unknown item 'settee-that-is-not-there'",
+    }
+    assert catalog.room_types["bedroom"].furniture == ("bed",)
+    assert catalog.room_types["bedroom"].texture == catalog.room_types["generic"].texture
@@ -0,0 +1,55 @@
+import pytest
+
+from app.utils.design_cache import DesignCache, design_cache, design_cache_key, design_hash
+from app.utils.design_generator import smart_floor_plan_builder
+
+HOUSE = {'space_type': 'house', 'num_bedrooms': 2, 'num_bathrooms': 1}
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    design_cache.clear()
+    yield
+    design_cache.clear()
+
+@pytest.mark.parametrize("requirements", [HOUSE, dict(HOUSE, floors=2)])
+def test_seeded_generation_is_deterministic(requirements):
+    first = smart_floor_plan_builder(requirements, seed=5)
+    design_cache.clear()
+    second = smart_floor_plan_builder(requirements, seed=5)
+
+    assert design_hash(first) == design_hash(second)
+    assert design_hash(smart_floor_plan_builder(requirements, seed=6)) != design_hash(first)
+
+def test_a_repeated_seed_is_served_from_the_cache():
+    first = smart_floor_plan_builder(HOUSE, seed=5)
+    hits = design_cache.stats()['hits']
+    second = smart_floor_plan_builder(HOUSE, seed=5)
+
+    assert design_cache.stats()['hits'] == hits + 1
+    assert second == first
+    # Callers get their own copy to mutate
+    second['layers'].clear()
+    assert smart_floor_plan_builder(HOUSE, seed=5) == first
+
+def test_unseeded_generation_bypasses_the_cache():
+    smart_floor_plan_builder(HOUSE)
+    smart_floor_plan_builder(HOUSE)
+    assert design_cache.stats()['entries'] == 0
+
+def test_cache_key_ignores_cosmetic_fields_and_defaults():
+    key = design_cache_key(HOUSE, 5)
+    assert design_cache_key(dict(HOUSE, style='modern', features=['garden']), 5) == key
+    assert design_cache_key(dict(HOUSE, width_meters=10, rooms=[]), 5) == key
+    assert design_cache_key(HOUSE, 6) != key
+    assert design_cache_key(dict(HOUSE, num_bedrooms=3), 5) != key
+
+def test_cache_evicts_the_least_recently_used_over_its_budget():
+    cache = DesignCache(max_bytes=30)
+    cache.put("a", {"n": "x" * 5})
+    cache.put("b", {"n": "y" * 5})
+    cache.get("a")
+    cache.put("c", {"n": "z" * 5})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": "xxxxx"}
+    assert cache.stats()['bytes'] <= 30
@@ -0,0 +1,172 @@
+import copy
+import random
+
+import pytest
+
+from app.utils import design_editor
+from app.utils.catalog import floor_texture
+from app.utils.design_editor import apply_edit, full_side_neighbour
+from app.utils.design_utils import IdAllocator
+from app.utils.design_generator import smart_floor_plan_builder
+
+REQUIREMENTS = {'space_type': 'apartment', 'num_bedrooms': 2, 'num_bathrooms': 1, 'width_meters': 12, 'height_meters': 9}
+
+def dangling_references(layer):
+    """Every element reference in a layer that does not resolve, as readable tuples"""
+    vertices, lines, holes, areas, items = (layer[table] for table in ("vertices", "lines", "holes", "areas", "items"))
+    problems = []
+    for line_id, line in lines.items():
+        for vid in line["vertices"]:
+            if vid not in vertices or line_id not in vertices[vid]["lines"]:
+                problems.append(("line vertex", line_id, vid))
+        for hole_id in line["holes"]:
+            if hole_id not in holes or holes[hole_id]["line"] != line_id:
+                problems.append(("line hole", line_id, hole_id))
+    for hole_id, hole in holes.items():
+        if hole["line"] not in lines or hole_id not in lines[hole["line"]]["holes"]:
+            problems.append(("hole line", hole_id, hole["line"]))
+    for vid, vertex in vertices.items():
+        problems.extend(("vertex line", vid, line_id) for line_id in vertex["lines"] if line_id not in lines)
+        problems.extend(("vertex area", vid, area_id) for area_id in vertex["areas"] if area_id not in areas)
+    for area_id, area in areas.items():
+        problems.extend(("area vertex", area_id, vid) for vid in area["vertices"] if vid not in vertices)
+        meta = area.get("misc") or {}
+        for item_id in [meta.get("label")] + meta.get("items", []):
+            if item_id not in items:
+                problems.append(("room item", area_id, item_id))
+        for wall_id, neighbour_id in meta.get("walls", {}).items():
+            if wall_id not in lines or (neighbour_id is not None and neighbour_id not in areas):
+                problems.append(("room wall", area_id, wall_id))
+    return problems
+
+@pytest.fixture(scope="module")
+def base_design():
+    return smart_floor_plan_builder(REQUIREMENTS, seed=7)
+
+@pytest.fixture
+def design(base_design):
+    return copy.deepcopy(base_design)
+
+def layer_of(design):
+    return design["layers"]["layer-1"]
+
+def room_at(layer, x1, y1):
+    """Area id of the room whose bounds start at (x1, y1); generated names can repeat"""
+    return next(area_id for area_id, area in layer["areas"].items() if area["misc"]["bounds"][:2] == [x1, y1])
+
+def test_generated_design_references_resolve(base_design):
+    assert dangling_references(layer_of(base_design)) == []
+
+def test_resize_room_grows_into_neighbour(design):
+    layer = layer_of(design)
+    living = room_at(layer, 200, 200)
+    wall_id, neighbour = full_side_neighbour(layer, living, "right")
+    neighbour_before = list(layer["areas"][neighbour]["misc"]["bounds"])
+
+    changed = apply_edit(design, {"op": "resize_room", "room": living, "delta": 60, "side": "right"})
+
+    assert changed == [living, neighbour]
+    assert layer["areas"][living]["misc"]["bounds"] == [200, 200, 653, 493]
+    assert layer["areas"][neighbour]["misc"]["bounds"] == [653, *neighbour_before[1:]]
+    # The shared wall moved with the side
+    assert all(layer["vertices"][vid]["x"] == 653 for vid in layer["lines"][wall_id]["vertices"])
+    assert dangling_references(layer) == []
+
+def test_resize_room_beyond_neighbour_slack_is_rejected(design):
+    layer = layer_of(design)
+    with pytest.raises(ValueError, match="at most"):
+        apply_edit(design, {"op": "resize_room", "room": room_at(layer, 200, 200), "delta": 1000, "side": "right"})
+
+def test_add_room_splits_target_behind_a_door(design):
+    layer = layer_of(design)
+    kitchen = room_at(layer, 593, 200)
+    holes_before = set(layer["holes"])
+
+    target, new_area = apply_edit(design, {"op": "add_room", "room": {"name": "Study"}, "target": kitchen})
+
+    assert target == kitchen
+    assert layer["areas"][new_area]["name"] == "Study"
+    assert layer["areas"][kitchen]["misc"]["bounds"] == [593, 200, 789.5, 493]
+    assert layer["areas"][new_area]["misc"]["bounds"] == [789.5, 200, 986, 493]
+
+    # One new door, on the wall between the two halves
+    (door_id,) = set(layer["holes"]) - holes_before
+    door_wall = layer["holes"][door_id]["line"]
+    assert layer["areas"][new_area]["misc"]["walls"][door_wall] == kitchen
+    assert layer["areas"][kitchen]["misc"]["walls"][door_wall] == new_area
+    assert dangling_references(layer) == []
+
+def test_remove_room_merges_into_neighbour(design):
+    layer = layer_of(design)
+    storage = room_at(layer, 200, 786)
+    meta = layer["areas"][storage]["misc"]
+    own_items = [meta["label"]] + meta["items"]
+
+    (neighbour,) = apply_edit(design, {"op": "remove_room", "room": storage})
+
+    assert storage not in layer["areas"]
+    assert not set(own_items) & set(layer["items"])
+    assert layer["areas"][neighbour]["misc"]["bounds"] == [200, 493, 593, 1079]
+    assert all(storage not in area["misc"]["walls"].values() for area in layer["areas"].values())
+    assert dangling_references(layer) == []
+
+def test_set_tile_changes_only_that_room(design):
+    layer = layer_of(design)
+    living = room_at(layer, 200, 200)
+    others = {area_id: area["properties"]["texture"] for area_id, area in layer["areas"].items() if area_id != living}
+
+    assert apply_edit(design, {"op": "set_tile", "room": living, "tile": "ceramic"}) == [living]
+
+    assert layer["areas"][living]["properties"]["texture"] == floor_texture("ceramic")
+    assert {area_id: layer["areas"][area_id]["properties"]["texture"] for area_id in others} == others
+    assert dangling_references(layer) == []
+
+def test_set_tile_rejects_unknown_tile(design):
+    layer = layer_of(design)
+    living = room_at(layer, 200, 200)
+    before = copy.deepcopy(layer)
+
+    with pytest.raises(ValueError, match="Unknown tile"):
+        apply_edit(design, {"op": "set_tile", "room": living, "tile": "lava"})
+    assert layer == before
+
+@pytest.mark.parametrize("edit", [
+    {"op": "paint"},
+    {"op": "resize_room", "room": "Nowhere", "delta": 10},
+    {"op": "resize_room", "room": "Kitchen", "delta": "wide"},
+    {"op": "add_room", "room": {}},
+])
+def test_invalid_edits_are_rejected(design, edit):
+    with pytest.raises(ValueError):
+        apply_edit(design, edit)
+
+ID_SEED = 42
+
+class SeededAllocator(IdAllocator):
+    """Replays the generator's ID sequence and records what it hands out"""
+    issued = []
+
+    def __init__(self, rng=None):
+        super().__init__(random.Random(ID_SEED))
+
+    def __call__(self, prefix=""):
+        new_id = super().__call__(prefix)
+        self.issued.append(new_id)
+        return new_id
+
+@pytest.mark.parametrize("edit", [
+    {"op": "add_room", "room": {"name": "Study"}},
+    {"op": "resize_room", "room": "Living Room", "delta": 40},
+])
+def test_edits_never_reuse_existing_ids(monkeypatch, edit):
+    design = smart_floor_plan_builder(REQUIREMENTS, seed=7, id_seed=ID_SEED)
+    layer = layer_of(design)
+    existing = {element_id for table in ("vertices", "lines", "holes", "areas", "items") for element_id in layer[table]}
+    monkeypatch.setattr(design_editor, "IdAllocator", SeededAllocator)
+    SeededAllocator.issued = []
+
+    apply_edit(design, edit)
+
+    assert SeededAllocator.issued
+    assert not set(SeededAllocator.issued) & existing
+    assert dangling_references(layer) == []
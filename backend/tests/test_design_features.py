@@ -0,0 +1,62 @@
+import sqlite3
+
+from app.utils.design_features import FeatureIndex, requirement_features
+from app.utils.design_generator import smart_floor_plan_builder
+
+LONG_THIN = {'space_type': 'house', 'num_bedrooms': 2, 'num_bathrooms': 1, 'width_meters': 20, 'height_meters': 4}
+# 81 m² against 80 m²: the same area bucket, so only the footprint tells them apart
+SQUARE = dict(LONG_THIN, width_meters=9, height_meters=9)
+
+def index_row(design_id, features, shared=True):
+    return (design_id, 1, shared, features.space_type, features.style, features.user_priority, features.layout,
+            features.floors, features.area_bucket, features.width_cm, features.height_cm, features.room_counts)
+
+def test_same_footprint_filters_the_nearest_search():
+    long_thin, square = requirement_features(LONG_THIN), requirement_features(SQUARE)
+    assert long_thin.area_bucket == square.area_bucket
+
+    index = FeatureIndex()
+    index.add([index_row(1, long_thin), index_row(2, square._replace(width_cm=None, height_cm=None))])
+
+    assert [design_id for design_id, _ in index.nearest(square, shared=True)] == [1, 2]
+    assert index.nearest(square, shared=True, same_footprint=True) == []
+    assert index.nearest(long_thin, shared=True, same_footprint=True) == [(1, 0.0)]
+    assert index.nearest(long_thin._replace(width_cm=None), shared=True, same_footprint=True) == []
+
+def test_fast_path_never_reuses_a_different_footprint(app, users):
+    from auth import User, db
+    from designs import find_reusable_design, refresh_feature_index, save_design
+
+    with app.app_context():
+        user = db.session.get(User, users[0])
+        stored = save_design(user, smart_floor_plan_builder(LONG_THIN, seed=1), requirements=LONG_THIN, shared=True)
+        refresh_feature_index()
+
+        assert find_reusable_design(SQUARE, max_distance=1000) is None
+        assert find_reusable_design(dict(LONG_THIN, width_meters=4, height_meters=20), max_distance=1000) is None
+        saved, distance = find_reusable_design(LONG_THIN, max_distance=0)
+        assert (saved.id, distance) == (stored.id, 0.0)
+
+def test_existing_features_table_is_upgraded(tmp_path, monkeypatch):
+    import designs
+    from app import create_app
+    from config import Config
+
+    path = tmp_path / 'old.db'
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE design_features (design_id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, '
+                           'shared BOOLEAN, version VARCHAR(8) NOT NULL, space_type VARCHAR(50), style VARCHAR(50), '
+                           'user_priority VARCHAR(50), layout VARCHAR(20), floors INTEGER, '
+                           'area_bucket INTEGER NOT NULL, room_counts BLOB NOT NULL)')
+
+    class OldDatabase(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    monkeypatch.setattr(designs, 'feature_index', FeatureIndex())
+    create_app(OldDatabase)
+
+    with sqlite3.connect(path) as connection:
+        columns = {row[1] for row in connection.execute('PRAGMA table_info(design_features)')}
+        indexes = {row[1] for row in connection.execute('PRAGMA index_list(design_features)')}
+    assert {'width_cm', 'height_cm'} <= columns
+    assert 'ix_design_features_version_design_id' in indexes
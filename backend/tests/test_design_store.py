@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from app.utils.design_generator import smart_floor_plan_builder
+
+@pytest.fixture(scope="module")
+def design():
+    return smart_floor_plan_builder({'space_type': 'apartment', 'num_bedrooms': 1, 'num_bathrooms': 1}, seed=11)
+
+def save_as(user_id, design):
+    from auth import User, db
+    from designs import save_design
+    return save_design(db.session.get(User, user_id), design).id
+
+def test_blob_is_shared_and_deleted_with_its_last_design(app, users, design):
+    from auth import db
+    from designs import Design, DesignBlob, delete_design
+    with app.app_context():
+        first, second = save_as(users[0], design), save_as(users[1], design)
+        assert DesignBlob.query.count() == 1
+
+        delete_design(db.session.get(Design, first))
+        assert DesignBlob.query.count() == 1
+        delete_design(db.session.get(Design, second))
+        assert DesignBlob.query.count() == 0
+
+def test_concurrent_saves_of_the_same_content(app, users, design):
+    from designs import Design, DesignBlob
+    errors = []
+
+    def worker(user_id):
+        with app.app_context():
+            try:
+                save_as(user_id, design)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(user_id,)) for user_id in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        assert Design.query.count() == len(users)
+        assert DesignBlob.query.count() == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.design_validator import validate_design, validate_layer
+
+def area(x1, y1, x2, y2, name="Bedroom"):
+    return {"name": name, "vertices": [], "misc": {"room_type": "bedroom", "bounds": [x1, y1, x2, y2]}}
+
+def door(line, name="Door"):
+    return {"type": "sliding door" if name == "Main Entrance" else "door", "name": name, "line": line, "offset": 0.5}
+
+def two_rooms():
+    """Room A entered from outside through its left wall; room B behind their shared wall"""
+    return {
+        "id": "layer-1",
+        "vertices": {
+            "v1": {"x": 0, "y": 0}, "v2": {"x": 0, "y": 300},
+            "v3": {"x": 300, "y": 0}, "v4": {"x": 300, "y": 300},
+        },
+        "lines": {"outer": {"vertices": ["v1", "v2"]}, "shared": {"vertices": ["v3", "v4"]}},
+        "holes": {"entrance": door("outer", "Main Entrance")},
+        "areas": {"a": area(0, 0, 300, 300, "Room A"), "b": area(300, 0, 600, 300, "Room B")},
+    }
+
+def test_layers_without_lines_get_their_own_reports():
+    design = {"layers": {
+        "layer-1": {"id": "layer-1", "areas": {}},
+        "layer-2": {"id": "layer-2", "areas": {"a": area(0, 0, 300, 300), "b": area(300, 0, 600, 300)}},
+    }}
+
+    reports = validate_design(design)["layers"]
+    assert reports["layer-1"]["rooms"] == 0
+    assert reports["layer-2"]["rooms"] == 2
+
+def test_generated_design_is_valid():
+    design = smart_floor_plan_builder({'space_type': 'house', 'num_bedrooms': 3, 'num_bathrooms': 2}, seed=3)
+    assert validate_design(design)["valid"]
+
+def test_room_behind_a_wall_without_a_door_is_unreachable():
+    report = validate_layer(two_rooms())
+    assert report["has_entrance"]
+    assert report["unreachable_rooms"] == ["Room B"]
+    assert report["rooms_below_min_doors"] == [{"room": "Room B", "doors": 0, "min_doors": 1}]
+    assert not report["valid"]
+
+def test_a_door_in_the_shared_wall_connects_the_rooms():
+    layer = two_rooms()
+    layer["holes"]["d1"] = door("shared")
+    report = validate_layer(layer)
+    assert report["unreachable_rooms"] == []
+    assert report["valid"]
+
+@pytest.mark.parametrize("break_layer, issue", [
+    (lambda layer: layer["holes"].update(d1=door("missing")), "holes d1 is on missing line missing"),
+    (lambda layer: layer["holes"].update(d1=door(["shared"])), "holes d1 is on missing line ['shared']"),
+    (lambda layer: (layer["holes"].update(d1=door("shared")), layer["vertices"].pop("v4")),
+     "holes d1 is on line shared, which does not join two existing vertices"),
+    (lambda layer: (layer["holes"].update(d1=door("shared")), layer["lines"]["shared"].update(vertices="v3")),
+     "holes d1 is on line shared, which does not join two existing vertices"),
+    (lambda layer: layer["areas"]["b"].update(vertices=["v3", "gone"]), "areas b has missing vertices"),
+    (lambda layer: layer["areas"]["b"].update(vertices={"v3": 1}), "areas b has missing vertices"),
+])
+def test_dangling_references_are_reported_not_raised(break_layer, issue):
+    layer = two_rooms()
+    break_layer(layer)
+    report = validate_layer(layer)
+    assert issue in report["issues"]
+    assert not report["valid"]
+
+def test_malformed_tables_and_elements_are_skipped():
+    layer = two_rooms()
+    layer["holes"]["d1"] = door("shared", name="Main Entrance")
+    layer["holes"]["d1"]["offset"] = "middle"
+    layer["holes"]["junk"] = "not a hole"
+    layer["areas"]["c"] = area(600, 0, "wide", 300, "Room C")
+    layer["lines"] = {"outer": layer["lines"]["outer"], "shared": None}
+
+    report = validate_layer(layer)
+    assert report["rooms"] == 3
+    assert set(report["unreachable_rooms"]) == {"Room B", "Room C"}
+
+    for malformed in ({"areas": []}, {"holes": "none", "areas": {"a": area(0, 0, 1, 1)}}, "not a layer"):
+        assert validate_layer(malformed)["valid"] is False
+    assert validate_design({"layers": ["layer-1"]}) == {"valid": True, "layers": {}}
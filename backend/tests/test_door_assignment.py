@@ -0,0 +1,106 @@
+import itertools
+import random
+from collections import deque
+
+import pytest
+
+from app.utils.catalog import room_type
+from app.utils.design_generator import assign_doors, smart_floor_plan_builder
+from app.utils.design_model import HOLE_DOOR, DesignModel
+from app.utils.design_utils import IdAllocator
+from app.utils.design_validator import validate_design
+
+CELL = 400  # cm
+
+def grid_model(cols, rows):
+    """A model with cols x rows square rooms and a wall between each pair of neighbours"""
+    model = DesignModel()
+    wall_to_rooms = {}
+    for row, col in itertools.product(range(rows + 1), range(cols + 1)):
+        model.add_vertex(f"v{row}-{col}", col * CELL, row * CELL)
+    for row, col in itertools.product(range(rows), range(cols)):
+        room = row * cols + col
+        if col + 1 < cols:
+            wall = model.add_wall(f"wv{row}-{col}", f"v{row}-{col + 1}", f"v{row + 1}-{col + 1}")
+            wall_to_rooms[wall.id] = [room, room + 1]
+        if row + 1 < rows:
+            wall = model.add_wall(f"wh{row}-{col}", f"v{row + 1}-{col}", f"v{row + 1}-{col + 1}")
+            wall_to_rooms[wall.id] = [room, room + cols]
+    return model, wall_to_rooms
+
+def reached_rooms(model, wall_to_rooms, entrance_room):
+    """Rooms reachable from the entrance room through the interior doors placed"""
+    adjacency = {}
+    for hole in model.holes.values():
+        if hole.kind == HOLE_DOOR:
+            a, b = wall_to_rooms[hole.wall]
+            adjacency.setdefault(a, []).append(b)
+            adjacency.setdefault(b, []).append(a)
+
+    reached = {entrance_room}
+    queue = deque(reached)
+    while queue:
+        for neighbour in adjacency.get(queue.popleft(), ()):
+            if neighbour not in reached:
+                reached.add(neighbour)
+                queue.append(neighbour)
+    return reached
+
+def door_counts(model, wall_to_rooms, rooms, entrance_room):
+    counts = [0] * len(rooms)
+    counts[entrance_room] += 1
+    for hole in model.holes.values():
+        for room in wall_to_rooms[hole.wall]:
+            counts[room] += 1
+    return counts
+
+@pytest.mark.parametrize("cols, rows, types, seed", [
+    (3, 3, ["living"], 0),
+    (4, 2, ["lobby", "living", "reception"], 1),
+    (2, 5, ["bedroom", "living"], 2),
+    (4, 4, ["bedroom", "bathroom", "living", "storage", "lobby", "kitchen"], 3),
+    (1, 6, ["bedroom", "office"], 4),
+])
+def test_assign_doors_reaches_every_room(cols, rows, types, seed):
+    rng = random.Random(seed)
+    model, wall_to_rooms = grid_model(cols, rows)
+    rooms = [{'type': rng.choice(types)} for _ in range(cols * rows)]
+
+    doors = assign_doors(model, rooms, wall_to_rooms, 0, IdAllocator(rng))
+
+    assert reached_rooms(model, wall_to_rooms, 0) == set(range(len(rooms)))
+    assert doors == door_counts(model, wall_to_rooms, rooms, 0)
+    for room, count in zip(rooms, doors):
+        assert count >= room_type(room['type']).min_doors
+
+# In a 2 x 2 block of bedrooms, a walk ignoring max_doors gives the entrance room three doors
+@pytest.mark.parametrize("cols, rows, kind", [(2, 2, "bedroom"), (3, 3, "living"), (4, 3, "lobby"), (1, 5, "bedroom")])
+def test_assign_doors_keeps_within_max_doors_when_it_can(cols, rows, kind):
+    model, wall_to_rooms = grid_model(cols, rows)
+    rooms = [{'type': kind} for _ in range(cols * rows)]
+
+    doors = assign_doors(model, rooms, wall_to_rooms, 0, IdAllocator(random.Random(0)))
+
+    assert reached_rooms(model, wall_to_rooms, 0) == set(range(len(rooms)))
+    assert max(doors) <= room_type(kind).max_doors
+
+def test_assign_doors_passes_max_doors_only_to_reach_a_room():
+    # The bathroom (max_doors 1) is the only way through to the bedroom
+    model, wall_to_rooms = grid_model(3, 1)
+    rooms = [{'type': 'lobby'}, {'type': 'bathroom'}, {'type': 'bedroom'}]
+
+    doors = assign_doors(model, rooms, wall_to_rooms, 0, IdAllocator(random.Random(0)))
+
+    assert reached_rooms(model, wall_to_rooms, 0) == {0, 1, 2}
+    assert doors == [2, 2, 1]
+
+@pytest.mark.parametrize("layout", ["grid", "treemap"])
+@pytest.mark.parametrize("space_type, rooms", [("apartment", None), ("house", None), ("office", 12), ("hotel", 30)])
+def test_generated_layouts_are_fully_reachable(layout, space_type, rooms):
+    requirements = {'space_type': space_type, 'layout': layout, 'num_bedrooms': 3, 'num_bathrooms': 2,
+                    'width_meters': 30, 'height_meters': 24}
+    if rooms:
+        requirements['rooms'] = [{'name': f"Room {i}"} for i in range(rooms)]
+    for seed in range(3):
+        report = validate_design(smart_floor_plan_builder(requirements, seed=seed))
+        assert report['valid'], report
@@ -0,0 +1,44 @@
+import json
+from datetime import date
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.fast_json import FastJSONProvider, iter_response_json
+
+@pytest.mark.parametrize("args, kwargs, expected", [
+    (({"a": 1},), {}, {"a": 1}),
+    ((1, "two"), {}, [1, "two"]),
+    ((), {"a": [1, 2]}, {"a": [1, 2]}),
+    ((), {}, None),
+    ((date(2024, 5, 1),), {}, "Wed, 01 May 2024 00:00:00 GMT"),
+])
+def test_response_matches_flask(app, args, kwargs, expected):
+    with app.app_context():
+        response = app.json.response(*args, **kwargs)
+        reference = DefaultJSONProvider(app).response(*args, **kwargs)
+
+    assert isinstance(app.json, FastJSONProvider)
+    assert response.mimetype == "application/json"
+    assert response.get_data().endswith(b"\n")
+    assert json.loads(response.get_data()) == json.loads(reference.get_data()) == expected
+
+def test_response_takes_args_or_kwargs(app):
+    with app.app_context(), pytest.raises(TypeError):
+        app.json.response(1, a=2)
+
+def test_debug_responses_are_pretty_printed(app):
+    app.debug = True
+    with app.app_context():
+        body = app.json.response({"a": [1, 2]}).get_data(as_text=True)
+    assert body == '{\n  "a": [\n    1,\n    2\n  ]\n}\n'
+
+def test_dumps_and_loads_round_trip(app):
+    value = {"name": "Séjour", "sizes": [1, 2.5, None], "ok": True}
+    assert app.json.loads(app.json.dumps(value)) == value
+    assert app.json.dumps({"b": 1, "a": 2}, indent=2) == '{\n  "a": 2,\n  "b": 1\n}'
+
+def test_streamed_response_matches_a_plain_encode():
+    payload = {"success": True, "design": smart_floor_plan_builder({'space_type': 'house', 'floors': 2}, seed=4)}
+    assert json.loads(b"".join(iter_response_json(payload))) == json.loads(json.dumps(payload))
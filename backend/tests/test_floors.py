@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.design_utils import floor_count
+from app.utils.floors import check_floor_overrides
+from config import Config
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 1), ("", 1), ("two", 1), ("3", 3), (2.0, 2), ("2.0", 2), (float("nan"), 1), (-4, 1), (0, 1),
+    (Config.MAX_FLOORS + 5, Config.MAX_FLOORS),
+])
+def test_floor_count(value, expected):
+    assert floor_count({'floors': value}) == expected
+
+def test_floor_count_defaults_to_one():
+    assert floor_count({}) == 1
+
+def test_non_numeric_floors_build_one_storey():
+    design = smart_floor_plan_builder({'space_type': 'apartment', 'floors': 'two'}, seed=1)
+    assert len(design['layers']) == 1
+
+@pytest.mark.parametrize("overrides", [None, {}, {"1": {"num_bedrooms": 1}}, {2: {}}])
+def test_floor_overrides_accepted(overrides):
+    check_floor_overrides({'floor_overrides': overrides})
+
+@pytest.mark.parametrize("overrides", [[{"num_bedrooms": 1}], "1", 3, {"1": ["bedroom"]}, {"1": {}, "2": None}])
+def test_floor_overrides_must_be_a_dict_of_dicts(overrides):
+    with pytest.raises(ValueError):
+        check_floor_overrides({'floor_overrides': overrides})
+    with pytest.raises(ValueError):
+        smart_floor_plan_builder({'space_type': 'apartment', 'floors': 2, 'floor_overrides': overrides}, seed=1)
+
+def test_floor_override_changes_only_its_floor():
+    design = smart_floor_plan_builder({'space_type': 'office', 'floors': 3,
+                                       'floor_overrides': {'1': {'space_type': 'restaurant'}}}, seed=1)
+    names = [{area['name'] for area in layer['areas'].values()} for layer in design['layers'].values()]
+    assert names[0] == names[2] != names[1]
+
+def test_quick_generate_rejects_malformed_floor_overrides(app, auth_header):
+    response = app.test_client().post('/api/quick-generate', headers=auth_header,
+                                      json={'type': 'apartment', 'floors': 2, 'floor_overrides': ['bedroom']})
+    assert response.status_code == 400
+    assert 'floor_overrides' in response.get_json()['error']
@@ -0,0 +1,46 @@
+import threading
+
+from app.utils.furniture_placer import FurniturePlacer
+
+# (0.4 + 0.3) - 0.3 < 0.4 in floats, so an edge at 0.4 with a 0.3 gap
+# still looks closer than `gap` after jumping exactly past it
+EDGE, GAP = 0.4, 0.3
+
+def place_within(placer, region, width, depth, timeout=5):
+    """placer.place, failing instead of hanging if the scan stops advancing"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(placer.place(region, width, depth)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "scan did not advance past a footprint exactly `gap` away"
+    return result[0]
+
+def test_scan_advances_past_edge_exactly_gap_away_in_a_row():
+    placer = FurniturePlacer(gap=GAP)
+    placer.reserve((0, 0, EDGE, 10))
+
+    (cx, cy), rotation = place_within(placer, (0, 0, 100, 100), 10, 5)
+    assert rotation == 0
+    assert cx - 5 >= EDGE + GAP and cy == 2.5
+
+def test_scan_advances_past_edge_exactly_gap_away_between_rows():
+    placer = FurniturePlacer(gap=GAP)
+    placer.reserve((0, 0, 10, EDGE))
+
+    (cx, cy), rotation = place_within(placer, (0, 0, 10, 100), 10, 5)
+    assert rotation == 0
+    assert cy - 2.5 >= EDGE + GAP
+
+def test_placed_footprints_keep_the_gap():
+    placer = FurniturePlacer(gap=GAP)
+    rects = []
+    for _ in range(12):
+        (cx, cy), rotation = place_within(placer, (0, 0, 100, 60), 20.1, 9.7)
+        w, d = (20.1, 9.7) if rotation == 0 else (9.7, 20.1)
+        rects.append((cx - w / 2, cy - d / 2, cx + w / 2, cy + d / 2))
+
+    for i, a in enumerate(rects):
+        for b in rects[i + 1:]:
+            apart_x = a[2] + GAP <= b[0] + 1e-9 or b[2] + GAP <= a[0] + 1e-9
+            apart_y = a[3] + GAP <= b[1] + 1e-9 or b[3] + GAP <= a[1] + 1e-9
+            assert apart_x or apart_y
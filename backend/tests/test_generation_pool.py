@@ -0,0 +1,93 @@
+import json
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services import generation_pool
+from app.services.generation_pool import build_design_safe, generate_batch
+
+APARTMENT = {'space_type': 'apartment', 'num_bedrooms': 1, 'num_bathrooms': 1, 'seed': 7}
+
+def ai_usage(app, user_id):
+    from stripe_integration import AIUsage
+    with app.app_context():
+        usage = AIUsage.query.filter_by(user_id=user_id).first()
+        return usage.usage_count if usage else 0
+
+def test_build_design_safe_builds_a_validated_design():
+    result = build_design_safe(APARTMENT)
+    assert result['success']
+    assert result['design']['layers']['layer-1']['areas']
+    assert result['validation']['valid']
+
+@pytest.mark.parametrize("requirements", ["apartment", None, {'rooms': 5}, {'space_type': 'apartment', 'width_meters': 'wide'}])
+def test_build_design_safe_reports_failures(requirements):
+    result = build_design_safe(requirements)
+    assert result['success'] is False
+    assert result['error']
+
+def test_batch_returns_results_in_order(app, users, auth_header):
+    client = app.test_client()
+    response = client.post('/api/quick-generate/batch', headers=auth_header,
+                           json={'items': [APARTMENT, "not requirements", dict(APARTMENT, seed=8)]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [result['index'] for result in body['results']] == [0, 1, 2]
+    assert [result['success'] for result in body['results']] == [True, False, True]
+    assert (body['succeeded'], body['failed']) == (2, 1)
+    # The whole batch counts as one generation
+    assert ai_usage(app, users[0]) == 1
+
+def test_batch_streams_ndjson(app, users, auth_header):
+    client = app.test_client()
+    response = client.post('/api/quick-generate/batch', headers=auth_header,
+                           json={'items': [APARTMENT, "not requirements"], 'stream': True})
+
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data().splitlines()]
+    assert [(record['index'], record['success']) for record in records] == [(0, True), (1, False)]
+    assert ai_usage(app, users[0]) == 1
+
+def test_batch_stream_ends_with_an_error_record_when_the_pool_breaks(app, auth_header, monkeypatch):
+    from app.routes import api
+
+    def broken_batch(items):
+        yield dict(build_design_safe(items[0]), index=0)
+        raise BrokenProcessPool("A process in the process pool was terminated abruptly")
+
+    monkeypatch.setattr(api.ai_service, 'quick_generate_batch', broken_batch)
+    response = app.test_client().post('/api/quick-generate/batch', headers=auth_header,
+                                      json={'items': [APARTMENT, APARTMENT], 'stream': True})
+
+    records = [json.loads(line) for line in response.get_data().splitlines()]
+    assert records[0]['success']
+    assert records[-1] == {'success': False, 'error': "A process in the process pool was terminated abruptly"}
+
+@pytest.mark.parametrize("body", [{}, {'items': []}, {'items': {'a': 1}}])
+def test_batch_rejects_bad_items(app, auth_header, body):
+    response = app.test_client().post('/api/quick-generate/batch', headers=auth_header, json=body)
+    assert response.status_code == 400
+
+def test_batch_requires_authentication(app):
+    response = app.test_client().post('/api/quick-generate/batch', json={'items': [APARTMENT]})
+    assert response.status_code == 401
+
+def test_a_broken_pool_is_replaced(monkeypatch):
+    class BrokenPool:
+        shut_down = False
+
+        def map(self, fn, items, chunksize=1):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    broken = BrokenPool()
+    monkeypatch.setattr(generation_pool, '_pool', broken)
+    monkeypatch.setattr(generation_pool, '_pool_workers', 2)
+
+    with pytest.raises(BrokenProcessPool):
+        list(generate_batch([APARTMENT]))
+    assert generation_pool._pool is None
+    assert broken.shut_down
@@ -0,0 +1,54 @@
+import random
+import re
+
+import pytest
+
+from app.utils.design_utils import IdAllocator
+from benchmarks.bench_ids import generate_unique_id
+
+PREFIXES = ("", "area", "label", "door", "win", "item")
+FUZZ_COUNT = 60_000
+# Run with `pytest -m slow`
+SLOW_FUZZ_COUNT = 1_000_000
+
+def id_pattern(prefix):
+    """The generate_unique_id format for a prefix"""
+    return re.compile(rf"{re.escape(prefix)}-[A-Za-z0-9_-]{{10}}" if prefix else r"[A-Za-z0-9_-]{11}")
+
+def test_generate_unique_id_format():
+    rng = random.Random(0)
+    for prefix in PREFIXES:
+        assert id_pattern(prefix).fullmatch(generate_unique_id(prefix, rng=rng))
+
+def check_unique_and_well_formed(seed, count):
+    allocator = IdAllocator(random.Random(seed))
+    patterns = {prefix: id_pattern(prefix) for prefix in PREFIXES}
+    issued = set()
+
+    for i in range(count):
+        prefix = PREFIXES[i % len(PREFIXES)]
+        new_id = allocator(prefix)
+        assert new_id not in issued, f"duplicate id {new_id}"
+        assert patterns[prefix].fullmatch(new_id), new_id
+        issued.add(new_id)
+
+@pytest.mark.parametrize("seed", [0, 1, 2 ** 31 + 7])
+def test_allocator_ids_are_unique_and_well_formed(seed):
+    check_unique_and_well_formed(seed, FUZZ_COUNT)
+
+@pytest.mark.slow
+def test_million_allocator_ids_are_unique_and_well_formed():
+    check_unique_and_well_formed(0, SLOW_FUZZ_COUNT)
+
+def test_allocator_skips_reserved_ids():
+    # A second allocator on the same seed would repeat the first one's ids
+    existing = IdAllocator(random.Random(5)).allocate("area", 50)
+    allocator = IdAllocator(random.Random(5))
+    allocator.reserve(existing)
+    assert not set(allocator.allocate("area", 50)) & set(existing)
+
+def test_allocator_is_deterministic_under_a_seed():
+    first = IdAllocator(random.Random(42)).allocate("door", 1000)
+    second = IdAllocator(random.Random(42)).allocate("door", 1000)
+    assert first == second
+    assert len(set(first)) == 1000
@@ -0,0 +1,25 @@
+import random
+
+import pytest
+
+from app.utils.layout_core import NUMPY_MIN_ROOMS, _array_grid_geometry, _loop_grid_geometry, compute_grid_geometry
+
+@pytest.mark.parametrize("num_rooms", [1, 4, 5, 9, 10, 13, NUMPY_MIN_ROOMS - 1, NUMPY_MIN_ROOMS, 201])
+@pytest.mark.parametrize("seed", [0, 7])
+def test_loop_and_array_paths_give_the_same_geometry(num_rooms, seed):
+    args = (num_rooms, 4000, 3000, 200, 200)
+    looped = _loop_grid_geometry(*args, random.Random(seed))
+    batched = _array_grid_geometry(*args, random.Random(seed))
+
+    # Exact equality, including int vs float, so seeded designs don't depend on the path taken
+    assert looped == batched
+    for field in looped._fields:
+        assert repr(getattr(looped, field)) == repr(getattr(batched, field)), field
+
+def test_geometry_shapes():
+    geometry = compute_grid_geometry(10, 4000, 3000, 200, 200, random.Random(1))
+    cols, rows = geometry.cols, geometry.rows
+    assert (cols, rows) == (4, 3)
+    assert len(geometry.grid_points) == (rows + 1) * (cols + 1)
+    assert len(geometry.wall_pairs) == len(geometry.wall_cells) == (cols - 1) * rows + (rows - 1) * cols
+    assert len(geometry.room_corners) == len(geometry.room_boxes) == 10
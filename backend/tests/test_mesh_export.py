@@ -0,0 +1,94 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.mesh_export import render_glb
+
+COMPONENTS = {"SCALAR": 1, "VEC3": 3}
+DTYPES = {5125: np.uint32, 5126: np.float32}
+
+def parse_glb(data):
+    """The JSON document and accessor arrays of a GLB, asserting its structure is valid"""
+    magic, version, length = struct.unpack_from("<4sII", data)
+    assert (magic, version, length) == (b"glTF", 2, len(data))
+
+    chunks = []
+    offset = 12
+    while offset < length:
+        chunk_length, kind = struct.unpack_from("<I4s", data, offset)
+        assert chunk_length % 4 == 0
+        chunks.append((kind, data[offset + 8:offset + 8 + chunk_length]))
+        offset += 8 + chunk_length
+    assert offset == length
+    assert chunks[0][0] == b"JSON" and len(chunks) <= 2
+
+    gltf = json.loads(chunks[0][1])
+    binary = chunks[1][1] if len(chunks) == 2 else b""
+    if binary:
+        assert chunks[1][0] == b"BIN\0"
+        # Every view is float32 or uint32, so the buffer needs no padding
+        assert gltf["buffers"] == [{"byteLength": len(binary)}]
+    else:
+        assert "buffers" not in gltf and "accessors" not in gltf
+
+    arrays = []
+    for accessor in gltf.get("accessors", []):
+        view = gltf["bufferViews"][accessor["bufferView"]]
+        assert view["byteOffset"] % 4 == 0
+        assert view["byteOffset"] + view["byteLength"] <= gltf["buffers"][0]["byteLength"]
+        dtype = DTYPES[accessor["componentType"]]
+        assert accessor["count"] * COMPONENTS[accessor["type"]] * np.dtype(dtype).itemsize == view["byteLength"]
+        array = np.frombuffer(binary, dtype, accessor["count"] * COMPONENTS[accessor["type"]], view["byteOffset"])
+        arrays.append(array.reshape(accessor["count"], -1) if accessor["type"] != "SCALAR" else array)
+    return gltf, arrays
+
+def check_meshes(gltf, arrays):
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            positions = arrays[primitive["attributes"]["POSITION"]]
+            normals = arrays[primitive["attributes"]["NORMAL"]]
+            indices = arrays[primitive["indices"]]
+            accessor = gltf["accessors"][primitive["attributes"]["POSITION"]]
+
+            assert len(normals) == len(positions)
+            assert np.allclose(np.linalg.norm(normals, axis=1), 1, atol=1e-5)
+            assert len(indices) and len(indices) % 3 == 0
+            assert indices.max() < len(positions)
+            assert accessor["min"] == pytest.approx(positions.min(axis=0).tolist())
+            assert accessor["max"] == pytest.approx(positions.max(axis=0).tolist())
+            assert primitive["material"] < len(gltf["materials"])
+
+@pytest.mark.parametrize("requirements", [
+    {'space_type': 'apartment', 'num_bedrooms': 2, 'num_bathrooms': 1},
+    {'space_type': 'house', 'num_bedrooms': 3, 'num_bathrooms': 2, 'layout': 'treemap'},
+])
+def test_glb_is_valid(requirements):
+    design = smart_floor_plan_builder(requirements, seed=2)
+    gltf, arrays = parse_glb(render_glb(design))
+    check_meshes(gltf, arrays)
+
+    layer = next(iter(design["layers"].values()))
+    primitives = gltf["meshes"][0]["primitives"]
+    # One wall primitive, then one floor primitive per colour covering every area
+    assert gltf["materials"][primitives[0]["material"]]["name"] == "wall"
+    floor_vertices = sum(len(arrays[p["attributes"]["POSITION"]]) for p in primitives[1:])
+    assert floor_vertices == sum(len(area["vertices"]) for area in layer["areas"].values())
+
+def test_storeys_share_a_mesh_at_their_altitude():
+    design = smart_floor_plan_builder({'space_type': 'house', 'floors': 3}, seed=2)
+    gltf, arrays = parse_glb(render_glb(design))
+    check_meshes(gltf, arrays)
+
+    assert len(gltf["meshes"]) == 1
+    assert [node["mesh"] for node in gltf["nodes"]] == [0, 0, 0]
+    assert gltf["scenes"][0]["nodes"] == [0, 1, 2]
+    altitudes = [node.get("translation", [0, 0, 0])[1] for node in gltf["nodes"]]
+    assert altitudes == sorted(altitudes) and altitudes[0] == 0 < altitudes[1]
+
+def test_an_empty_design_is_a_valid_glb():
+    gltf, arrays = parse_glb(render_glb({"layers": {"layer-1": {"vertices": {}, "lines": {}, "areas": {}, "holes": {}}}}))
+    assert arrays == []
+    assert gltf["nodes"] == [{"name": "layer-1"}]
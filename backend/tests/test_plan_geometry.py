@@ -0,0 +1,65 @@
+import copy
+
+import pytest
+
+from app.utils.design_generator import smart_floor_plan_builder
+from app.utils.mesh_export import render_glb
+from app.utils.plan_geometry import design_problems
+from app.utils.raster import render_png
+from app.utils.vector_export import VECTOR_EXPORTERS
+
+@pytest.fixture(scope="module")
+def base_design():
+    return smart_floor_plan_builder({'space_type': 'apartment', 'num_bedrooms': 2, 'num_bathrooms': 1}, seed=3)
+
+@pytest.fixture
+def design(base_design):
+    return copy.deepcopy(base_design)
+
+def break_references(design):
+    """Drop a wall's vertex and point a hole at a missing wall"""
+    layer = design["layers"]["layer-1"]
+    wall_id, wall = next(iter(layer["lines"].items()))
+    del layer["vertices"][wall["vertices"][0]]
+    hole = next(iter(layer["holes"].values()))
+    hole["line"] = ["not", "an", "id"]
+    return wall_id
+
+def test_generated_design_has_no_problems(base_design):
+    assert design_problems(base_design) == []
+
+def test_dangling_references_are_reported(design):
+    wall_id = break_references(design)
+    problems = design_problems(design)
+    assert f"lines {wall_id} does not join two existing vertices" in problems
+    assert any("is on missing line" in problem for problem in problems)
+
+@pytest.mark.parametrize("table, field, value", [
+    ("vertices", "x", "12"),
+    ("items", "rotation", "left"),
+    ("holes", "offset", None),
+])
+def test_non_numeric_values_are_reported(design, table, field, value):
+    layer = design["layers"]["layer-1"]
+    element_id, element = next(iter(layer[table].items()))
+    element[field] = value
+    assert any(problem.startswith(f"{table} {element_id}") for problem in design_problems(design))
+
+def test_problems_are_capped(design):
+    for vertex in design["layers"]["layer-1"]["vertices"].values():
+        vertex["x"] = None
+    assert len(design_problems(design, limit=5)) == 5
+
+@pytest.mark.parametrize("fmt", sorted(VECTOR_EXPORTERS))
+def test_vector_writers_skip_dangling_references(design, fmt):
+    break_references(design)
+    exporter, _ = VECTOR_EXPORTERS[fmt]
+    assert b"".join(exporter(design))
+
+def test_png_renderer_skips_dangling_references(design):
+    break_references(design)
+    assert render_png(design, 128).startswith(b"\x89PNG")
+
+def test_mesh_renderer_skips_dangling_references(design):
+    break_references(design)
+    assert render_glb(design)[:4] == b"glTF"
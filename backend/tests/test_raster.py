@@ -0,0 +1,32 @@
+import struct
+
+import pytest
+
+from app.utils.raster import MAX_HEIGHT, MAX_WIDTH, render_layer, render_png
+
+def strip(width, height):
+    """One rectangular room with a wall along its long side"""
+    corners = {"a": (0, 0), "b": (width, 0), "c": (width, height), "d": (0, height)}
+    return {
+        "vertices": {vid: {"id": vid, "x": x, "y": y} for vid, (x, y) in corners.items()},
+        "lines": {"w": {"id": "w", "vertices": ["a", "d"], "holes": [], "properties": {}}},
+        "holes": {},
+        "areas": {"r": {"id": "r", "vertices": list(corners), "properties": {}}},
+        "items": {},
+    }
+
+@pytest.mark.parametrize("width, height", [(1, 100000), (100000, 1), (50, 20000)])
+def test_canvas_is_bounded_whatever_the_aspect_ratio(width, height):
+    rows, columns, _ = render_layer(strip(width, height), MAX_WIDTH).shape
+    assert rows <= MAX_HEIGHT and columns <= MAX_WIDTH
+
+def test_tall_plan_is_drawn_narrower_and_keeps_its_aspect_ratio():
+    rows, columns, _ = render_layer(strip(100, 1000), MAX_WIDTH).shape
+    assert rows == MAX_HEIGHT
+    assert columns < MAX_WIDTH
+    assert rows / columns == pytest.approx(1080 / 180, rel=0.01)  # Including the margins
+
+def test_png_header_reports_the_capped_size():
+    png = render_png({"layers": {"layer-1": strip(1, 100000)}}, width=MAX_WIDTH)
+    width, height = struct.unpack(">II", png[16:24])
+    assert height == MAX_HEIGHT and width < MAX_WIDTH
@@ -0,0 +1,26 @@
+import pytest
+
+from app.utils.room_classifier import classify_room
+
+@pytest.mark.parametrize("name, room_type", [
+    ("Master Bath", "bathroom"),
+    ("Master Bedroom", "bedroom"),
+    ("Bedroom 2", "bedroom"),
+    ("Guest WC", "bathroom"),
+    ("Powder Room", "bathroom"),
+    ("Kitchenette", "kitchen"),
+    ("Cooking area", "kitchen"),
+    ("Walk-in closets", "storage"),
+    ("Boardroom", "meeting"),
+    ("Exam Room 1", "consultation"),
+    ("Salle de bain", "bathroom"),
+    ("Sala de estar", "living"),
+    ("  LIVING   room ", "living"),
+    ("Baño", "bathroom"),
+])
+def test_classify_room(name, room_type):
+    assert classify_room(name) == room_type
+
+@pytest.mark.parametrize("name", ["Example room", "Salad bar", "Hallway", "Hotel room", ""])
+def test_keywords_only_match_whole_words(name):
+    assert classify_room(name) == "generic"
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from app.utils.design_generator import build_floor_model
+from app.utils.design_utils import IdAllocator
+
+REQUIREMENTS = [
+    {'space_type': 'apartment', 'num_bedrooms': 2, 'num_bathrooms': 1},
+    {'space_type': 'house', 'num_bedrooms': 3, 'num_bathrooms': 2},
+    {'space_type': 'office'},
+    {'space_type': 'house', 'num_bedrooms': 2, 'num_bathrooms': 1, 'layout': 'treemap'},
+]
+
+def scan_areas(model):
+    """Each area's name, bounding box and centroid, found from its vertices"""
+    scanned = {}
+    for area in model.areas.values():
+        xs = [model.vertices[vid].x for vid in area.vertices]
+        ys = [model.vertices[vid].y for vid in area.vertices]
+        scanned[area.id] = (area.name, (min(xs), min(ys), max(xs), max(ys)), (sum(xs) / len(xs), sum(ys) / len(ys)))
+    return scanned
+
+@pytest.mark.parametrize("requirements", REQUIREMENTS)
+@pytest.mark.parametrize("seed", [0, 3])
+def test_room_index_matches_a_fresh_scan(requirements, seed):
+    rng = random.Random(seed)
+    model = build_floor_model(requirements, rng, IdAllocator(rng))
+    scanned = scan_areas(model)
+
+    # One placement per area, even where rooms share a name
+    assert sorted(placement.area_id for placement in model.rooms) == sorted(scanned)
+    for placement in model.rooms:
+        name, bounds, center = scanned[placement.area_id]
+        assert placement.room['name'] == name
+        assert (placement.min_x, placement.min_y, placement.max_x, placement.max_y) == pytest.approx(bounds)
+        assert (placement.center_x, placement.center_y) == pytest.approx(center)
+
+        # Furniture lands in its own room
+        for item_id in placement.items:
+            item = model.items[item_id]
+            assert bounds[0] <= item.x <= bounds[2] and bounds[1] <= item.y <= bounds[3]
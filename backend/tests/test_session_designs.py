@@ -0,0 +1,73 @@
+import threading
+
+from app.utils.design_cache import SessionDesigns
+from app.utils.fast_json import dumps_bytes
+
+def design(n):
+    return {"layers": {"layer-1": {"id": "layer-1", "areas": {f"area-{i}": {"id": f"area-{i}"} for i in range(n)}}}}
+
+def test_deliver_returns_previous_design_only_for_its_version():
+    store = SessionDesigns(1 << 20)
+    first, previous = store.deliver("s", design(1))
+    assert previous is None
+
+    second, previous = store.deliver("s", design(2), patch_from=first)
+    assert second != first
+    assert previous == design(1)
+
+    # A stale version gets no base to patch against
+    _, previous = store.deliver("s", design(3), patch_from=first)
+    assert previous is None
+    assert store.design("s") == design(3)
+
+def test_design_returns_a_copy():
+    store = SessionDesigns(1 << 20)
+    store.deliver("s", design(1))
+    store.design("s")["layers"].clear()
+    assert store.design("s") == design(1)
+
+def test_store_is_bounded_by_bytes():
+    size = len(dumps_bytes(design(50))) + SessionDesigns.ENTRY_BYTES
+    store = SessionDesigns(size * 3)
+    for session in range(10):
+        store.deliver(f"s{session}", design(50))
+
+    stats = store.stats()
+    assert stats["sessions"] == 3
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert store.design("s0") is None
+    assert store.design("s9") == design(50)
+
+def test_evicted_session_never_matches_an_old_version():
+    store = SessionDesigns(1)  # Keeps only the newest session
+    version, _ = store.deliver("a", design(1))
+    store.deliver("b", design(1))
+    assert store.design("a") is None
+
+    # Session a starts over; the version its client holds is never reissued
+    new_version, previous = store.deliver("a", design(2), patch_from=version)
+    assert previous is None
+    _, previous = store.deliver("a", design(3), patch_from=version)
+    assert previous is None and new_version != version
+
+def test_id_seed_is_stable_per_session():
+    store = SessionDesigns(1 << 20)
+    assert store.id_seed("s") == store.id_seed("s")
+    store.pop("s")
+    assert store.stats() == {"sessions": 0, "bytes": 0, "max_bytes": 1 << 20}
+
+def test_concurrent_deliveries_keep_the_byte_count_exact():
+    store = SessionDesigns(1 << 30)
+
+    def worker(n):
+        for i in range(200):
+            store.deliver(f"s{i % 7}", design((n + i) % 5))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = sum(SessionDesigns.ENTRY_BYTES + len(dumps_bytes(store.design(f"s{i}"))) for i in range(7))
+    assert store.stats()["bytes"] == expected
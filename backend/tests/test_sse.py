@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from app.utils.sse import MarkerFilter, sse_event
+
+MARKER = "[GENERATE_DESIGN]"
+
+def stream(chunks):
+    """Everything a MarkerFilter forwards for these chunks, and whether it found the marker"""
+    marker_filter = MarkerFilter(MARKER)
+    forwarded = [marker_filter.feed(chunk) for chunk in chunks] + [marker_filter.flush()]
+    return "".join(forwarded), marker_filter.found
+
+@pytest.mark.parametrize("text", [
+    "Here is your plan. [GENERATE_DESIGN]",
+    "[GENERATE_DESIGN] Building it now.",
+    "No marker here, just [brackets] and [GEN",
+    "Array [0] then [GENERATE_DESIGN] then more",
+])
+def test_every_split_gives_the_unsplit_result(text):
+    expected = (text.replace(MARKER, ""), MARKER in text)
+    for cut in range(len(text) + 1):
+        assert stream([text[:cut], text[cut:]]) == expected, cut
+    for size in (1, 2, 5):
+        assert stream([text[i:i + size] for i in range(0, len(text), size)]) == expected, size
+
+def test_a_split_marker_is_never_forwarded():
+    marker_filter = MarkerFilter(MARKER)
+    assert marker_filter.feed("Sure! [GENER") == "Sure! "
+    assert not marker_filter.found
+    assert marker_filter.feed("ATE_DESIGN] Done") == " Done"
+    assert marker_filter.found
+    assert marker_filter.flush() == ""
+
+def test_a_false_start_is_released():
+    marker_filter = MarkerFilter(MARKER)
+    assert marker_filter.feed("see [GEN") == "see "
+    assert marker_filter.feed("ERIC] notes") == "[GENERIC] notes"
+    assert not marker_filter.found
+
+def test_a_trailing_prefix_is_flushed():
+    marker_filter = MarkerFilter(MARKER)
+    assert marker_filter.feed("ends with [") == "ends with "
+    assert marker_filter.flush() == "["
+    assert marker_filter.flush() == ""
+
+def test_sse_event_format():
+    event = sse_event("token", {"text": "a\nb"})
+    assert event.startswith(b"event: token\ndata: ") and event.endswith(b"\n\n")
+    # The JSON payload keeps newlines escaped, so the event stays one data line
+    assert event.count(b"\n") == 3
+    assert json.loads(event.split(b"data: ", 1)[1]) == {"text": "a\nb"}
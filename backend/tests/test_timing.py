@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.generation_pool import generate_batch
+from app.utils.timing import begin_request, call_with_spans, end_request, record_spans, reset_timing_stats, span, timing_stats
+from config import Config
+
+def work():
+    with span("test_phase"):
+        return 42
+
+def test_call_with_spans_returns_the_spans_instead_of_tracing_them():
+    begin_request()
+    with span("outer"):
+        result, spans = call_with_spans(work)
+    request_spans = end_request()
+
+    assert result == 42
+    assert [name for name, _ in spans] == ["test_phase"]
+    assert [name for name, _ in request_spans] == ["outer"]
+
+    begin_request()
+    record_spans(spans)
+    assert end_request() == spans
+
+def test_reset_returns_the_stats_it_clears():
+    reset_timing_stats()
+    work()
+    work()
+
+    assert timing_stats()["test_phase"]["count"] == 2
+    assert reset_timing_stats()["test_phase"]["count"] == 2
+    assert timing_stats() == {}
+
+def test_spans_from_pool_workers_reach_the_parent_stats():
+    # Unseeded, so no worker serves a cached design and skips the layout phase
+    items = [{'space_type': 'apartment'}, {'space_type': 'office'}, {'space_type': 'house', 'floors': 2}]
+    reset_timing_stats()
+    results = list(generate_batch(items))
+
+    assert all(result['success'] for result in results)
+    stats = timing_stats()
+    assert stats["layout"]["count"] >= len(items)
+    assert stats["serialize"]["count"] >= 2
+
+@pytest.mark.parametrize("enabled, status", [(False, 404), (True, 200)])
+def test_metrics_endpoint(app, monkeypatch, enabled, status):
+    monkeypatch.setattr(Config, 'TIMING_METRICS', enabled)
+    client = app.test_client()
+    reset_timing_stats()
+    work()
+
+    assert client.get('/api/metrics/timings').status_code == status
+    if enabled:
+        assert client.get('/api/metrics/timings').get_json()['timings']['test_phase']['count'] == 1
+        assert client.delete('/api/metrics/timings').get_json()['timings']['test_phase']['count'] == 1
+        assert 'test_phase' not in client.get('/api/metrics/timings').get_json()['timings']
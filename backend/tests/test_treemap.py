@@ -0,0 +1,40 @@
+import itertools
+import random
+
+import pytest
+
+from app.utils.treemap import shared_segments, squarify
+
+def overlap(a, b):
+    return min(a[2], b[2]) - max(a[0], b[0]) > 1e-6 and min(a[3], b[3]) - max(a[1], b[1]) > 1e-6
+
+@pytest.mark.parametrize("seed", range(20))
+def test_squarify_tiles_the_box_in_proportion(seed):
+    rng = random.Random(seed)
+    sizes = [rng.choice((0.5, 0.8, 1.0, 1.5, 2.5)) * rng.uniform(0.5, 2) for _ in range(rng.randint(1, 30))]
+    x, y, width, height = 200, 200, rng.randint(500, 5000), rng.randint(500, 5000)
+
+    rects = squarify(sizes, x, y, width, height)
+
+    assert len(rects) == len(sizes)
+    for x1, y1, x2, y2 in rects:
+        assert x - 1e-6 <= x1 < x2 <= x + width + 1e-6
+        assert y - 1e-6 <= y1 < y2 <= y + height + 1e-6
+    for a, b in itertools.combinations(rects, 2):
+        assert not overlap(a, b)
+
+    # No overlap and full coverage: the areas add up to the box, each in proportion to its size
+    areas = [(x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in rects]
+    assert sum(areas) == pytest.approx(width * height)
+    for area, size in zip(areas, sizes):
+        assert area / (width * height) == pytest.approx(size / sum(sizes))
+
+def test_shared_segments_separate_neighbouring_rectangles():
+    rects = squarify([3, 2, 1, 1], 0, 0, 700, 300)
+    segments = shared_segments(rects)
+
+    # Interior walls have two owners, the rest lie on the box outline
+    for (x1, y1), (x2, y2), owners in segments:
+        on_outline = x1 == x2 in (0, 700) or y1 == y2 in (0, 300)
+        assert len(owners) == (1 if on_outline else 2)
+    assert sum(abs(x2 - x1) + abs(y2 - y1) for (x1, y1), (x2, y2), owners in segments if len(owners) == 1) == pytest.approx(2000)
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.utils.wall_openings import WallOpenings
+
+def wall(length, *holes):
+    """A wall with holes given as (start, end) intervals"""
+    openings = WallOpenings(length)
+    for start, end in holes:
+        openings.add((start + end) / 2, end - start)
+    return openings
+
+def test_add_keeps_intervals_sorted():
+    openings = wall(1000, (600, 700), (100, 200), (300, 400))
+    assert openings.starts == [100, 300, 600]
+    assert openings.ends == [200, 400, 700]
+    assert len(openings) == 3
+
+@pytest.mark.parametrize("center, width, clearance, expected", [
+    (250, 100, 0, True),    # exactly fills the gap
+    (250, 100, 1, False),   # no room left for the clearance
+    (150, 20, 0, False),    # inside a hole
+    (200, 20, 0, False),    # straddles a hole's end
+    (30, 60, 0, True),
+    (30, 60, 1, False),     # clearance to the wall end
+    (970, 60, 0, True),
+    (980, 60, 0, False),    # runs off the wall
+])
+def test_fits_detects_overlap(center, width, clearance, expected):
+    assert wall(1000, (100, 200), (300, 400)).fits(center, width, clearance) is expected
+
+def test_find_slot_keeps_a_free_centre():
+    assert wall(1000, (100, 200)).find_slot(500, 80, 30) == 500
+
+def test_find_slot_clamps_to_the_wall():
+    assert wall(1000).find_slot(0, 80, 30) == 70
+    assert wall(1000).find_slot(1000, 80, 30) == 930
+
+def test_find_slot_hugs_the_nearer_side_of_a_blocking_hole():
+    openings = wall(1000, (400, 600))
+    assert openings.find_slot(480, 100, 10) == 340
+    assert openings.find_slot(520, 100, 10) == 660
+
+def test_find_slot_looks_past_gaps_that_are_too_narrow():
+    # The gaps either side of the middle hole are 20 cm; the nearest that fits is past the last hole
+    openings = wall(1000, (100, 300), (320, 500), (520, 700))
+    assert openings.find_slot(450, 100) == 750
+    assert openings.find_slot(350, 100) == 50
+
+def test_find_slot_gives_up_on_a_full_wall():
+    assert wall(1000, (0, 480), (520, 1000)).find_slot(500, 60) is None
+    assert wall(50).find_slot(25, 60) is None
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_slot_matches_a_brute_force_search(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        openings = WallOpenings(rng.randint(100, 2000))
+        for _ in range(rng.randint(0, 8)):
+            width = rng.randint(20, 200)
+            center = openings.find_slot(rng.uniform(0, openings.length), width, 10)
+            if center is not None:
+                openings.add(center, width)
+
+        center, width, clearance = rng.uniform(0, openings.length), rng.randint(20, 200), rng.choice((0, 10, 30))
+        slot = openings.find_slot(center, width, clearance)
+
+        # Every whole centimetre that fits is at least as far away as the slot found
+        fitting = [x for x in range(openings.length + 1) if openings.fits(x, width, clearance)]
+        if slot is None:
+            assert not fitting
+        else:
+            assert openings.fits(slot, width, clearance - 1e-6)
+            assert all(abs(x - center) >= abs(slot - center) - 1e-9 for x in fitting)